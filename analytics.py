@@ -0,0 +1,245 @@
+"""
+Statistiques des parties enregistrées (recording.py) pour les enseignants.
+
+Pour chaque carte : taux de choix A/B, variation moyenne des jauges par option, temps
+moyen de décision et nombre de défaites causées (par jauge tombée à 0). Les agrégats
+sont indexés par l'identifiant stable des cartes (recording.card_id) ; une carte absente
+du paquet affiché est signalée comme inconnue.
+
+Les fichiers de parties sont répartis sur un pool de processus ; chaque processus
+renvoie des agrégats partiels (sommes et compteurs) qui sont additionnés. L'état de
+l'analyse (position lue dans chaque fichier + agrégats) est conservé : une nouvelle
+exécution ne lit que les blocs ajoutés depuis la précédente.
+
+Exemple : py analytics.py --dir assets/recordings --top 15
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import engine
+from recording import BLOCK, MAGIC, ROW_SIZE, GAME_INTERRUPTED, GAME_RESCUED, FATAL_BITS, card_id
+
+
+STATE_VERSION = 1
+# Agrégats par carte : nom -> nombre de colonnes ; les lignes suivent le tableau trié "keys"
+CARD_FIELDS = {"count_a": 1, "count_b": 1, "delta_a": 3, "delta_b": 3, "decision_ms": 1, "fatal": 3}
+GAME_FIELDS = ("games", "decisions", "rescued", "interrupted")
+
+
+def empty_aggregate(keys=None):
+    keys = np.zeros(0, dtype=np.uint64) if keys is None else keys
+    aggregate = {name: np.zeros((len(keys), width), dtype=np.int64) for name, width in CARD_FIELDS.items()}
+    aggregate["keys"] = keys
+    aggregate.update({name: 0 for name in GAME_FIELDS})
+    return aggregate
+
+
+def merge(total, partial):
+    """Additionne `partial` dans `total`, en alignant les lignes sur l'union des identifiants de cartes."""
+    keys = np.union1d(total["keys"], partial["keys"])
+    if len(keys) == len(total["keys"]):
+        rows = np.searchsorted(keys, partial["keys"])
+        for name in CARD_FIELDS:
+            total[name][rows] += partial[name]
+    else:
+        merged = empty_aggregate(keys)
+        for part in (total, partial):
+            rows = np.searchsorted(keys, part["keys"])
+            for name in CARD_FIELDS:
+                merged[name][rows] += part[name]
+        for name in CARD_FIELDS:
+            total[name] = merged[name]
+        total["keys"] = keys
+    for name in GAME_FIELDS:
+        total[name] += partial[name]
+    return total
+
+
+def read_blocks(data):
+    """
+    Découpe les blocs complets de `data`. Renvoie (liste des (drapeaux, n, colonnes brutes),
+    octets consommés) ; un bloc incomplet en fin de fichier (écriture en cours) est laissé.
+    """
+    blocks = []
+    pos = 0
+    while pos + BLOCK.size <= len(data):
+        magic, version, flags, n, started, score = BLOCK.unpack_from(data, pos)
+        if magic != MAGIC:
+            raise ValueError(f"Bloc invalide à l'octet {pos}")
+        end = pos + BLOCK.size + n * ROW_SIZE
+        if end > len(data):
+            break
+        blocks.append((flags, n, data[pos + BLOCK.size:end]))
+        pos = end
+    return blocks, pos
+
+
+def analyze_file(path, offset):
+    """Tâche d'un processus : agrège les blocs de `path` à partir de `offset`."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    blocks, consumed = read_blocks(data)
+    if not blocks:
+        return path, offset + consumed, empty_aggregate()
+
+    columns = {"cards": [], "choices": [], "flags": [], "deltas": [], "ms": []}
+    for flags, n, raw in blocks:
+        pos = 0
+        for name, dtype, width in (("cards", "<u8", 1), ("choices", "u1", 1), ("flags", "u1", 1),
+                                   ("deltas", "<i4", 3), ("ms", "<u4", 1)):
+            columns[name].append(np.frombuffer(raw, dtype=dtype, count=n * width, offset=pos))
+            pos += n * width * np.dtype(dtype).itemsize
+    keys, cards = np.unique(np.concatenate(columns["cards"]), return_inverse=True)
+    choices = np.concatenate(columns["choices"])
+    fatal_flags = np.concatenate(columns["flags"])
+    deltas = np.concatenate(columns["deltas"]).reshape(-1, 3).astype(np.float64)
+    ms = np.concatenate(columns["ms"]).astype(np.float64)
+    n_cards = len(keys)
+
+    def by_card(weights=None, mask=None):
+        """Somme par carte de `weights` (ou nombre de décisions), restreinte à `mask`."""
+        selected = cards if mask is None else cards[mask]
+        if weights is not None and mask is not None:
+            weights = weights[mask]
+        return np.bincount(selected, weights=weights, minlength=n_cards).round().astype(np.int64)
+
+    is_b = choices == 1
+    aggregate = empty_aggregate(keys.astype(np.uint64))
+    aggregate["decisions"] = len(cards)
+    aggregate["interrupted"] = sum(1 for flags, _, _ in blocks if flags & GAME_INTERRUPTED)
+    aggregate["games"] = len(blocks) - aggregate["interrupted"]
+    aggregate["rescued"] = sum(1 for flags, _, _ in blocks if flags & GAME_RESCUED)
+    aggregate["count_a"][:, 0] = by_card(mask=~is_b)
+    aggregate["count_b"][:, 0] = by_card(mask=is_b)
+    aggregate["decision_ms"][:, 0] = by_card(ms)
+    for g, bit in enumerate(FATAL_BITS):
+        aggregate["delta_a"][:, g] = by_card(deltas[:, g], ~is_b)
+        aggregate["delta_b"][:, g] = by_card(deltas[:, g], is_b)
+        aggregate["fatal"][:, g] = by_card(mask=(fatal_flags & bit) != 0)
+    return path, offset + consumed, aggregate
+
+
+def load_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}, empty_aggregate()
+    if state.get("version") != STATE_VERSION:
+        return {}, empty_aggregate()
+    aggregate = empty_aggregate(np.array(state["aggregate"]["keys"], dtype=np.uint64))
+    for name, width in CARD_FIELDS.items():
+        aggregate[name] = np.array(state["aggregate"][name], dtype=np.int64).reshape(-1, width)
+    for name in GAME_FIELDS:
+        aggregate[name] = state["aggregate"][name]
+    return state["files"], aggregate
+
+
+def save_state(path, files, aggregate):
+    data = {name: aggregate[name].tolist() for name in CARD_FIELDS}
+    data["keys"] = aggregate["keys"].tolist()
+    data.update({name: aggregate[name] for name in GAME_FIELDS})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": STATE_VERSION, "files": files, "aggregate": data}, f)
+    os.replace(tmp, path)
+
+
+def update(directory, state_path=None, workers=None):
+    """
+    Lit les blocs nouveaux de tous les fichiers de `directory` et renvoie
+    (agrégats cumulés, nombre de fichiers traités). Sans `state_path`, tout est relu.
+    """
+    files, aggregate = load_state(state_path) if state_path else ({}, empty_aggregate())
+    try:
+        names = sorted(f for f in os.listdir(directory) if f.endswith(".rec"))
+    except OSError:
+        names = []
+    jobs = []
+    for name in names:
+        offset = files.get(name, 0)
+        if os.path.getsize(os.path.join(directory, name)) > offset:
+            jobs.append((os.path.join(directory, name), offset))
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, offset, partial in pool.map(analyze_file, *zip(*jobs)):
+                files[os.path.basename(path)] = offset
+                merge(aggregate, partial)
+        if state_path:
+            save_state(state_path, files, aggregate)
+    return aggregate, len(jobs)
+
+
+def card_report(aggregate):
+    """Lignes par carte : (identifiant, choix, %A, Δ moyen A, Δ moyen B, temps moyen (s), défaites)."""
+    rows = []
+    keys = aggregate["keys"].tolist()
+    count_a = aggregate["count_a"][:, 0]
+    count_b = aggregate["count_b"][:, 0]
+    for i in range(len(count_a)):
+        total = int(count_a[i] + count_b[i])
+        if not total:
+            continue
+        mean_a = tuple(aggregate["delta_a"][i] / count_a[i]) if count_a[i] else (0.0, 0.0, 0.0)
+        mean_b = tuple(aggregate["delta_b"][i] / count_b[i]) if count_b[i] else (0.0, 0.0, 0.0)
+        rows.append((keys[i], total, count_a[i] / total, mean_a, mean_b,
+                     aggregate["decision_ms"][i, 0] / total / 1000, aggregate["fatal"][i].tolist()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistiques des parties enregistrées")
+    parser.add_argument("--dir", default=os.path.join("assets", "recordings"))
+    parser.add_argument("--cards", default="cards.json")
+    parser.add_argument("--state", default=os.path.join(".cache", "analytics.json"),
+                        help="état incrémental (vide pour tout relire)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=20, help="nombre de cartes affichées")
+    parser.add_argument("--sort", default="fatal", choices=["fatal", "choices", "time"])
+    parser.add_argument("--json", action="store_true", help="sortie JSON complète")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    aggregate, processed = update(args.dir, args.state or None, args.workers)
+    elapsed = time.perf_counter() - start
+    rows = card_report(aggregate)
+
+    try:
+        cards = engine.load_json(args.cards)
+    except Exception as e:
+        print(f"Erreur lors du chargement de {args.cards}: {e}")
+        cards = []
+    # Identifiant stable -> indice dans le paquet actuel ; les cartes retirées n'y sont pas
+    indices = {card_id(card): i for i, card in enumerate(cards)}
+
+    if args.json:
+        print(json.dumps([{"card": indices.get(key), "key": f"{key:016x}", "decisions": n, "rate_a": rate_a,
+                           "mean_delta_a": mean_a, "mean_delta_b": mean_b, "mean_decision_s": seconds,
+                           "losses": dict(zip(engine.GAUGES, fatal))}
+                          for key, n, rate_a, mean_a, mean_b, seconds, fatal in rows], indent=4))
+        return
+
+    print(f"{aggregate['games']} parties, {aggregate['decisions']} décisions, "
+          f"{aggregate['rescued']} sauvées par le quiz ({processed} fichier(s) lus en {elapsed:.2f} s)")
+    sort_key = {"fatal": lambda r: sum(r[6]), "choices": lambda r: r[1], "time": lambda r: r[5]}[args.sort]
+    for key, n, rate_a, mean_a, mean_b, seconds, fatal in sorted(rows, key=sort_key, reverse=True)[:args.top]:
+        i = indices.get(key)
+        if i is None:
+            print(f"{'?':<5} (carte absente de {args.cards}, identifiant {key:016x})")
+        else:
+            print(f"#{i:<4} {cards[i].get('question', '')[:60]:<60}")
+        print(f"      {n} choix, A {rate_a:5.1%} / B {1 - rate_a:5.1%}, {seconds:5.1f} s en moyenne, "
+              f"défaites (budget/bonheur/épargne) : {fatal[0]}/{fatal[1]}/{fatal[2]}")
+        print(f"      Δ moyen A : {mean_a[0]:+.1f} / {mean_a[1]:+.1f} / {mean_a[2]:+.1f}"
+              f"   Δ moyen B : {mean_b[0]:+.1f} / {mean_b[1]:+.1f} / {mean_b[2]:+.1f}")
+
+
+if __name__ == "__main__":
+    main()
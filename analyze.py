@@ -0,0 +1,122 @@
+"""
+Analyse d'équilibrage vectorisée (NumPy) du paquet cards.json.
+
+Le paquet est compilé en un tableau d'effets N x 2 x 3 (carte, option A/B, jauge),
+puis des centaines de milliers de parties avancent en parallèle sous forme de vecteurs
+de jauges. Le rapport donne la durée de partie attendue, les cartes responsables du
+plus de défaites et la sensibilité de la survie à chaque carte.
+
+Seuls les effets immédiats sont modélisés : les effets programmés (effects.py) demandent
+une file d'évènements par partie, incompatible avec ce calcul en vecteurs. Pour un
+paquet qui en déclare, le rapport le signale ; simulate.py, qui pilote le vrai moteur,
+les prend en compte.
+
+Exemple : py analyze.py --runs 200000 --policy random --sensitivity
+"""
+import argparse
+
+import numpy as np
+
+import engine
+from effects import compile_schedules
+
+
+def compile_deck(cards):
+    """Renvoie le tableau d'effets int32 de forme (N, 2, 3)."""
+    return np.array(engine.compile_effects(cards), dtype=np.int32).reshape(len(cards), 2, 3)
+
+
+def choose(policy, states, drawn, rng):
+    """Renvoie l'indice d'option (0 = A, 1 = B) choisi par chaque partie."""
+    if policy == "random":
+        return rng.integers(0, 2, size=len(states))
+    if policy == "always_a":
+        return np.zeros(len(states), dtype=np.intp)
+    if policy == "greedy":
+        worst_a = (states + drawn[:, 0, :]).min(axis=1)
+        worst_b = (states + drawn[:, 1, :]).min(axis=1)
+        return (worst_b > worst_a).astype(np.intp)
+    raise ValueError(f"Politique inconnue : {policy!r}")
+
+
+def run_batch(effects, runs, policy="random", max_turns=500, seed=0):
+    """
+    Joue `runs` parties simultanément (sans quiz de seconde chance).
+    Renvoie (durées, carte fatale par partie (-1 si survie), tirages par carte).
+    """
+    rng = np.random.default_rng(seed)
+    n_cards = len(effects)
+    states = np.full((runs, 3), engine.START_VALUE, dtype=np.int32)
+    lengths = np.zeros(runs, dtype=np.int32)
+    killer = np.full(runs, -1, dtype=np.int32)
+    draws = np.zeros(n_cards, dtype=np.int64)
+    alive = np.arange(runs)
+
+    for turn in range(1, max_turns + 1):
+        if alive.size == 0:
+            break
+        cards = rng.integers(0, n_cards, size=alive.size)
+        draws += np.bincount(cards, minlength=n_cards)
+        drawn = effects[cards]
+        options = choose(policy, states[alive], drawn, rng)
+        states[alive] += drawn[np.arange(alive.size), options]
+        lengths[alive] = turn
+        dead = (states[alive] <= 0).any(axis=1)
+        killer[alive[dead]] = cards[dead]
+        alive = alive[~dead]
+    return lengths, killer, draws
+
+
+def report(cards, runs, policy, max_turns, seed, sensitivity):
+    effects = compile_deck(cards)
+    lengths, killer, draws = run_batch(effects, runs, policy, max_turns, seed)
+    baseline = lengths.mean()
+    losses = np.bincount(killer[killer >= 0], minlength=len(cards))
+    total_losses = losses.sum()
+
+    print(f"Politique : {policy} | {runs} parties | {len(cards)} cartes")
+    scheduled = sum(1 for options in compile_schedules(cards) for schedule in options if schedule)
+    if scheduled:
+        print(f"Attention : {scheduled} option(s) avec des effets programmés, ignorés ici "
+              f"(simulate.py les prend en compte)")
+    print(f"Durée attendue : {baseline:.2f} tours (médiane {np.median(lengths):.0f}, "
+          f"survie à {max_turns} tours : {(killer < 0).mean():.1%})")
+
+    print("\nCartes dominant les défaites :")
+    order = np.argsort(losses)[::-1]
+    for index in order[:10]:
+        if losses[index] == 0:
+            break
+        share = losses[index] / total_losses
+        lethality = losses[index] / draws[index] if draws[index] else 0.0
+        print(f"  #{index:<3} {share:6.1%} des défaites | létalité {lethality:6.2%} | "
+              f"{cards[index].get('question', '')[:70]}")
+
+    if sensitivity:
+        # Sensibilité : variation de la durée attendue lorsque la carte est retirée du paquet
+        print("\nSensibilité de la survie (durée sans la carte - durée de référence) :")
+        deltas = []
+        for index in range(len(cards)):
+            reduced = np.delete(effects, index, axis=0)
+            reduced_lengths, _, _ = run_batch(reduced, runs, policy, max_turns, seed)
+            deltas.append((reduced_lengths.mean() - baseline, index))
+        for delta, index in sorted(deltas, reverse=True):
+            print(f"  #{index:<3} {delta:+7.2f} | {cards[index].get('question', '')[:70]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse d'équilibrage vectorisée de cards.json")
+    parser.add_argument("--cards", default="cards.json")
+    parser.add_argument("--runs", type=int, default=200000)
+    parser.add_argument("--policy", default="random", choices=["random", "greedy", "always_a"])
+    parser.add_argument("--max-turns", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sensitivity", action="store_true",
+                        help="mesure l'effet du retrait de chaque carte sur la durée attendue")
+    args = parser.parse_args()
+    report(engine.load_json(args.cards), args.runs, args.policy, args.max_turns, args.seed,
+           args.sensitivity)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Atlas d'images : toutes les images du jeu, déjà redimensionnées à leur taille
+d'affichage, regroupées dans un seul PNG (assets/atlas.png) et un index JSON
+(assets/atlas.json) donnant la position de chacune.
+
+À l'exécution, l'atlas est décodé une seule fois par Tk (sans PIL) et chaque image est
+découpée dans un PhotoImage avec la commande `copy -from` de Tk. Sans atlas, ou s'il
+est périmé, le jeu revient au chargement image par image (main.load_image_from_file).
+
+Construction (PIL nécessaire) : py atlas.py
+Vérification (échoue si une image source a changé depuis) : py atlas.py --check
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+
+import instrument
+
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+ATLAS_IMAGE = "atlas.png"
+ATLAS_INDEX = "atlas.json"
+INDEX_VERSION = 1
+MAX_WIDTH = 1024
+PADDING = 1
+PORTRAIT_DIR = "character"
+PORTRAIT_SIZE = (150, 150)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+# Images fixes et taille à laquelle main.py les affiche
+IMAGES = {
+    "logo_app.png": (400, 400),
+    "logo.png": (40, 40),
+    "budget.png": (30, 30),
+    "bonheur.png": (30, 30),
+    "epargne.png": (30, 30),
+}
+
+
+def sprite_key(path, size):
+    return f"{path}@{size[0]}x{size[1]}"
+
+
+def sources(assets_dir=ASSETS_DIR):
+    """Renvoie la liste des (chemin relatif à assets, taille d'affichage) à placer dans l'atlas."""
+    entries = [(path, size) for path, size in IMAGES.items() if os.path.exists(os.path.join(assets_dir, path))]
+    try:
+        portraits = sorted(f for f in os.listdir(os.path.join(assets_dir, PORTRAIT_DIR))
+                           if f.lower().endswith(IMAGE_EXTENSIONS))
+    except OSError:
+        portraits = []
+    entries.extend((f"{PORTRAIT_DIR}/{f}", PORTRAIT_SIZE) for f in portraits)
+    return entries
+
+
+def source_stamp(assets_dir, path):
+    """Empreinte du contenu (et non de la date, qui change à chaque copie ou clone)."""
+    with open(os.path.join(assets_dir, path), "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def pack(sizes, max_width=MAX_WIDTH):
+    """
+    Rangement en étagères : les images, triées par hauteur décroissante, sont posées de
+    gauche à droite ; une nouvelle étagère commence quand la ligne est pleine.
+    Renvoie (positions dans l'ordre de `sizes`, largeur, hauteur).
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x and x + w > max_width:
+            y += shelf_height + PADDING
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += w + PADDING
+        width = max(width, x - PADDING)
+        shelf_height = max(shelf_height, h)
+    return positions, width, y + shelf_height
+
+
+def build(assets_dir=ASSETS_DIR):
+    """Redimensionne et assemble les images ; écrit atlas.png et atlas.json."""
+    from PIL import Image
+    entries = sources(assets_dir)
+    positions, width, height = pack([size for _, size in entries])
+    atlas = Image.new("RGBA", (max(width, 1), max(height, 1)), (0, 0, 0, 0))
+    index = {"version": INDEX_VERSION, "sprites": {}, "sources": {}}
+    for (path, size), (x, y) in zip(entries, positions):
+        image = Image.open(os.path.join(assets_dir, path)).convert("RGBA")
+        atlas.paste(image.resize(size, resample=Image.LANCZOS), (x, y))
+        index["sprites"][sprite_key(path, size)] = [x, y, size[0], size[1]]
+        index["sources"][path] = source_stamp(assets_dir, path)
+    atlas.save(os.path.join(assets_dir, ATLAS_IMAGE), optimize=True)
+    with open(os.path.join(assets_dir, ATLAS_INDEX), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    return index
+
+
+def load_index(assets_dir=ASSETS_DIR):
+    try:
+        with open(os.path.join(assets_dir, ATLAS_INDEX), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION or not os.path.exists(os.path.join(assets_dir, ATLAS_IMAGE)):
+        return None
+    return index
+
+
+def stale_sources(index, assets_dir=ASSETS_DIR):
+    """
+    Renvoie la liste des images sources ajoutées, supprimées ou modifiées depuis la
+    construction de l'atlas. Les sources absentes du dossier (jeu empaqueté) ne comptent pas
+    comme modifiées : seul l'atlas est alors livré.
+    """
+    current = dict(sources(assets_dir))
+    if not current:
+        return []
+    recorded = index["sources"]
+    stale = sorted(set(current) ^ set(recorded))
+    for path in set(current) & set(recorded):
+        if source_stamp(assets_dir, path) != recorded[path]:
+            stale.append(path)
+        elif sprite_key(path, current[path]) not in index["sprites"]:
+            stale.append(path)
+    return stale
+
+
+class Atlas:
+    """Atlas décodé par Tk ; `photo(chemin, taille)` découpe (une seule fois) l'image demandée."""
+
+    def __init__(self, image, sprites):
+        self.image = image
+        self.sprites = sprites
+        self.photos = {}
+
+    @classmethod
+    @instrument.timed("atlas_load")
+    def load(cls, assets_dir=ASSETS_DIR):
+        """Renvoie l'atlas, ou None s'il est absent ou périmé."""
+        import tkinter as tk
+        index = load_index(assets_dir)
+        if index is None:
+            return None
+        stale = stale_sources(index, assets_dir)
+        if stale:
+            print(f"Atlas d'images périmé ({', '.join(stale[:3])}...) : relancer py atlas.py")
+            return None
+        try:
+            image = tk.PhotoImage(file=os.path.join(assets_dir, ATLAS_IMAGE))
+        except tk.TclError as e:
+            print(f"Erreur lors du chargement de l'atlas d'images: {e}")
+            return None
+        return cls(image, index["sprites"])
+
+    def has(self, path, size):
+        return sprite_key(path, size) in self.sprites
+
+    def photo(self, path, size):
+        key = sprite_key(path, size)
+        photo = self.photos.get(key)
+        if photo is None:
+            rect = self.sprites.get(key)
+            if rect is None:
+                return None
+            import tkinter as tk
+            x, y, w, h = rect
+            photo = tk.PhotoImage(width=w, height=h)
+            photo.tk.call(photo, "copy", self.image, "-from", x, y, x + w, y + h)
+            self.photos[key] = photo
+        return photo
+
+    def portraits(self):
+        prefix = PORTRAIT_DIR + "/"
+        suffix = "@{}x{}".format(*PORTRAIT_SIZE)
+        return sorted(key[:-len(suffix)] for key in self.sprites if key.startswith(prefix) and key.endswith(suffix))
+
+
+class AtlasPortraits:
+    """
+    Portraits servis depuis l'atlas, avec la même interface que sprites.SpritePool :
+    tout est déjà décodé, il n'y a ni thread ni cache à gérer.
+    """
+
+    def __init__(self, atlas, rng=None):
+        self.atlas = atlas
+        self.rng = rng or random.Random()
+        self.files = atlas.portraits()
+        self.hits = 0
+
+    def warm_up(self):
+        pass
+
+    def prefetch(self):
+        pass
+
+    def get(self):
+        if not self.files:
+            return None
+        self.hits += 1
+        return self.atlas.photo(self.rng.choice(self.files), PORTRAIT_SIZE)
+
+    def stats(self):
+        return {"hits": self.hits, "files": len(self.files), "source": "atlas"}
+
+    def close(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construction de l'atlas d'images")
+    parser.add_argument("--assets", default=ASSETS_DIR)
+    parser.add_argument("--check", action="store_true", help="échoue si l'atlas est absent ou périmé")
+    args = parser.parse_args()
+
+    if args.check:
+        index = load_index(args.assets)
+        if index is None:
+            print("ÉCHEC : atlas absent, lancer py atlas.py")
+            sys.exit(1)
+        stale = stale_sources(index, args.assets)
+        if stale:
+            print(f"ÉCHEC : atlas périmé, images modifiées : {', '.join(stale)}")
+            sys.exit(1)
+        print(f"OK : atlas à jour ({len(index['sprites'])} images)")
+        return
+
+    index = build(args.assets)
+    total = sum(os.path.getsize(os.path.join(args.assets, path)) for path in index["sources"])
+    atlas_size = os.path.getsize(os.path.join(args.assets, ATLAS_IMAGE))
+    print(f"Atlas construit : {len(index['sprites'])} images, {total / 1024:.0f} Ko de sources -> "
+          f"{atlas_size / 1024:.0f} Ko")
+
+
+if __name__ == "__main__":
+    main()
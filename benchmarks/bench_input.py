@@ -0,0 +1,98 @@
+"""
+Banc d'essai clavier : rejoue des séquences de touches aléatoires contre la vraie
+interface et mesure la latence de bout en bout (de l'appui jusqu'à la fin des
+redessins déclenchés).
+
+Les messages étant affichés dans la fenêtre (overlay.py) et non dans des boîtes
+modales, une partie complète peut être jouée au clavier sans intervention : règles,
+défaites, quiz et saisie du nom se ferment avec Entrée ou Échap. En fin de partie le
+jeu revient au menu et une nouvelle partie est lancée.
+
+Le jeu est créé avec un dossier de données temporaire : la base des scores, la
+sauvegarde continue, les parties enregistrées et la télémétrie n'y touchent jamais
+assets/. Un écran est nécessaire ; sans affichage disponible, la mesure est ignorée.
+
+Exemple : py benchmarks/bench_input.py --keys 5000 --seed 1
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KEYS = ("<Left>", "<Right>", "<Return>", "<Escape>", "<i>", "<Up>", "<Down>")
+# Les choix et le passage à la carte suivante sont plus fréquents que les autres touches
+WEIGHTS = (6, 6, 6, 1, 1, 2, 2)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def replay(app, keys):
+    """Envoie chaque touche au widget qui a le focus ; renvoie les latences (ns) par touche."""
+    latencies = {key: [] for key in KEYS}
+    games = 0
+    for key in keys:
+        if app.current_frame == "MenuFrame" and not app.overlay.active:
+            app.menu_frame.start_game()
+            games += 1
+        widget = app.focus_get() or app
+        start = time.perf_counter_ns()
+        widget.event_generate(key)
+        # Traite les rappels en attente (rendu regroupé, animations échues)
+        app.update()
+        latencies[key].append(time.perf_counter_ns() - start)
+    return latencies, games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence clavier de bout en bout")
+    parser.add_argument("--keys", type=int, default=2000, help="nombre de touches à rejouer")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.mkdtemp(prefix="anacofinance-")
+    try:
+        import main as game
+        app = game.SeriousGame(data_dir=workdir)
+    except Exception as e:
+        print(f"Mesure ignorée (pas d'affichage ?) : {e}")
+        shutil.rmtree(workdir, ignore_errors=True)
+        return
+
+    app.close_on_game_over = False
+    app.update()
+    app.focus_force()
+
+    rng = random.Random(args.seed)
+    keys = rng.choices(KEYS, weights=WEIGHTS, k=args.keys)
+    start = time.perf_counter()
+    latencies, games = replay(app, keys)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.keys} touches en {elapsed:.2f} s, {games} partie(s) lancée(s)")
+    every = sorted(ns for values in latencies.values() for ns in values)
+    for key, values in list(latencies.items()) + [("toutes", every)]:
+        if not values:
+            continue
+        values = sorted(values)
+        print(f"{key:>10} : n={len(values):6d}  p50={percentile(values, 0.50) / 1e6:7.2f} ms  "
+              f"p99={percentile(values, 0.99) / 1e6:7.2f} ms  max={values[-1] / 1e6:7.2f} ms")
+
+    app.session.close()
+    app.recordings.close()
+    app.telemetry.close()
+    if app.score_store is not None:
+        app.score_store.close()
+    app.destroy()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
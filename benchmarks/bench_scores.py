@@ -0,0 +1,89 @@
+"""
+Mesure la latence d'enregistrement d'un score en fonction du nombre de scores déjà
+stockés, jusqu'à 1 million de lignes, et la compare à l'ancienne réécriture de scores.json.
+
+Exemple : py benchmarks/bench_scores.py --rows 1000000
+Le script échoue (code 1) si la latence à la taille maximale dépasse `--max-ratio` fois
+la latence mesurée sur une petite base.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scores import ScoreStore  # noqa: E402
+
+
+def fill(store, count, rng):
+    batch = 50000
+    while count > 0:
+        size = min(batch, count)
+        store.add_many([(f"joueur{rng.randrange(10000)}", rng.randrange(200),
+                         f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} 12:00:00")
+                        for _ in range(size)])
+        count -= size
+
+
+def save_latency(store, samples=50):
+    """Latence médiane (ms) d'un enregistrement isolé, comme à la fin d'une partie."""
+    timings = []
+    for i in range(samples):
+        start = time.perf_counter()
+        store.add(f"bench{i}", i)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def legacy_latency(path, rows):
+    """Latence (ms) de l'ancienne méthode : relire puis réécrire tout scores.json."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{"name": "x", "score": i, "date": "2025-01-01 12:00:00"} for i in range(rows)], f, indent=4)
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        scores = json.load(f)
+    scores.append({"name": "bench", "score": 1, "date": "2025-01-01 12:00:00"})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(scores, f, indent=4)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark d'enregistrement des scores")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    checkpoints = [n for n in (1000, 10000, 100000, 1000000) if n < args.rows] + [args.rows]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ScoreStore(os.path.join(tmp, "scores.db"))
+        filled = 0
+        results = []
+        for rows in checkpoints:
+            fill(store, rows - filled, rng)
+            filled = rows
+            latency = save_latency(store)
+            legacy = legacy_latency(os.path.join(tmp, "scores.json"), rows) if rows <= 100000 else None
+            results.append((rows, latency))
+            legacy_text = f"{legacy:9.2f} ms" if legacy is not None else "        -"
+            print(f"{rows:>9} scores | SQLite {latency:7.2f} ms | scores.json {legacy_text}")
+            start = time.perf_counter()
+            store.top(10)
+            print(f"{'':>9}          top 10 en {(time.perf_counter() - start) * 1000:.2f} ms")
+        store.close()
+
+    ratio = results[-1][1] / results[0][1]
+    print(f"Rapport de latence {results[-1][0]} / {results[0][0]} scores : {ratio:.2f}")
+    if ratio > args.max_ratio:
+        print(f"ÉCHEC : la latence d'enregistrement n'est pas stable (limite {args.max_ratio})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Générateur de charge pour server.py : des joueurs simulés se connectent en même temps,
+jouent des parties complètes (choix aléatoires, quiz répondu au hasard, score
+enregistré) et la latence de chaque tour (envoi du choix -> réception de la réponse)
+est mesurée.
+
+Sans --connect, un serveur est lancé dans un processus séparé sur un port libre de
+localhost, avec une base de scores et un dossier de parties temporaires.
+
+Exemple : py benchmarks/bench_server.py --clients 200 --turns 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def player(host, port, turns, rng, latencies, totals):
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readline()  # hello
+
+    async def request(message):
+        writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    reply = await request({"cmd": "new"})
+    clock = time.perf_counter_ns
+    played = 0
+    while played < turns:
+        if reply["type"] == "error":
+            raise RuntimeError(reply["message"])
+        if "card" in reply:
+            start = clock()
+            reply = await request({"cmd": "choose", "choice": rng.choice("AB")})
+            latencies.append(clock() - start)
+            played += 1
+        elif "quiz" in reply:
+            reply = await request({"cmd": "quiz", "answers": [rng.choice("ABCD") for _ in reply["quiz"]]})
+        else:
+            totals["games"] += 1
+            if reply.get("final_score"):
+                await request({"cmd": "save", "name": f"élève {rng.randrange(1000)}"})
+                totals["saved"] += 1
+            reply = await request({"cmd": "new"})
+    writer.write(b'{"cmd": "quit"}\n')
+    await writer.drain()
+    writer.close()
+
+
+async def run(host, port, clients, turns, seed):
+    latencies = []
+    totals = {"games": 0, "saved": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(player(host, port, turns, random.Random(f"{seed}:{i}"), latencies, totals)
+                           for i in range(clients)))
+    return latencies, totals, time.perf_counter() - start
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, workdir):
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--port", str(port),
+                                "--scores", os.path.join(workdir, "scores.db"),
+                                "--recordings", os.path.join(workdir, "recordings"), "--policy", ""],
+                               cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    # Le serveur annonce son adresse quand il est prêt
+    line = process.stdout.readline()
+    if not line:
+        raise RuntimeError("le serveur n'a pas démarré")
+    print(line.strip())
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Charge et latence du serveur de classe")
+    parser.add_argument("--clients", type=int, default=200, help="connexions simultanées")
+    parser.add_argument("--turns", type=int, default=200, help="tours joués par connexion")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--connect", help="hôte:port d'un serveur déjà lancé")
+    args = parser.parse_args()
+
+    process = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        host, port = "127.0.0.1", free_port()
+        process = start_server(port, tempfile.mkdtemp(prefix="anacofinance-"))
+    try:
+        latencies, totals, elapsed = asyncio.run(run(host, port, args.clients, args.turns, args.seed))
+    finally:
+        if process is not None:
+            # Arrêt propre (hors Windows) : le serveur écrit les scores en attente avant de quitter
+            if os.name == "nt":
+                process.terminate()
+            else:
+                process.send_signal(signal.SIGINT)
+            print(process.communicate(timeout=30)[0].strip())
+
+    latencies.sort()
+    print(f"{args.clients} connexions, {len(latencies)} tours en {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:.0f} tours/s), {totals['games']} parties, {totals['saved']} scores envoyés")
+    print(f"latence par tour : p50={percentile(latencies, 0.50) / 1e6:.2f} ms  "
+          f"p99={percentile(latencies, 0.99) / 1e6:.2f} ms  max={latencies[-1] / 1e6:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Test de non-régression du temps de démarrage : lance le jeu dans un processus séparé
+avec --startup-benchmark, qui affiche les durées des phases de démarrage en JSON et
+quitte juste après le premier affichage du menu.
+
+Exemple : py benchmarks/bench_startup.py --budget 1500 --runs 5
+Le script échoue (code 1) si le temps médian jusqu'au menu dépasse le budget (ms).
+Un écran est nécessaire ; sans affichage disponible, la mesure est ignorée.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure():
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), "--startup-benchmark"],
+                            cwd=ROOT, capture_output=True, text=True, timeout=60)
+    for line in result.stdout.splitlines():
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "aucune mesure")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du temps d'affichage du menu")
+    parser.add_argument("--budget", type=float, default=1500.0, help="budget en ms jusqu'au menu")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        try:
+            runs.append(measure())
+        except Exception as e:
+            print(f"Mesure ignorée (pas d'affichage ?) : {e}")
+            return
+    for phase in runs[0]:
+        values = sorted(run[phase] for run in runs)
+        print(f"{phase:>14} : {values[len(values) // 2]:8.1f} ms (médiane)")
+
+    painted = sorted(run["menu_painted"] for run in runs)[len(runs) // 2]
+    if painted > args.budget:
+        print(f"ÉCHEC : menu affiché en {painted:.1f} ms, budget {args.budget:.0f} ms")
+        sys.exit(1)
+    print(f"OK : menu affiché en {painted:.1f} ms (budget {args.budget:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Mesure le coût d'un évènement de télémétrie sur le thread de l'interface (ce qu'ajoute
+TelemetryRecorder.decision à un choix) et vérifie qu'il n'alloue rien de durable :
+la mémoire suivie par tracemalloc ne doit pas grandir avec le nombre d'évènements.
+
+Exemple : py benchmarks/bench_telemetry.py --events 200000
+Le script échoue (code 1) si le coût médian dépasse `--max-us` microsecondes.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import telemetry  # noqa: E402
+
+
+def measure(recorder, events, batch=1000):
+    """Renvoie la durée moyenne par évènement (µs) de chaque lot de `batch` évènements."""
+    costs = []
+    for start in range(0, events, batch):
+        t0 = time.perf_counter_ns()
+        for i in range(start, start + batch):
+            recorder.decision(i % 40, "A")
+        costs.append((time.perf_counter_ns() - t0) / batch / 1000)
+    return sorted(costs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût d'un évènement de télémétrie")
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--max-us", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="anacofinance-") as workdir:
+        recorder = telemetry.TelemetryRecorder(workdir, capacity=65536, flush_interval=0.05)
+        recorder.begin_game()
+        costs = measure(recorder, args.events)
+        median = costs[len(costs) // 2]
+
+        tracemalloc.start()
+        recorder.decision(0, "A")
+        before = tracemalloc.get_traced_memory()[0]
+        measure(recorder, args.events // 4)
+        recorder.flush()
+        growth = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        recorder.close()
+        written = sum(1 for _ in telemetry.iter_records(telemetry.list_files(workdir)))
+
+    print(f"{args.events} évènements : médiane {median:.2f} µs, p99 {costs[int(0.99 * len(costs))]:.2f} µs "
+          f"par évènement")
+    print(f"Mémoire après {args.events // 4} évènements de plus : {growth:+d} octets ; "
+          f"{written} écrits sur disque, {recorder.dropped} perdus (tampon plein)")
+    if median > args.max_us:
+        print(f"ÉCHEC : {median:.2f} µs > {args.max_us} µs")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Suite de benchmarks des chemins critiques du jeu, sans affichage nécessaire :
+
+- images : décodage et redimensionnement des portraits (le travail de
+  load_image_from_file), parcours du dossier des personnages, vérification de l'atlas ;
+  avec un écran, load_image_from_file et get_random_character_image sont aussi mesurées ;
+- decks : chargement de cards.json / quiz.json (JSON brut, compilation, paquet déjà compilé) ;
+- engine : tirage d'une carte et application d'un choix ;
+- scores : enregistrement d'un score et requêtes du tableau sur 10k / 100k / 1M scores ;
+- quiz : tirage des questions de la seconde chance dans une banque de 50 000 questions.
+
+Chaque mesure est une durée par appel (plus petit = meilleur), enregistrée sous un nom
+"cas.mesure" : comme timeit, la meilleure de plusieurs séries d'appels, moins sensible
+au bruit de la machine que la moyenne (médiane pour l'enregistrement d'un score, dont la
+durée dépend surtout du disque). --save écrit les résultats dans un fichier JSON de
+référence ; --compare les compare à une référence et échoue (code 1) si une mesure est
+plus lente de plus de --threshold (20 % par défaut). Avant d'échouer, les cas en
+régression sont relancés (--retries) en gardant la meilleure valeur de chaque mesure :
+un vrai ralentissement se reproduit, un à-coup de la machine non.
+
+Exemples :
+    py benchmarks/suite.py --save benchmarks/baseline.json
+    py benchmarks/suite.py --compare benchmarks/baseline.json
+    py benchmarks/suite.py --only engine,quiz --scores 10000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import atlas  # noqa: E402
+import deckpack  # noqa: E402
+import engine  # noqa: E402
+import questionbank  # noqa: E402
+from scores import ScoreStore  # noqa: E402
+
+BASELINE_VERSION = 1
+SCORE_SIZES = (10000, 100000, 1000000)
+BANK_SIZE = 50000
+
+
+def timed_ms(fn, number=1, repeat=7, median=False):
+    """
+    Durée (ms) d'un appel à `fn` : `repeat` séries de `number` appels, la meilleure série
+    (ou la série médiane avec `median=True`) divisée par `number`.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) * 1000 / number)
+    timings.sort()
+    return timings[len(timings) // 2] if median else timings[0]
+
+
+def per_call_us(fn, number, repeat=7):
+    """Durée (µs) d'un appel, mesurée sur des séries de `number` appels."""
+    return timed_ms(fn, number, repeat) * 1000
+
+
+# --- Cas mesurés -------------------------------------------------------------------
+
+def bench_images(workdir, args):
+    from sprites import decode_image
+    character_dir = os.path.join(ROOT, "assets", "character")
+    portraits = [os.path.join(character_dir, f) for f in sorted(os.listdir(character_dir))
+                 if f.lower().endswith(atlas.IMAGE_EXTENSIONS)]
+    results = {
+        "decode_resize_ms": timed_ms(lambda: [decode_image(p, atlas.PORTRAIT_SIZE) for p in portraits])
+        / len(portraits),
+        "list_characters_us": per_call_us(lambda: random.choice(
+            [f for f in os.listdir(character_dir) if f.lower().endswith(atlas.IMAGE_EXTENSIONS)]), 200),
+    }
+    index = atlas.load_index()
+    if index is not None:
+        results["atlas_check_ms"] = timed_ms(lambda: atlas.stale_sources(index), number=10)
+
+    # Avec un écran : les fonctions du jeu elles-mêmes (PhotoImage nécessite Tk)
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception:
+        return results
+    import main as game
+    cwd = os.getcwd()
+    os.chdir(workdir)  # cache des images redimensionnées (.cache/images) dans le dossier temporaire
+    try:
+        def cold():
+            shutil.rmtree(game.IMAGE_CACHE_DIR, ignore_errors=True)
+            game.load_image_from_file(portraits[0], atlas.PORTRAIT_SIZE)
+        results["load_image_cold_ms"] = timed_ms(cold)
+        results["load_image_cached_ms"] = timed_ms(
+            lambda: game.load_image_from_file(portraits[0], atlas.PORTRAIT_SIZE), number=10)
+        results["random_character_ms"] = timed_ms(
+            lambda: game.get_random_character_image(character_dir, atlas.PORTRAIT_SIZE), number=10)
+    finally:
+        os.chdir(cwd)
+        root.destroy()
+    return results
+
+
+def bench_decks(workdir, args):
+    results = {}
+    for name in ("cards.json", "quiz.json"):
+        source = os.path.join(workdir, name)
+        shutil.copy(os.path.join(ROOT, name), source)
+        kind = deckpack.KIND_CARDS if name == "cards.json" else deckpack.KIND_QUIZ
+        stem = os.path.splitext(name)[0]
+
+        def compile_source():
+            os.remove(deckpack.cache_path(source))
+            deckpack.load(source, kind)
+
+        deckpack.load(source, kind)
+        results[f"{stem}_json_ms"] = timed_ms(lambda: engine.load_json(source), number=50)
+        results[f"{stem}_compile_ms"] = timed_ms(compile_source, number=20)
+        results[f"{stem}_mapped_ms"] = timed_ms(lambda: deckpack.load(source, kind), number=100)
+    return results
+
+
+def bench_engine(workdir, args):
+    cards = deckpack.load_cards(os.path.join(ROOT, "cards.json"))
+    game = engine.GameEngine(cards, rng=random.Random(0), scheduler="shuffle")
+    rng = random.Random(1)
+
+    def turn():
+        game.draw_card()
+        if game.apply_choice("A" if rng.random() < 0.5 else "B") != engine.CONTINUE:
+            game.reset()
+
+    return {
+        "draw_card_us": per_call_us(game.draw_card, 20000),
+        "turn_us": per_call_us(turn, 20000),
+        "compile_effects_us": per_call_us(lambda: engine.compile_effects(cards), 200),
+    }
+
+
+def bench_scores(workdir, args):
+    results = {}
+    rng = random.Random(0)
+    store = ScoreStore(os.path.join(workdir, "scores.db"))
+    filled = 0
+    try:
+        for size in args.scores:
+            while filled < size:
+                batch = min(50000, size - filled)
+                store.add_many([(f"joueur{rng.randrange(10000)}", rng.randrange(200),
+                                 f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} 12:00:00")
+                                for _ in range(batch)])
+                filled += batch
+            label = f"{size // 1000}k" if size < 1000000 else f"{size // 1000000}M"
+            results[f"save_{label}_ms"] = timed_ms(lambda: store.add("bench", 42), repeat=21, median=True)
+            results[f"top10_{label}_ms"] = timed_ms(lambda: store.top(10), number=20)
+            first_page = store.page(50)
+            results[f"next_page_{label}_ms"] = timed_ms(lambda: store.page(50, after=first_page[-1]), number=20)
+            results[f"filtered_page_{label}_ms"] = timed_ms(lambda: store.page(50, name="joueur12"), number=5)
+            results[f"count_{label}_ms"] = timed_ms(lambda: store.count(date_from="2025-06-01"), number=5)
+            # Les enregistrements du banc d'essai comptent dans la taille suivante
+            filled += 21
+    finally:
+        store.close()
+    return results
+
+
+def bench_quiz(workdir, args):
+    rng = random.Random(0)
+    path = os.path.join(workdir, "bank.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(BANK_SIZE):
+            f.write(json.dumps({"question": f"Question {i} ?", "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
+                                "answer": "ABCD"[i % 4], "explanation": "...",
+                                "topic": f"thème {i % 8}", "difficulty": i % 3 + 1}) + "\n")
+    quiz_path = os.path.join(ROOT, "quiz.json")
+
+    def compile_bank():
+        if os.path.exists(deckpack.cache_path(path)):
+            os.remove(deckpack.cache_path(path))
+        questionbank.QuestionBank.load([path])
+
+    results = {"bank_compile_ms": timed_ms(compile_bank, repeat=3)}
+    results["bank_load_ms"] = timed_ms(lambda: questionbank.QuestionBank.load([quiz_path, path]))
+    bank = questionbank.QuestionBank.load([quiz_path, path])
+    history = questionbank.QuizHistory()
+    results["sample_us"] = per_call_us(lambda: bank.sample(engine.QUIZ_SIZE, rng, history), 1000)
+    results["sample_filtered_us"] = per_call_us(
+        lambda: bank.sample(engine.QUIZ_SIZE, rng, history, topic="thème 3", difficulty=2), 1000)
+    small = questionbank.QuestionBank.load([quiz_path])
+    game = engine.GameEngine(deckpack.load_cards(os.path.join(ROOT, "cards.json")), small, rng=rng)
+    results["sample_quiz_json_us"] = per_call_us(game.sample_quiz, 1000)
+    return results
+
+
+CASES = {
+    "images": bench_images,
+    "decks": bench_decks,
+    "engine": bench_engine,
+    "scores": bench_scores,
+    "quiz": bench_quiz,
+}
+
+
+# --- Références --------------------------------------------------------------------
+
+def compare(results, baseline, threshold):
+    """Renvoie les lignes (nom, référence, actuel, écart) et la liste des régressions."""
+    rows, regressions = [], []
+    for name, value in sorted(results.items()):
+        old = baseline.get(name)
+        if old is None or old <= 0:
+            rows.append((name, old, value, None))
+            continue
+        change = value / old - 1
+        rows.append((name, old, value, change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def run_cases(names, args):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="anacofinance-bench-") as workdir:
+        for name in names:
+            start = time.perf_counter()
+            for metric, value in CASES[name](workdir, args).items():
+                results[f"{name}.{metric}"] = round(value, 4)
+            print(f"[{name}] terminé en {time.perf_counter() - start:.1f} s", flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks ANACOFINANCE")
+    parser.add_argument("--only", help=f"cas à lancer, séparés par des virgules ({', '.join(CASES)})")
+    parser.add_argument("--scores", default=",".join(str(n) for n in SCORE_SIZES),
+                        help="tailles de la base de scores, séparées par des virgules")
+    parser.add_argument("--save", help="écrit les résultats dans ce fichier de référence JSON")
+    parser.add_argument("--compare", help="compare les résultats à ce fichier de référence JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="ralentissement toléré (0.2 = 20 %%)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="nouveaux essais des cas en régression avant d'échouer")
+    args = parser.parse_args()
+    args.scores = sorted(int(n) for n in args.scores.split(",") if n)
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"cas inconnus : {', '.join(unknown)}")
+
+    results = run_cases(names, args)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline["results"], args.threshold)
+        for attempt in range(args.retries):
+            if not regressions:
+                break
+            retry = sorted({name.split(".", 1)[0] for name in regressions})
+            print(f"Régression possible, nouvel essai ({attempt + 1}/{args.retries}) : {', '.join(retry)}")
+            for name, value in run_cases(retry, args).items():
+                results[name] = min(results.get(name, value), value)
+            rows, regressions = compare(results, baseline["results"], args.threshold)
+        print(f"\nComparaison avec {args.compare} ({baseline.get('date', '?')}, {baseline.get('machine', '?')})")
+        for name, old, value, change in rows:
+            change_text = "   nouveau" if change is None else f"{change:+9.1%}"
+            flag = "  <-- RÉGRESSION" if name in regressions else ""
+            old_text = f"{old:12.4f}" if old is not None else f"{'-':>12}"
+            print(f"{name:<36} {old_text} {value:12.4f} {change_text}{flag}")
+    else:
+        regressions = []
+        print()
+        for name, value in sorted(results.items()):
+            print(f"{name:<36} {value:12.4f}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"version": BASELINE_VERSION, "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                       "machine": f"{platform.node()} / {platform.python_version()}",
+                       "results": results}, f, indent=1, sort_keys=True)
+        print(f"Référence enregistrée dans {args.save}")
+
+    if regressions:
+        print(f"ÉCHEC : {len(regressions)} mesure(s) plus lente(s) de plus de {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+Format binaire compilé pour les paquets de cartes et de questions.
+
+Un fichier .deck contient un en-tête (empreinte de la source JSON), un tableau
+d'enregistrements de taille fixe (indices de chaînes et effets entiers) puis une table
+de chaînes UTF-8. Il est projeté en mémoire (mmap) au lancement : les textes ne sont
+décodés qu'à l'accès, ce qui réduit le temps de démarrage et la mémoire résidente pour
+les gros paquets. Le fichier compilé n'est reconstruit que si la date de modification
+ou l'empreinte SHA-1 du JSON source change. Les sources peuvent être un tableau JSON ou
+un fichier JSON Lines (.jsonl, un objet par ligne) lu ligne à ligne, pour les grosses
+banques de questions.
+
+Les objets Card / Option / Question sont de simples vues (__slots__) qui exposent la
+même interface que les dictionnaires JSON (`card["optionA"]`, `card.get("hint", ...)`).
+
+Exemple (étape de build) : py deckpack.py cards.json quiz.json
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+
+import instrument
+from effects import option_effects
+
+
+MAGIC = b"ANAD"
+VERSION = 2
+KIND_CARDS = 1
+KIND_QUIZ = 2
+CACHE_DIR = ".cache"
+
+HEADER = struct.Struct("<4sHBxqQ20sI")  # magic, version, type, mtime_ns, taille, sha1, nombre
+CARD_RECORD = struct.Struct("<7I6i")  # question, hint, textes/explications A et B, extra, effets A et B
+QUIZ_RECORD = struct.Struct("<10I")  # question, answer, explanation, options A-D, extra, thème, difficulté
+U32 = struct.Struct("<I")
+ABSENT = 0xFFFFFFFF
+EFFECT_KEYS = ("budget", "bonheur", "epargne")
+QUIZ_OPTIONS = ("A", "B", "C", "D")
+CARD_KEYS = {"question", "hint", "optionA", "optionB"}
+OPTION_KEYS = {"text", "explanation", "effects"}
+QUIZ_KEYS = {"question", "answer", "explanation", "options", "topic", "difficulty"}
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def add(self, value):
+        if value is None:
+            return ABSENT
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+    def pack(self):
+        blobs = [s.encode("utf-8") for s in self.strings]
+        offsets, position = [], 0
+        for blob in blobs:
+            offsets.append(position)
+            position += len(blob)
+        offsets.append(position)
+        return U32.pack(len(blobs)) + struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(blobs)
+
+
+def _extra(item, known):
+    extra = {k: v for k, v in item.items() if k not in known}
+    return json.dumps(extra, ensure_ascii=False, sort_keys=True) if extra else None
+
+
+def _extra_options(card):
+    extra = {}
+    for name in ("optionA", "optionB"):
+        option_extra = {k: v for k, v in card[name].items() if k not in OPTION_KEYS}
+        if option_extra:
+            extra[name] = option_extra
+    return extra
+
+
+def compile_items(items, kind):
+    """Renvoie (enregistrements, table de chaînes, nombre) compilés pour des dictionnaires JSON."""
+    strings = _StringTable()
+    records = []
+    for item in items:
+        if kind == KIND_CARDS:
+            a, b = item["optionA"], item["optionB"]
+            extra = {k: v for k, v in item.items() if k not in CARD_KEYS}
+            option_extra = _extra_options(item)
+            if option_extra:
+                extra["_options"] = option_extra
+            records.append(CARD_RECORD.pack(
+                strings.add(item.get("question")), strings.add(item.get("hint")),
+                strings.add(a.get("text")), strings.add(a.get("explanation")),
+                strings.add(b.get("text")), strings.add(b.get("explanation")),
+                strings.add(json.dumps(extra, ensure_ascii=False, sort_keys=True) if extra else None),
+                # L'ancienne clé "loisirs" est ajoutée au bonheur dès la compilation
+                *option_effects(a), *option_effects(b)
+            ))
+        else:
+            options = item.get("options", {})
+            records.append(QUIZ_RECORD.pack(
+                strings.add(item.get("question")), strings.add(item.get("answer")),
+                strings.add(item.get("explanation")),
+                *(strings.add(options.get(o)) for o in QUIZ_OPTIONS),
+                strings.add(_extra(item, QUIZ_KEYS)),
+                strings.add(item.get("topic")),
+                ABSENT if item.get("difficulty") is None else int(item["difficulty"])
+            ))
+    return b"".join(records), strings.pack(), len(records)
+
+
+def iter_items(source):
+    """Parcourt les objets d'une source : tableau JSON, ou JSON Lines lu ligne à ligne."""
+    with open(source, "r", encoding="utf-8") as f:
+        if source.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def source_digest(path):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(block)
+    return sha1.digest()
+
+
+@instrument.timed("deck_build")
+def build(source, target, kind):
+    """
+    Compile `source` (JSON ou JSON Lines) vers `target` de façon atomique.
+    Renvoie (contenu compilé, True si le fichier a bien été écrit).
+    """
+    records, strings, count = compile_items(iter_items(source), kind)
+    stat = os.stat(source)
+    data = HEADER.pack(MAGIC, VERSION, kind, stat.st_mtime_ns, stat.st_size,
+                       source_digest(source), count) + records + strings
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+        return data, True
+    except OSError as e:
+        # Le fichier compilé peut être projeté par une autre instance (Windows) : on garde
+        # le résultat en mémoire pour cette fois
+        print(f"Impossible d'écrire le paquet compilé {target}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return data, False
+
+
+def cache_path(source):
+    directory, name = os.path.split(os.path.abspath(source))
+    return os.path.join(directory, CACHE_DIR, os.path.splitext(name)[0] + ".deck")
+
+
+def _is_fresh(source, target, kind):
+    """Vérifie l'en-tête du fichier compilé : date et taille, puis empreinte si besoin."""
+    try:
+        with open(target, "rb") as f:
+            header = f.read(HEADER.size)
+        magic, version, file_kind, mtime_ns, size, digest, count = HEADER.unpack(header)
+    except (OSError, struct.error):
+        return False
+    if magic != MAGIC or version != VERSION or file_kind != kind:
+        return False
+    stat = os.stat(source)
+    if stat.st_mtime_ns == mtime_ns and stat.st_size == size:
+        return True
+    if stat.st_size != size or source_digest(source) != digest:
+        return False
+    # Source touchée mais identique : seule la date de l'en-tête est mise à jour
+    try:
+        with open(target, "r+b") as f:
+            f.write(HEADER.pack(magic, version, file_kind, stat.st_mtime_ns, size, digest, count))
+    except OSError:
+        pass
+    return True
+
+
+@instrument.timed("deck_load")
+def load(source, kind):
+    """Renvoie le paquet compilé projeté en mémoire, reconstruit si la source a changé."""
+    target = cache_path(source)
+    if not _is_fresh(source, target, kind):
+        data, written = build(source, target, kind)
+        if not written:
+            return _make_deck(data, kind)
+    with open(target, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _make_deck(buffer, kind)
+
+
+def load_cards(path):
+    return load(path, KIND_CARDS)
+
+
+def load_quiz(path):
+    return load(path, KIND_QUIZ)
+
+
+def _make_deck(buffer, kind):
+    return CardDeck(buffer) if kind == KIND_CARDS else QuestionDeck(buffer)
+
+
+class _Deck(Sequence):
+    RECORD = None
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        *_, self.count = HEADER.unpack_from(buffer, 0)
+        self.records_offset = HEADER.size
+        strings_offset = self.records_offset + self.count * self.RECORD.size
+        (n_strings,) = U32.unpack_from(buffer, strings_offset)
+        self.offsets_offset = strings_offset + U32.size
+        self.blob_offset = self.offsets_offset + (n_strings + 1) * U32.size
+
+    def __len__(self):
+        return self.count
+
+    def record(self, i):
+        return self.RECORD.unpack_from(self.buffer, self.records_offset + i * self.RECORD.size)
+
+    def string(self, index):
+        if index == ABSENT:
+            return None
+        start, end = struct.unpack_from("<2I", self.buffer, self.offsets_offset + index * U32.size)
+        return bytes(self.buffer[self.blob_offset + start:self.blob_offset + end]).decode("utf-8")
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return self.ITEM(self, i)
+
+
+class _View:
+    """Interface commune des vues : accès comme un dictionnaire JSON en lecture seule."""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+
+_MISSING = object()
+
+
+class Option(_View):
+    __slots__ = ("deck", "index", "side")
+
+    def __init__(self, deck, index, side):
+        self.deck, self.index, self.side = deck, index, side
+
+    def get(self, key, default=None):
+        record = self.deck.record(self.index)
+        if key == "text":
+            value = self.deck.string(record[2 + 2 * self.side])
+        elif key == "explanation":
+            value = self.deck.string(record[3 + 2 * self.side])
+        elif key == "effects":
+            return dict(zip(EFFECT_KEYS, record[7 + 3 * self.side:10 + 3 * self.side]))
+        else:
+            extra = self.deck.extra(record).get("_options", {}).get("option" + "AB"[self.side], {})
+            value = extra.get(key)
+        return default if value is None else value
+
+    def keys(self):
+        keys = [k for k in ("text", "explanation") if self.get(k) is not None] + ["effects"]
+        extra = self.deck.extra(self.deck.record(self.index)).get("_options", {})
+        return keys + list(extra.get("option" + "AB"[self.side], {}))
+
+
+class Card(_View):
+    __slots__ = ("deck", "index")
+
+    def __init__(self, deck, index):
+        self.deck, self.index = deck, index
+
+    def get(self, key, default=None):
+        if key == "optionA":
+            return Option(self.deck, self.index, 0)
+        if key == "optionB":
+            return Option(self.deck, self.index, 1)
+        record = self.deck.record(self.index)
+        if key == "question":
+            value = self.deck.string(record[0])
+        elif key == "hint":
+            value = self.deck.string(record[1])
+        elif key == "_options":
+            value = None
+        else:
+            value = self.deck.extra(record).get(key)
+        return default if value is None else value
+
+    def keys(self):
+        extra = self.deck.extra(self.deck.record(self.index))
+        return ([k for k in ("question", "hint") if self.get(k) is not None] + ["optionA", "optionB"]
+                + [k for k in extra if k != "_options"])
+
+    def to_dict(self):
+        data = super().to_dict()
+        data["optionA"] = data["optionA"].to_dict()
+        data["optionB"] = data["optionB"].to_dict()
+        return data
+
+
+class Question(_View):
+    __slots__ = ("deck", "index")
+
+    def __init__(self, deck, index):
+        self.deck, self.index = deck, index
+
+    def get(self, key, default=None):
+        record = self.deck.record(self.index)
+        if key == "question":
+            value = self.deck.string(record[0])
+        elif key == "answer":
+            value = self.deck.string(record[1])
+        elif key == "explanation":
+            value = self.deck.string(record[2])
+        elif key == "options":
+            value = {o: self.deck.string(i) for o, i in zip(QUIZ_OPTIONS, record[3:7]) if i != ABSENT}
+        elif key == "topic":
+            value = self.deck.string(record[8])
+        elif key == "difficulty":
+            value = None if record[9] == ABSENT else record[9]
+        else:
+            value = self.deck.extra(record).get(key)
+        return default if value is None else value
+
+    def keys(self):
+        extra = self.deck.extra(self.deck.record(self.index))
+        return [k for k in ("question", "answer", "explanation", "options", "topic", "difficulty")
+                if self.get(k) is not None] + list(extra)
+
+
+class CardDeck(_Deck):
+    RECORD = CARD_RECORD
+    ITEM = Card
+
+    def extra(self, record):
+        text = self.string(record[6])
+        return json.loads(text) if text else {}
+
+    def effects(self):
+        """Effets ((A), (B)) de toutes les cartes, lus directement dans les enregistrements."""
+        return [(tuple(r[7:10]), tuple(r[10:13])) for r in CARD_RECORD.iter_unpack(
+            self.buffer[self.records_offset:self.records_offset + self.count * CARD_RECORD.size])]
+
+
+class QuestionDeck(_Deck):
+    RECORD = QUIZ_RECORD
+    ITEM = Question
+
+    def extra(self, record):
+        text = self.string(record[7])
+        return json.loads(text) if text else {}
+
+
+def main():
+    for source in sys.argv[1:] or ["cards.json", "quiz.json"]:
+        first = next(iter_items(source), None)
+        kind = KIND_CARDS if first and "optionA" in first else KIND_QUIZ
+        target = cache_path(source)
+        data, _ = build(source, target, kind)
+        print(f"{source} -> {target} ({len(data)} octets)")
+
+
+if __name__ == "__main__":
+    main()
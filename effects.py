@@ -0,0 +1,165 @@
+"""
+Effets différés et récurrents des options (prêt remboursé sur plusieurs tours,
+investissement qui rapporte plus tard, intérêts périodiques...).
+
+Une option peut déclarer, en plus de ses `effects` immédiats :
+
+    "scheduled": [
+        {"delay": 1, "every": 1, "times": 10, "effects": {"budget": -3}},
+        {"delay": 8, "effects": {"budget": 20, "epargne": 10}}
+    ]
+
+`delay` : tours avant la première application (au moins 1) ; `every` : période pour un
+effet récurrent ; `times` : nombre d'applications (1 par défaut, illimité si `every`
+est donné sans `times`).
+
+Les évènements en attente sont rangés dans un tas trié par tour d'échéance : chaque
+tour ne dépile que les évènements échus, en O(log n) chacun. Pour la seconde chance du
+quiz, les opérations du tour en cours sont notées dans un journal d'annulation :
+`rollback()` remet dans le tas les évènements dépilés et marque comme annulés ceux
+ajoutés (annulation paresseuse : ils sont ignorés quand ils arrivent en tête).
+
+Le module lit aussi les effets immédiats des cartes (`compile_effects`) : il ne dépend
+pas du moteur, l'ordonnanceur et le compilateur de paquets peuvent donc l'utiliser.
+"""
+import heapq
+
+
+GAUGES = ("budget", "bonheur", "epargne")
+
+PUSH = 0
+POP = 1
+# Champs d'un évènement (liste mutable) : tour d'échéance, numéro d'ordre, variations,
+# période, applications restantes (None = illimité), actif
+DUE, SEQ, DELTA, EVERY, REMAINING, ALIVE = range(6)
+
+
+def option_effects(option):
+    """
+    Renvoie les effets d'une option (ou d'un effet programmé) sous forme de tuple
+    (budget, bonheur, epargne). L'ancienne clé "loisirs" est ajoutée au bonheur.
+    """
+    effects = option.get("effects", {})
+    return (effects.get("budget", 0),
+            effects.get("bonheur", 0) + effects.get("loisirs", 0),
+            effects.get("epargne", 0))
+
+
+def card_effects(card):
+    """Renvoie ((effets A), (effets B)) pour une carte."""
+    return option_effects(card["optionA"]), option_effects(card["optionB"])
+
+
+def compile_effects(cards):
+    """Précalcule les effets de toutes les cartes, dans l'ordre du paquet."""
+    if hasattr(cards, "effects"):
+        # Paquet compilé (deckpack) : effets lus directement dans les enregistrements
+        return cards.effects()
+    return [card_effects(card) for card in cards]
+
+
+def compile_schedule(option):
+    """Renvoie les effets programmés d'une option : tuple de (délai, période, nombre, variations)."""
+    compiled = []
+    for item in option.get("scheduled", ()):
+        delta = option_effects(item)
+        every = item.get("every")
+        times = item.get("times", None if every else 1)
+        compiled.append((max(1, int(item.get("delay", 1))), every, times, delta))
+    return tuple(compiled)
+
+
+def compile_schedules(cards):
+    """Effets programmés ((A), (B)) de toutes les cartes, dans l'ordre du paquet."""
+    return [(compile_schedule(card["optionA"]), compile_schedule(card["optionB"])) for card in cards]
+
+
+class EffectQueue:
+    def __init__(self):
+        self.heap = []
+        self.seq = 0
+        self.active = 0
+        self.cancelled = 0
+        self.journal = []
+        self.saved = None  # évènements au point de reprise, après une restauration de session
+
+    def __len__(self):
+        return self.active
+
+    def _push(self, entry):
+        self.seq += 1
+        entry[SEQ] = self.seq
+        heapq.heappush(self.heap, entry)
+        self.active += 1
+        self.journal.append((PUSH, entry))
+
+    def schedule(self, turn, schedule):
+        """Programme les effets `schedule` (voir compile_schedule) d'un choix fait au tour `turn`."""
+        for delay, every, times, delta in schedule:
+            self._push([turn + delay, 0, delta, every, times, True])
+
+    def advance(self, turn):
+        """Dépile les évènements échus au tour `turn` et renvoie la somme de leurs variations."""
+        budget = bonheur = epargne = 0
+        heap = self.heap
+        while heap and heap[0][DUE] <= turn:
+            entry = heapq.heappop(heap)
+            if not entry[ALIVE]:
+                self.cancelled -= 1
+                continue
+            self.active -= 1
+            self.journal.append((POP, entry))
+            delta = entry[DELTA]
+            budget += delta[0]
+            bonheur += delta[1]
+            epargne += delta[2]
+            remaining = entry[REMAINING]
+            if entry[EVERY] and (remaining is None or remaining > 1):
+                self._push([entry[DUE] + entry[EVERY], 0, delta, entry[EVERY],
+                            None if remaining is None else remaining - 1, True])
+        return budget, bonheur, epargne
+
+    def checkpoint(self):
+        """Début de tour : point de reprise unique (celui de la seconde chance du quiz)."""
+        self.journal.clear()
+        self.saved = None
+
+    def rollback(self):
+        """Annule les opérations faites depuis le dernier point de reprise."""
+        if self.saved is not None:
+            self.load(self.saved)
+            return
+        for op, entry in reversed(self.journal):
+            if op == PUSH:
+                entry[ALIVE] = False
+                self.active -= 1
+                self.cancelled += 1
+            else:
+                heapq.heappush(self.heap, entry)
+                self.active += 1
+        self.journal.clear()
+        # Les évènements annulés restent dans le tas ; on le compacte s'ils deviennent majoritaires
+        if self.cancelled > self.active:
+            self.heap = [entry for entry in self.heap if entry[ALIVE]]
+            heapq.heapify(self.heap)
+            self.cancelled = 0
+
+    def to_list(self, at_checkpoint=False):
+        """Évènements actifs, sérialisables en JSON ; `at_checkpoint` : tels qu'au point de reprise."""
+        if at_checkpoint and self.saved is not None:
+            return self.saved
+        entries = [entry for entry in self.heap if entry[ALIVE]]
+        if at_checkpoint:
+            pushed = {id(entry) for op, entry in self.journal if op == PUSH}
+            entries = [entry for entry in entries if id(entry) not in pushed]
+            entries.extend(entry for op, entry in self.journal if op == POP)
+        return sorted([entry[DUE], list(entry[DELTA]), entry[EVERY], entry[REMAINING]] for entry in entries)
+
+    def load(self, events, saved=None):
+        """Remplace les évènements en attente par `events` (liste de to_list)."""
+        self.heap = []
+        self.active = self.cancelled = 0
+        for due, delta, every, remaining in events:
+            self._push([due, 0, tuple(delta), every, remaining, True])
+        self.journal.clear()
+        self.saved = saved
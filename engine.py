@@ -0,0 +1,243 @@
+"""
+Moteur de jeu ANACOFINANCE, sans aucune dépendance à Tk.
+
+Contient les règles : jauges, tirage des cartes, détection de défaite et point de
+sauvegarde / retour arrière pour la seconde chance du quiz. Les effets différés et
+récurrents des options sont gérés par effects.EffectQueue. L'interface (main.py),
+le simulateur (simulate.py) et les outils d'analyse pilotent tous ce module.
+"""
+import base64
+import hashlib
+import json
+import random
+
+import instrument
+import scheduler as scheduling
+# Jauges et lecture des effets : définies dans effects.py, partagées avec scheduler.py
+from effects import GAUGES, EffectQueue, card_effects, compile_effects, compile_schedules, option_effects
+from eventlog import GameLog
+from questionbank import QuizHistory
+
+
+START_VALUE = 50
+QUIZ_SIZE = 10
+
+# Résultats possibles d'un choix
+CONTINUE = "continue"
+QUIZ = "quiz"
+GAME_OVER = "game_over"
+NO_DUE = (0, 0, 0)
+
+
+@instrument.timed("load_json")
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def deck_signature(effects, schedules):
+    """
+    Empreinte des effets immédiats et programmés du paquet : un état calculé ou
+    sauvegardé pour un autre paquet est ignoré.
+    """
+    return hashlib.sha1(json.dumps([effects, schedules]).encode("utf-8")).hexdigest()
+
+
+def is_lost(budget, bonheur, epargne):
+    return budget <= 0 or bonheur <= 0 or epargne <= 0
+
+
+class GameEngine:
+    """
+    État d'une partie : jauges, carte courante, historique des choix et utilisation
+    du quiz.
+
+    L'historique (eventlog.GameLog) enregistre, pour chaque décision, l'indice de carte,
+    le choix, les variations immédiates de jauges et les effets programmés appliqués ;
+    le score est le nombre de décisions prises. Le tirage des cartes est délégué à un
+    ordonnanceur (voir scheduler.py) qui partage le générateur `rng`. Les effets
+    programmés en attente sont dans `pending` (effects.EffectQueue), indexés par tour.
+    """
+
+    def __init__(self, cards, quiz_questions=(), rng=None, scheduler="uniform", effects=None, schedules=None):
+        self.cards = cards
+        self.quiz_questions = quiz_questions
+        # `effects` permet de partager entre plusieurs parties les effets déjà compilés du paquet
+        self.effects = compile_effects(cards) if effects is None else effects
+        self.schedules = compile_schedules(cards) if schedules is None else schedules
+        self.deck = deck_signature(self.effects, self.schedules)
+        self.rng = rng or random.Random()
+        self.scheduler_name = scheduler
+        self.scheduler = scheduling.make_scheduler(scheduler, cards, self.rng)
+        # Questions déjà vues par ce joueur (conservées d'une partie à l'autre)
+        self.quiz_history = QuizHistory()
+        self.reset()
+
+    def reset(self):
+        self.gauges = {"budget": START_VALUE, "bonheur": START_VALUE, "epargne": START_VALUE}
+        self.game_log = GameLog()
+        self.quiz_used = False
+        self.current_index = None
+        # Carte tirée, en attente d'un choix
+        self.awaiting = False
+        self.pending = EffectQueue()
+        self.checkpoint_state = None
+        self.checkpoint_log_index = None
+
+    @property
+    def score(self):
+        return len(self.game_log)
+
+    @property
+    def current_card(self):
+        if self.current_index is None:
+            return None
+        return self.cards[self.current_index]
+
+    def checkpoint(self):
+        """Mémorise le point de reprise de la seconde chance (début de tour)."""
+        gauges = self.gauges
+        self.checkpoint_state = (gauges["budget"], gauges["bonheur"], gauges["epargne"])
+        self.checkpoint_log_index = self.game_log.mark()
+        self.pending.checkpoint()
+
+    def draw_card(self):
+        """Mémorise le point de reprise puis tire une nouvelle carte. Renvoie son indice."""
+        self.checkpoint()
+        self.current_index = self.scheduler.draw(self.gauges)
+        self.awaiting = True
+        return self.current_index
+
+    def replay_choice(self, index, choice):
+        """
+        Rejoue une décision enregistrée (reprise de session). La carte est tirée à nouveau par
+        l'ordonnanceur restauré, qui avance ainsi exactement comme pendant la partie d'origine ;
+        lève ValueError si elle diffère de la carte enregistrée `index`.
+        """
+        if not self.awaiting:
+            self.draw_card()
+        if self.current_index != index:
+            raise ValueError(f"Journal incohérent : carte {index} enregistrée, {self.current_index} tirée")
+        return self.apply_choice(choice)
+
+    def apply_choice(self, choice):
+        """
+        Applique l'option "A" ou "B" de la carte courante.
+        Renvoie CONTINUE, QUIZ (première défaite : seconde chance) ou GAME_OVER.
+        """
+        if choice == "A":
+            side = 0
+        elif choice == "B":
+            side = 1
+        else:
+            raise ValueError(f"Choix inconnu : {choice!r}")
+        delta = self.effects[self.current_index][side]
+
+        # Effets programmés : ceux de ce choix, puis tous ceux qui arrivent à échéance ce tour-ci
+        turn = len(self.game_log) + 1
+        schedule = self.schedules[self.current_index][side]
+        if schedule:
+            self.pending.schedule(turn, schedule)
+        due = self.pending.advance(turn) if self.pending else NO_DUE
+
+        gauges = self.gauges
+        gauges["budget"] += delta[0] + due[0]
+        gauges["bonheur"] += delta[1] + due[1]
+        gauges["epargne"] += delta[2] + due[2]
+        self.game_log.append(self.current_index, choice, delta, due)
+        self.awaiting = False
+
+        if not is_lost(gauges["budget"], gauges["bonheur"], gauges["epargne"]):
+            return CONTINUE
+        if not self.quiz_used:
+            self.quiz_used = True
+            return QUIZ
+        return GAME_OVER
+
+    def swap_cards(self, cards, remap, effects=None, schedules=None):
+        """
+        Remplace le paquet en cours de partie (rechargement à chaud) sans toucher aux jauges
+        ni aux effets programmés. `remap[ancien indice]` donne le nouvel indice de chaque
+        carte, ou None si elle a été retirée. L'ordonnanceur est reconstruit pour le nouveau paquet.
+        """
+        effects = compile_effects(cards) if effects is None else effects
+        schedules = compile_schedules(cards) if schedules is None else schedules
+        scheduler = scheduling.make_scheduler(self.scheduler_name, cards, self.rng)
+        # Tout est prêt : le remplacement ne peut plus échouer à mi-chemin
+        self.cards, self.effects, self.schedules, self.scheduler = cards, effects, schedules, scheduler
+        self.deck = deck_signature(effects, schedules)
+        self.game_log.remap_cards(remap)
+        if self.current_index is not None:
+            self.current_index = remap[self.current_index]
+            self.awaiting = self.awaiting and self.current_index is not None
+
+    def snapshot(self):
+        """État complet de la partie, sérialisable en JSON (sauvegarde de session)."""
+        return {
+            "deck": self.deck,
+            "gauges": dict(self.gauges),
+            "quiz_used": self.quiz_used,
+            "log": base64.b64encode(self.game_log.to_bytes()).decode("ascii"),
+            "scheduler": self.scheduler.get_state(),
+            # Carte déjà tirée mais pas encore jouée (instantané pris en cours de tour)
+            "current": self.current_index if self.awaiting else None,
+            "effects": self.pending.to_list(),
+            "checkpoint": {
+                "gauges": list(self.checkpoint_state) if self.checkpoint_state else None,
+                "log_index": self.checkpoint_log_index,
+                "effects": self.pending.to_list(at_checkpoint=True),
+            },
+        }
+
+    def restore(self, state):
+        """
+        Restaure un état produit par `snapshot`. Lève ValueError si l'état a été sauvegardé
+        pour un autre paquet ; en cas d'erreur, la partie en cours n'est pas modifiée.
+        """
+        if state.get("deck") != self.deck:
+            raise ValueError("Sauvegarde faite pour un autre paquet de cartes")
+        game_log = GameLog.from_bytes(base64.b64decode(state["log"]))
+        scheduler = scheduling.make_scheduler(self.scheduler_name, self.cards, self.rng)
+        scheduler.set_state(state["scheduler"])
+        pending = EffectQueue()
+        checkpoint = state.get("checkpoint")
+        pending.load(state.get("effects", ()), saved=checkpoint["effects"] if checkpoint else None)
+        gauges = {gauge: int(state["gauges"][gauge]) for gauge in GAUGES}
+        current = state.get("current")
+        if current is not None and not 0 <= current < len(self.effects):
+            raise ValueError(f"Carte courante invalide : {current}")
+        # L'historique rejoué depuis le départ doit retomber exactement sur les jauges sauvegardées
+        if game_log.replay((START_VALUE,) * 3) != tuple(gauges[gauge] for gauge in GAUGES):
+            raise ValueError("Historique incohérent avec les jauges sauvegardées")
+
+        # Tout est relu : la mise en place ne peut plus échouer à mi-chemin
+        self.reset()
+        self.gauges = gauges
+        self.quiz_used = bool(state["quiz_used"])
+        self.game_log = game_log
+        self.scheduler = scheduler
+        self.pending = pending
+        self.current_index = current
+        self.awaiting = current is not None
+        if checkpoint and checkpoint["gauges"]:
+            self.checkpoint_state = tuple(checkpoint["gauges"])
+            self.checkpoint_log_index = checkpoint["log_index"]
+
+    def sample_quiz(self):
+        """Tire les questions du quiz de seconde chance."""
+        if hasattr(self.quiz_questions, "sample"):
+            # Banque de questions (questionbank) : tirage en O(k) sans répétition pour ce joueur
+            return self.quiz_questions.sample(QUIZ_SIZE, self.rng, self.quiz_history)
+        total = min(QUIZ_SIZE, len(self.quiz_questions))
+        return self.rng.sample(self.quiz_questions, total)
+
+    @staticmethod
+    def quiz_mistakes(questions, answers):
+        """Renvoie la liste des (numéro, question, réponse donnée) incorrectes."""
+        return [(i, q, answers[i]) for i, q in enumerate(questions) if answers[i] != q["answer"]]
+
+    def rescue(self):
+        """Quiz réussi : retour aux jauges, à l'historique et aux effets programmés d'avant la carte fatale."""
+        self.gauges["budget"], self.gauges["bonheur"], self.gauges["epargne"] = self.checkpoint_state
+        self.game_log.rollback(self.checkpoint_log_index)
+        self.pending.rollback()
@@ -0,0 +1,114 @@
+"""
+Historique compact des décisions d'une partie.
+
+Chaque décision occupe quelques octets dans des tableaux typés (indice de carte, bit de
+choix A/B, variations immédiates des trois jauges, puis effets programmés arrivés à
+échéance au même tour) au lieu d'un dictionnaire de chaînes : `replay` retrouve
+exactement les jauges finales sans avoir besoin du paquet. Le journal
+est en ajout seul avec une longueur logique : `mark()` renvoie un point de reprise et
+`rollback(mark)` y revient en O(1), sans copie. Plusieurs points de reprise peuvent
+coexister, tant qu'on revient toujours vers un point antérieur.
+"""
+import struct
+import sys
+from array import array
+
+
+CHOICES = "AB"
+HEADER = struct.Struct("<4sI")
+MAGIC = b"ANAL"
+REMOVED_CARD = 0xFFFFFFFF  # carte retirée du paquet pendant la partie (rechargement à chaud)
+
+
+class GameLog:
+    def __init__(self):
+        self.cards = array("I")
+        self.choices = array("B")
+        self.deltas = array("i")  # trois valeurs (budget, bonheur, epargne) par décision
+        self.dues = array("i")  # effets programmés appliqués après la décision, trois valeurs
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, card, choice, delta, due=(0, 0, 0)):
+        """
+        Ajoute une décision ; `choice` vaut "A" ou "B", `delta` et `due` (effets programmés
+        appliqués au même tour) sont des tuples de 3 entiers.
+        """
+        bit = CHOICES.index(choice)
+        n = self.length
+        if n < len(self.cards):
+            # Emplacements libérés par un retour arrière : réutilisés sans réallocation
+            self.cards[n] = card
+            self.choices[n] = bit
+            self.deltas[3 * n:3 * n + 3] = array("i", delta)
+            self.dues[3 * n:3 * n + 3] = array("i", due)
+        else:
+            self.cards.append(card)
+            self.choices.append(bit)
+            self.deltas.extend(delta)
+            self.dues.extend(due)
+        self.length = n + 1
+
+    def mark(self):
+        return self.length
+
+    def rollback(self, mark):
+        if not 0 <= mark <= self.length:
+            raise ValueError(f"Point de reprise invalide : {mark}")
+        self.length = mark
+
+    def remap_cards(self, remap):
+        """Renumérote les cartes après un changement de paquet ; `remap[ancien]` vaut None si retirée."""
+        cards = self.cards
+        for i in range(self.length):
+            old = cards[i]
+            new = remap[old] if old < len(remap) else None
+            cards[i] = REMOVED_CARD if new is None else new
+
+    def __getitem__(self, i):
+        """Renvoie (indice de carte, choix, (delta budget, bonheur, epargne))."""
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError(i)
+        return self.cards[i], CHOICES[self.choices[i]], tuple(self.deltas[3 * i:3 * i + 3])
+
+    def __iter__(self):
+        for i in range(self.length):
+            yield self[i]
+
+    def replay(self, start):
+        """Rejoue les variations (effets programmés compris) depuis les jauges `start` et renvoie les jauges finales."""
+        budget, bonheur, epargne = start
+        deltas, dues = self.deltas, self.dues
+        for i in range(0, 3 * self.length, 3):
+            budget += deltas[i] + dues[i]
+            bonheur += deltas[i + 1] + dues[i + 1]
+            epargne += deltas[i + 2] + dues[i + 2]
+        return budget, bonheur, epargne
+
+    def to_bytes(self):
+        n = self.length
+        parts = [self.cards[:n], self.choices[:n], self.deltas[:3 * n], self.dues[:3 * n]]
+        if sys.byteorder == "big":
+            for part in parts:
+                part.byteswap()
+        return HEADER.pack(MAGIC, n) + b"".join(part.tobytes() for part in parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, n = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Journal de partie invalide")
+        log = cls()
+        offset = HEADER.size
+        for part, count in ((log.cards, n), (log.choices, n), (log.deltas, 3 * n), (log.dues, 3 * n)):
+            size = count * part.itemsize
+            part.frombytes(data[offset:offset + size])
+            offset += size
+            if sys.byteorder == "big":
+                part.byteswap()
+        log.length = n
+        return log
@@ -0,0 +1,209 @@
+"""
+Rechargement à chaud de cards.json, quiz.json et des banques de questions (banks/),
+pour voir une modification du contenu sans relancer le jeu.
+
+Activé par la variable d'environnement ANACOFINANCE_WATCH=1 ou l'option --watch.
+
+Un thread de fond surveille la date et la taille des fichiers (un simple os.stat par
+fichier et par passage). Quand un fichier a changé et n'a plus bougé depuis le passage
+précédent (écriture terminée), seul ce fichier est relu, validé (règles de lint.py),
+compilé (deckpack) puis comparé au contenu chargé par une clé stable : le champ
+facultatif "id" ou, à défaut, le texte de la question. Le résultat (nouveau paquet,
+cartes ajoutées, retirées ou modifiées, correspondance des anciens indices) est remis au
+thread de l'interface, qui le met en place en une fois (GameEngine.swap_cards). Un
+fichier invalide est signalé et le contenu précédent reste en place.
+"""
+import json
+import os
+import queue
+import sys
+import threading
+
+import deckpack
+import effects
+import engine
+import questionbank
+from lint import item_key, validate_cards, validate_questions
+
+
+ENABLED = os.environ.get("ANACOFINANCE_WATCH") == "1" or "--watch" in sys.argv
+KIND_CARDS = "cards"
+KIND_QUIZ = "quiz"
+MAX_ERRORS = 20
+
+
+def fingerprint(item):
+    return json.dumps(item, sort_keys=True, ensure_ascii=False)
+
+
+class DeckDiff:
+    """Différences entre deux versions d'un fichier, par clé stable."""
+
+    def __init__(self, old_keys, old_prints, new_keys, new_prints):
+        new_index = {key: i for i, key in enumerate(new_keys)}
+        self.added = [key for key in new_keys if key not in old_prints]
+        self.removed = [key for key in old_keys if key not in new_index]
+        self.changed = [key for key in new_keys if key in old_prints and old_prints[key] != new_prints[key]]
+        # Nouvel indice de chaque ancienne carte (None si retirée)
+        self.remap = [new_index.get(key) for key in old_keys]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self):
+        return f"+{len(self.added)} / -{len(self.removed)} / ~{len(self.changed)}"
+
+
+class Reload:
+    """Contenu rechargé prêt à être mis en place (ou erreurs si le fichier est invalide)."""
+
+    def __init__(self, kind, path, errors=(), diff=None, cards=None, effects=None, schedules=None, bank=None):
+        self.kind = kind
+        self.path = path
+        self.errors = list(errors)
+        self.diff = diff
+        self.cards = cards
+        self.effects = effects
+        self.schedules = schedules
+        self.bank = bank
+
+
+class ContentWatcher:
+    """
+    Surveille le paquet de cartes et les fichiers de questions. Les rechargements prêts
+    sont récupérés par `poll()`, à appeler depuis le thread de l'interface.
+    """
+
+    def __init__(self, cards_path="cards.json", quiz_path="quiz.json", bank_dir=questionbank.BANK_DIR,
+                 interval=0.5):
+        self.cards_path = cards_path
+        self.quiz_path = quiz_path
+        self.bank_dir = bank_dir
+        self.interval = interval
+        self.stats = {}  # chemin -> (mtime_ns, taille) du contenu chargé
+        self.pending = {}  # chemin -> stat vue au passage précédent, pas encore chargée
+        self.keys = {}  # chemin -> (clés dans l'ordre, empreintes par clé)
+        self.quiz_decks = {}  # chemin -> paquet de questions compilé
+        self.reloads = 0
+        self._results = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="content-watcher", daemon=True)
+        self._thread.start()
+
+    def quiz_paths(self):
+        return questionbank.discover(self.quiz_path, self.bank_dir)
+
+    def poll(self):
+        """Renvoie les rechargements terminés depuis le dernier appel."""
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    # --- Thread de surveillance -----------------------------------------------------
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _index(self, path, items):
+        prints = {item_key(item): fingerprint(item) for item in items}
+        self.keys[path] = ([item_key(item) for item in items], prints)
+
+    def _run(self):
+        # État de référence : le contenu tel qu'il est sur le disque au démarrage
+        for path in [self.cards_path] + self.quiz_paths():
+            self.stats[path] = self._stat(path)
+            try:
+                self._index(path, list(deckpack.iter_items(path)))
+                if path != self.cards_path:
+                    self.quiz_decks[path] = deckpack.load_quiz(path)
+            except Exception as e:
+                print(f"Erreur lors de la lecture de {path}: {e}")
+        while not self._stop.wait(self.interval):
+            quiz_paths = self.quiz_paths()
+            for path in [self.cards_path] + quiz_paths:
+                stat = self._stat(path)
+                if stat == self.stats.get(path):
+                    self.pending.pop(path, None)
+                    continue
+                # Fichier en cours d'écriture : on attend qu'il ne bouge plus d'un passage à l'autre
+                if self.pending.get(path) != stat:
+                    self.pending[path] = stat
+                    continue
+                del self.pending[path]
+                self.stats[path] = stat
+                if path == self.cards_path:
+                    result = self._reload_cards(path)
+                else:
+                    result = self._reload_quiz(path, quiz_paths)
+                if result is not None:
+                    self.reloads += 1
+                    self._results.put(result)
+            # Banque supprimée du dossier
+            for path in [p for p in self.quiz_decks if p not in quiz_paths]:
+                del self.quiz_decks[path]
+                self.stats.pop(path, None)
+                old_keys, _ = self.keys.pop(path, ([], {}))
+                self._results.put(Reload(KIND_QUIZ, path, diff=DeckDiff(old_keys, {}, [], {}),
+                                         bank=self._bank(quiz_paths)))
+
+    def _bank(self, quiz_paths):
+        return questionbank.QuestionBank([self.quiz_decks[p] for p in quiz_paths if p in self.quiz_decks])
+
+    def _read(self, path, validate):
+        """Relit et valide `path` ; renvoie (éléments, erreurs)."""
+        try:
+            items = list(deckpack.iter_items(path))
+        except (OSError, ValueError) as e:
+            return None, [str(e)]
+        return items, validate(items)[:MAX_ERRORS]
+
+    def _reload_cards(self, path):
+        items, errors = self._read(path, validate_cards)
+        if errors:
+            return Reload(KIND_CARDS, path, errors)
+        old_keys, old_prints = self.keys.get(path, ([], {}))
+        new_keys = [item_key(item) for item in items]
+        new_prints = {key: fingerprint(item) for key, item in zip(new_keys, items)}
+        diff = DeckDiff(old_keys, old_prints, new_keys, new_prints)
+        if not diff:
+            return None
+        try:
+            cards = deckpack.load_cards(path)
+            result = Reload(KIND_CARDS, path, diff=diff, cards=cards, effects=engine.compile_effects(cards),
+                            schedules=effects.compile_schedules(cards))
+        except Exception as e:
+            return Reload(KIND_CARDS, path, [str(e)])
+        self.keys[path] = (new_keys, new_prints)
+        return result
+
+    def _reload_quiz(self, path, quiz_paths):
+        if not os.path.exists(path):
+            return None
+        items, errors = self._read(path, validate_questions)
+        if errors:
+            return Reload(KIND_QUIZ, path, errors)
+        old_keys, old_prints = self.keys.get(path, ([], {}))
+        new_keys = [item_key(item) for item in items]
+        new_prints = {key: fingerprint(item) for key, item in zip(new_keys, items)}
+        diff = DeckDiff(old_keys, old_prints, new_keys, new_prints)
+        if not diff and path in self.quiz_decks:
+            return None
+        try:
+            self.quiz_decks[path] = deckpack.load_quiz(path)
+            bank = self._bank(quiz_paths)
+        except Exception as e:
+            return Reload(KIND_QUIZ, path, [str(e)])
+        self.keys[path] = (new_keys, new_prints)
+        return Reload(KIND_QUIZ, path, diff=diff, bank=bank)
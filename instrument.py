@@ -0,0 +1,168 @@
+"""
+Instrumentation facultative des chemins critiques de l'interface.
+
+Activée par la variable d'environnement ANACOFINANCE_PROFILE=1 ou l'option --profile.
+Désactivée, `timed` renvoie la fonction d'origine telle quelle : le coût est nul.
+Activée, les durées sont rangées dans des histogrammes à classes logarithmiques
+(puissances de 2 en microsecondes), sans allocation par mesure, et un résumé JSON est
+écrit à la fermeture du programme (ANACOFINANCE_PROFILE_FILE, par défaut profile.json).
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from array import array
+
+
+ENABLED = os.environ.get("ANACOFINANCE_PROFILE") == "1" or "--profile" in sys.argv
+OUTPUT = os.environ.get("ANACOFINANCE_PROFILE_FILE", "profile.json")
+BUCKETS = 32
+
+_histograms = {}
+_providers = {}
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.buckets = array("Q", bytes(8 * BUCKETS))
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns):
+        self.buckets[min((ns // 1000).bit_length(), BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, fraction):
+        """Borne supérieure (ms) de la classe contenant le percentile demandé."""
+        threshold = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= threshold:
+                return (1 << i) / 1000
+        return 0.0
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ns / self.count / 1e6, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p90_ms": self.percentile(0.90),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ns / 1e6, 3),
+        }
+
+
+def histogram(name):
+    hist = _histograms.get(name)
+    if hist is None:
+        hist = _histograms[name] = Histogram()
+    return hist
+
+
+def timed(name):
+    """Décorateur : mesure chaque appel de la fonction dans l'histogramme `name`."""
+    def decorator(func):
+        if not ENABLED:
+            return func
+        hist = histogram(name)
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                hist.add(clock() - start)
+        return wrapper
+    return decorator
+
+
+def timed_input(name):
+    """
+    Décorateur pour les gestionnaires de touches d'un widget Tk : mesure le temps entre
+    l'appui et la fin des redessins déclenchés (rappel `after_idle` enregistré en dernier).
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+        import tkinter  # seulement pour l'interface profilée : le moteur reste sans Tk
+        hist = histogram(name)
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(widget, *args, **kwargs):
+            start = clock()
+            try:
+                return func(widget, *args, **kwargs)
+            finally:
+                try:
+                    widget.after_idle(lambda: hist.add(clock() - start))
+                except tkinter.TclError:
+                    # Le gestionnaire a fermé la fenêtre : plus de redessin à attendre
+                    pass
+        return wrapper
+    return decorator
+
+
+def add_provider(name, provider):
+    """Ajoute au rapport le résultat de `provider()` (compteurs de cache, etc.)."""
+    if ENABLED:
+        _providers[name] = provider
+
+
+class LagProbe:
+    """
+    Sonde de latence de la boucle d'évènements Tk : un rappel `after(interval)` est
+    programmé en continu et le retard réel par rapport à l'intervalle est mesuré.
+    """
+
+    def __init__(self, widget, interval_ms=50):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.hist = histogram("tk_event_loop_lag")
+        self.expected = 0
+
+    def start(self):
+        if ENABLED:
+            self._schedule()
+
+    def _schedule(self):
+        self.expected = time.perf_counter_ns() + self.interval_ms * 1_000_000
+        self.widget.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        self.hist.add(max(0, time.perf_counter_ns() - self.expected))
+        self._schedule()
+
+
+def report():
+    data = {"histograms": {name: hist.summary() for name, hist in sorted(_histograms.items()) if hist.count}}
+    for name, provider in _providers.items():
+        try:
+            data[name] = provider()
+        except Exception as e:
+            data[name] = f"indisponible : {e}"
+    return data
+
+
+def dump(path=None):
+    path = path or OUTPUT
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report(), f, indent=4)
+    except OSError as e:
+        print(f"Erreur lors de l'écriture du profil {path}: {e}")
+
+
+if ENABLED:
+    atexit.register(dump)
@@ -0,0 +1,368 @@
+"""
+Vérification du contenu : cartes (cards.json) et questions (quiz.json, banks/).
+
+- Schéma : les erreurs empêchent le chargement (champ obligatoire absent, effet non
+  entier, réponse qui n'est pas une des options...) ; les avertissements signalent ce qui
+  se charge mais s'affiche mal ou vient d'un ancien format ("hint" ou "explanation"
+  manquants, ancienne clé "loisirs" ajoutée en silence au bonheur).
+- Quasi-doublons : les questions (cartes et quiz confondus) sont comparées par MinHash
+  sur leurs paires de mots ; un index LSH (signatures découpées en bandes) ne propose que
+  les paires susceptibles de se ressembler, sans comparaison de toutes les paires.
+
+Les fichiers sont vérifiés en parallèle (un processus par fichier), les signatures sont
+ensuite réunies pour trouver aussi les doublons d'un fichier à l'autre. hotreload.py
+utilise les mêmes règles avant de mettre en place un fichier modifié.
+
+Exemple : py lint.py (code de sortie 1 en cas d'erreur ; --strict : aussi en cas d'avertissement)
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import deckpack
+import questionbank
+
+
+EFFECT_NAMES = ("budget", "bonheur", "epargne", "loisirs")
+ERROR = "erreur"
+WARNING = "avertissement"
+KIND_CARDS = "cards"
+KIND_QUIZ = "quiz"
+
+# MinHash : NUM_PERM permutations, découpées en BANDS bandes de NUM_PERM // BANDS valeurs.
+# Avec 16 bandes de 4, deux questions similaires à 70 % sont candidates dans 98,8 % des cas.
+NUM_PERM = 64
+BANDS = 16
+PRIME = (1 << 31) - 1
+NO_SHINGLE = 0xFFFFFFFF
+DEFAULT_THRESHOLD = 0.7
+# Au-delà, un seau n'est comparé qu'à son premier élément (évite un coût quadratique)
+MAX_BUCKET_PAIRS = 32
+WORD = re.compile(r"\w+")
+
+
+def item_key(item):
+    """Clé stable d'une carte ou d'une question : "id" s'il existe, sinon le texte de la question."""
+    key = item.get("id")
+    return str(key) if key is not None else item.get("question")
+
+
+def _positive_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
+
+def _check_effects(where, value, issues):
+    if not isinstance(value, dict):
+        issues.append((ERROR, f"{where} : objet attendu"))
+        return
+    for name, amount in value.items():
+        if name not in EFFECT_NAMES:
+            issues.append((ERROR, f"{where} : jauge inconnue {name!r}"))
+        elif not isinstance(amount, int) or isinstance(amount, bool):
+            issues.append((ERROR, f"{where}.{name} : entier attendu"))
+        elif name == "loisirs":
+            issues.append((WARNING, f"{where} : ancienne clé \"loisirs\", ajoutée au bonheur (utiliser \"bonheur\")"))
+
+
+def check_cards(items):
+    """Renvoie la liste des (niveau, message) pour un paquet de cartes."""
+    issues = []
+    seen = set()
+    for i, card in enumerate(items):
+        where = f"carte {i + 1}"
+        if not isinstance(card, dict):
+            issues.append((ERROR, f"{where} : objet attendu"))
+            continue
+        if not isinstance(card.get("question"), str) or not card["question"].strip():
+            issues.append((ERROR, f"{where} : \"question\" manquante"))
+        key = item_key(card)
+        if key in seen:
+            issues.append((ERROR, f"{where} : clé en double {key!r} (ajouter un champ \"id\")"))
+        seen.add(key)
+        if not card.get("hint"):
+            issues.append((WARNING, f"{where} : \"hint\" manquant"))
+        weight = card.get("weight", 1)
+        if not isinstance(weight, (int, float)) or isinstance(weight, bool) or weight <= 0:
+            issues.append((ERROR, f"{where}.weight : nombre positif attendu"))
+        for name in ("optionA", "optionB"):
+            option = card.get(name)
+            if not isinstance(option, dict):
+                issues.append((ERROR, f"{where} : \"{name}\" manquante"))
+                continue
+            for field in ("text", "explanation"):
+                if not option.get(field):
+                    issues.append((WARNING, f"{where}.{name} : \"{field}\" manquant"))
+            _check_effects(f"{where}.{name}.effects", option.get("effects", {}), issues)
+            scheduled = option.get("scheduled", [])
+            if not isinstance(scheduled, list):
+                issues.append((ERROR, f"{where}.{name}.scheduled : liste attendue"))
+                continue
+            for j, event in enumerate(scheduled):
+                event_where = f"{where}.{name}.scheduled[{j}]"
+                if not isinstance(event, dict):
+                    issues.append((ERROR, f"{event_where} : objet attendu"))
+                    continue
+                for field in ("delay", "every", "times"):
+                    if field in event and not _positive_int(event[field]):
+                        issues.append((ERROR, f"{event_where}.{field} : entier >= 1 attendu"))
+                _check_effects(f"{event_where}.effects", event.get("effects", {}), issues)
+    if not items:
+        issues.append((ERROR, "paquet vide"))
+    return issues
+
+
+def check_questions(items):
+    """Renvoie la liste des (niveau, message) pour des questions de quiz."""
+    issues = []
+    for i, question in enumerate(items):
+        where = f"question {i + 1}"
+        if not isinstance(question, dict):
+            issues.append((ERROR, f"{where} : objet attendu"))
+            continue
+        if not isinstance(question.get("question"), str) or not question["question"].strip():
+            issues.append((ERROR, f"{where} : \"question\" manquante"))
+        options = question.get("options")
+        if not isinstance(options, dict) or not options:
+            issues.append((ERROR, f"{where} : \"options\" manquantes"))
+        else:
+            unknown = [o for o in options if o not in deckpack.QUIZ_OPTIONS]
+            if unknown:
+                issues.append((ERROR, f"{where} : options inconnues {unknown} (A à D)"))
+            if question.get("answer") not in options:
+                issues.append((ERROR, f"{where} : la réponse {question.get('answer')!r} n'est pas une des options"))
+            if len(options) < 2:
+                issues.append((WARNING, f"{where} : une seule option"))
+        if not question.get("explanation"):
+            issues.append((WARNING, f"{where} : \"explanation\" manquante"))
+        difficulty = question.get("difficulty")
+        if difficulty is not None and (not isinstance(difficulty, int) or isinstance(difficulty, bool)):
+            issues.append((ERROR, f"{where}.difficulty : entier attendu"))
+    return issues
+
+
+def validate_cards(items):
+    """Erreurs qui empêchent de charger ces cartes (vide si tout va bien)."""
+    return [message for level, message in check_cards(items) if level == ERROR]
+
+
+def validate_questions(items):
+    """Erreurs qui empêchent de charger ces questions."""
+    return [message for level, message in check_questions(items) if level == ERROR]
+
+
+def detect_kind(items):
+    first = items[0] if items else None
+    return KIND_CARDS if isinstance(first, dict) and "optionA" in first else KIND_QUIZ
+
+
+# --- Quasi-doublons -------------------------------------------------------------
+
+def normalize_words(text):
+    """Mots en minuscules, sans accents ni ponctuation."""
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+    return WORD.findall(text)
+
+
+def shingles(texts):
+    """
+    Paires de mots consécutifs de chaque texte, hachées sur 32 bits (un mot seul compte
+    comme une paire). Renvoie (hachages, numéro du texte de chaque hachage), triés par texte.
+    """
+    import numpy as np
+    cache = {}
+    hashes = []
+    owners = []
+    for i, text in enumerate(texts):
+        words = normalize_words(text) if isinstance(text, str) else []
+        ids = []
+        for word in words:
+            h = cache.get(word)
+            if h is None:
+                h = cache[word] = zlib.crc32(word.encode("ascii"))
+            ids.append(h)
+        if not ids:
+            continue
+        if len(ids) == 1:
+            ids.append(0)
+        hashes.extend(ids)
+        # Le dernier mot ne forme pas de paire avec le premier mot du texte suivant
+        owners.extend([i] * (len(ids) - 1))
+        owners.append(-1)
+    words = np.array(hashes, dtype=np.uint64)
+    owners = np.array(owners, dtype=np.int64)
+    if len(words) == 0:
+        return words, owners
+    pairs = (words[:-1] * np.uint64(0x9E3779B1) + words[1:]) & np.uint64(0xFFFFFFFF)
+    keep = owners[:-1] >= 0
+    return pairs[keep], owners[:-1][keep]
+
+
+def minhash(texts, num_perm=NUM_PERM, seed=1):
+    """Signatures MinHash (une ligne de `num_perm` entiers par texte) ; NO_SHINGLE si texte vide."""
+    import numpy as np
+    signatures = np.full((len(texts), num_perm), NO_SHINGLE, dtype=np.uint32)
+    values, owners = shingles(texts)
+    if len(values) == 0:
+        return signatures
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, PRIME, num_perm, dtype=np.uint64)
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    present = owners[starts]
+    prime = np.uint64(PRIME)
+    for j in range(num_perm):
+        hashed = (values * a[j] + b[j]) % prime
+        signatures[present, j] = np.minimum.reduceat(hashed, starts)
+    return signatures
+
+
+def candidate_pairs(signatures, bands=BANDS):
+    """Paires (i, j) qui partagent au moins une bande de signature (index LSH)."""
+    import numpy as np
+    rows = signatures.shape[1] // bands
+    valid = np.flatnonzero(signatures[:, 0] != NO_SHINGLE)
+    pairs = set()
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[valid, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1], True])
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            if stop - start < 2:
+                continue
+            members = valid[order[start:stop]].tolist()
+            if len(members) <= MAX_BUCKET_PAIRS:
+                pairs.update((members[x], members[y]) for x in range(len(members))
+                             for y in range(x + 1, len(members)))
+            else:
+                pairs.update((members[0], m) for m in members[1:])
+    return pairs
+
+
+def near_duplicates(signatures, threshold=DEFAULT_THRESHOLD, bands=BANDS):
+    """Groupes d'indices dont la similarité estimée (part de signature commune) atteint `threshold`."""
+    import numpy as np
+    pairs = candidate_pairs(signatures, bands)
+    if not pairs:
+        return []
+    left, right = np.array(sorted(pairs)).T
+    similarity = (signatures[left] == signatures[right]).mean(axis=1)
+    parent = {}
+
+    def find(x):
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+
+    for i, j in zip(left[similarity >= threshold].tolist(), right[similarity >= threshold].tolist()):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    groups = {}
+    for x in parent:
+        groups.setdefault(find(x), set()).add(x)
+    for root in groups:
+        groups[root].add(root)
+    return sorted(sorted(group) for group in groups.values())
+
+
+# --- Vérification d'un fichier (processus de travail) -------------------------------
+
+def lint_file(path):
+    """Renvoie (chemin, type, nombre d'éléments, [(niveau, message)], questions, signatures)."""
+    try:
+        items = list(deckpack.iter_items(path))
+    except (OSError, ValueError) as e:
+        return path, None, 0, [(ERROR, f"lecture impossible : {e}")], [], minhash([])
+    kind = detect_kind(items)
+    issues = check_cards(items) if kind == KIND_CARDS else check_questions(items)
+    questions = [item.get("question") if isinstance(item, dict) else None for item in items]
+    return path, kind, len(items), issues, questions, minhash(questions)
+
+
+def lint(paths, threshold=DEFAULT_THRESHOLD, workers=None, duplicates=True):
+    """
+    Vérifie les fichiers `paths` en parallèle. Renvoie (résultats par fichier, groupes de
+    quasi-doublons sous forme de listes de (chemin, numéro d'élément, question)).
+    """
+    import numpy as np
+    if len(paths) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lint_file, paths))
+    else:
+        results = [lint_file(path) for path in paths]
+    groups = []
+    if duplicates and results:
+        owners = [(path, i, question) for path, _, _, _, questions, _ in results
+                  for i, question in enumerate(questions)]
+        signatures = np.concatenate([result[5] for result in results])
+        groups = [[owners[i] for i in group] for group in near_duplicates(signatures, threshold)]
+    return results, groups
+
+
+def gate(path):
+    """Vérification avant chargement (schéma seul) : renvoie les erreurs bloquantes de `path`."""
+    try:
+        items = list(deckpack.iter_items(path))
+    except (OSError, ValueError) as e:
+        return [f"lecture impossible : {e}"]
+    return validate_cards(items) if detect_kind(items) == KIND_CARDS else validate_questions(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérification des cartes et des questions")
+    parser.add_argument("paths", nargs="*", help="fichiers à vérifier (par défaut : cards.json, quiz.json, banks/)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="similarité à partir de laquelle deux questions sont des quasi-doublons")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--no-duplicates", action="store_true", help="ne pas chercher les quasi-doublons")
+    parser.add_argument("--strict", action="store_true", help="échoue aussi en cas d'avertissement")
+    parser.add_argument("--max-issues", type=int, default=20, help="messages affichés par fichier")
+    parser.add_argument("--json", action="store_true", help="sortie JSON complète")
+    args = parser.parse_args()
+    paths = args.paths or ["cards.json"] + questionbank.discover("quiz.json")
+
+    start = time.perf_counter()
+    results, groups = lint(paths, args.threshold, args.workers, not args.no_duplicates)
+    elapsed = time.perf_counter() - start
+    errors = sum(level == ERROR for result in results for level, _ in result[3])
+    warnings = sum(level == WARNING for result in results for level, _ in result[3])
+
+    if args.json:
+        print(json.dumps({
+            "files": [{"path": path, "kind": kind, "items": count,
+                       "issues": [{"level": level, "message": message} for level, message in issues]}
+                      for path, kind, count, issues, _, _ in results],
+            "duplicates": [[{"path": path, "item": i + 1, "question": question} for path, i, question in group]
+                           for group in groups],
+        }, indent=4, ensure_ascii=False))
+    else:
+        for path, kind, count, issues, _, _ in results:
+            print(f"{path} ({count} éléments) : {sum(l == ERROR for l, _ in issues)} erreur(s), "
+                  f"{sum(l == WARNING for l, _ in issues)} avertissement(s)")
+            for level, message in issues[:args.max_issues]:
+                print(f"  [{level}] {message}")
+            if len(issues) > args.max_issues:
+                print(f"  ... {len(issues) - args.max_issues} de plus")
+        for group in groups:
+            print(f"Quasi-doublons ({len(group)}) :")
+            for path, i, question in group:
+                print(f"  {path} #{i + 1} : {question[:70]}")
+        total = sum(result[2] for result in results)
+        print(f"{total} éléments vérifiés en {elapsed:.2f} s : {errors} erreur(s), {warnings} avertissement(s), "
+              f"{len(groups)} groupe(s) de quasi-doublons")
+
+    if errors or (args.strict and (warnings or groups)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,62 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
 import os
-import random
+import sys
 import json
+import random
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from PIL import Image, ImageTk
 from datetime import datetime
+import engine
+import instrument
+import deckpack
+import hotreload
+import questionbank
+from solver import PolicyTable
+from scores import ScoreStore
+from session import SessionJournal
+from render import RenderScheduler, GaugeBar
+from overlay import Overlay
+from recording import GameRecording, RecordingWriter
+from telemetry import TelemetryRecorder
+from atlas import Atlas, AtlasPortraits
+
+
+IMAGE_CACHE_DIR = os.path.join(deckpack.CACHE_DIR, "images")
+
 
+def resized_cache_path(path, size):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(IMAGE_CACHE_DIR, f"{name}_{size[0]}x{size[1]}.png")
 
+
+def has_resized_cache(path, size):
+    cached = resized_cache_path(path, size)
+    return os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path)
+
+
+@instrument.timed("load_image_from_file")
 def load_image_from_file(path, size):
     """
     Charge une image depuis un fichier, la redimensionne et renvoie un objet PhotoImage.
+    La version redimensionnée est conservée dans .cache/images : les lancements suivants
+    la chargent directement avec Tk, sans importer ni utiliser PIL.
     """
     try:
+        cached = resized_cache_path(path, size)
+        if has_resized_cache(path, size):
+            return tk.PhotoImage(file=cached)
+        from PIL import Image, ImageTk
         image = Image.open(path)
         image = image.resize(size, resample=Image.LANCZOS)
+        try:
+            os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+            image.save(cached)
+        except OSError as e:
+            print(f"Impossible d'enregistrer l'image redimensionnée {cached}: {e}")
         return ImageTk.PhotoImage(image)
     except Exception as e:
         print(f"Erreur lors du chargement de l'image depuis {path}: {e}")
@@ -51,7 +92,8 @@ def center_window(window, width, height):
 
 
 class SeriousGame(ttk.Window):
-    def __init__(self):
+    def __init__(self, data_dir=None):
+        imports_ms = self.elapsed_ms()
         super().__init__(themename='flatly')
         self.title("ANACOFINANCE - Gestion de Patrimoine")
         self.geometry("1200x900")
@@ -59,9 +101,6 @@ class SeriousGame(ttk.Window):
         center_window(self, 1200, 900)
         self.configure(bg="#fffefd")  # Fond principal blanc cassé
 
-        # Le quiz ne peut être tenté qu'une seule fois par partie
-        self.quiz_used = False
-
         # Configuration globale des styles
         style = ttk.Style()
         style.theme_use('flatly')
@@ -82,38 +121,75 @@ class SeriousGame(ttk.Window):
         style.configure("Quiz.TRadiobutton", background="#fffefd", foreground="#29373e", font=("Helvetica", 14))
         style.configure("Quiz.TButton", background="#29373e", foreground="#fffefd")
 
-        # Chargement des images depuis le dossier assets
+        # Durées des phases de démarrage (ms depuis le lancement du processus)
+        self.startup_timings = {"imports": imports_ms, "window": self.elapsed_ms()}
+
+        # Avec l'atlas (py atlas.py), toutes les images viennent d'un seul PNG déjà redimensionné.
+        # Sinon elles sont décodées après le premier affichage du menu (voir load_deferred_assets) ;
+        # seul le logo du menu est chargé tout de suite s'il existe déjà en version redimensionnée.
         self.assets_dir = os.path.join(os.path.dirname(__file__), "assets")
-        logo_app_path = os.path.join(self.assets_dir, "logo_app.png")
-        logo_path = os.path.join(self.assets_dir, "logo.png")
-        self.logo_photo = load_image_from_file(logo_path, (40, 40))
-        self.logo_app = load_image_from_file(logo_app_path, (400, 400))
-        self.budget_icon = load_image_from_file(os.path.join(self.assets_dir, "budget.png"), (30, 30))
-        self.bonheur_icon = load_image_from_file(os.path.join(self.assets_dir, "bonheur.png"), (30, 30))
-        self.epargne_icon = load_image_from_file(os.path.join(self.assets_dir, "epargne.png"), (30, 30))
+        # Données écrites par le jeu (scores, sauvegarde de la partie, parties enregistrées,
+        # télémétrie) : assets/ sauf si un autre dossier est donné (banc d'essai clavier)
+        self.data_dir = data_dir or self.assets_dir
         self.character_dir = os.path.join(self.assets_dir, "character")
-
-        # Initialisation des jauges (remplacement de "loisirs" par "bonheur")
-        self.gauges = {"budget": 50, "bonheur": 50, "epargne": 50}
-        self.game_log = []
-        self.checkpoint_state = None
-        self.checkpoint_log_index = None
-
-        # Chargement des fichiers JSON
+        self.logo_app_path = os.path.join(self.assets_dir, "logo_app.png")
+        self.atlas = Atlas.load(self.assets_dir)
+        self.logo_app = None
+        if self.atlas is not None or has_resized_cache(self.logo_app_path, (400, 400)):
+            self.logo_app = self.load_asset("logo_app.png", (400, 400))
+        self.logo_photo = None
+        self.budget_icon = None
+        self.bonheur_icon = None
+        self.epargne_icon = None
+        self.sprite_pool = None
+        self.assets_loaded = False
+        self.startup_timings["menu_logo"] = self.elapsed_ms()
+
+        # Chargement des paquets (format compilé projeté en mémoire, reconstruit si le JSON change)
+        self.cards = []
+        self.quiz_questions = []
         try:
-            with open("cards.json", "r", encoding="utf-8") as f:
-                self.cards = json.load(f)
+            self.cards = deckpack.load_cards("cards.json")
         except Exception as e:
             messagebox.showerror("Erreur", f"Impossible de charger cards.json: {e}")
             self.destroy()
         try:
-            with open("quiz.json", "r", encoding="utf-8") as f:
-                self.quiz_questions = json.load(f)
+            # quiz.json et les banques de questions du dossier banks/, indexées par thème et difficulté
+            self.quiz_questions = questionbank.QuestionBank.load(questionbank.discover("quiz.json"))
         except Exception as e:
-            messagebox.showerror("Erreur", f"Impossible de charger quiz.json: {e}")
+            messagebox.showerror("Erreur", f"Impossible de charger les questions du quiz: {e}")
             self.destroy()
 
+        # Moteur de jeu (jauges, historique, quiz de seconde chance), indépendant de Tk.
+        # Le sac mélangé évite de revoir une carte avant d'avoir vu la moitié du paquet.
+        self.engine = engine.GameEngine(self.cards, self.quiz_questions, scheduler="shuffle")
+        # Table de politique optimale précalculée par solver.py (facultative), chargée à la
+        # première demande d'indice pour ne pas retarder le démarrage
+        self.policy_table = None
+        self.policy_loaded = False
+
+        # Base des scores (SQLite) ; l'ancien scores.json est importé à la première ouverture
+        try:
+            self.score_store = ScoreStore(os.path.join(self.data_dir, "scores.db"),
+                                          legacy_json=os.path.join(self.data_dir, "scores.json"))
+        except Exception as e:
+            print(f"Erreur lors de l'ouverture de la base de scores: {e}")
+            self.score_store = None
+
+        # Sauvegarde continue de la partie en cours (journal + instantanés, thread de fond)
+        self.session = SessionJournal(os.path.join(self.data_dir, "session"))
+        # Parties terminées enregistrées pour les statistiques des enseignants (analytics.py)
+        self.recordings = RecordingWriter(os.path.join(self.data_dir, "recordings"))
+        self.recording = GameRecording()
+        # Partie en cours (carte ou quiz) : seule une partie en cours est enregistrée comme interrompue
+        self.in_game = False
+        # Temps de réaction, indices et réponses au quiz pour la recherche pédagogique (telemetry.py)
+        self.telemetry = TelemetryRecorder(os.path.join(self.data_dir, "telemetry"))
+
         self.current_quiz_list = []
+        # En fin de partie la fenêtre est fermée ; le banc d'essai clavier revient au menu
+        self.close_on_game_over = True
+        self.startup_timings["data"] = self.elapsed_ms()
 
         # Création du conteneur principal pour les frames
         self.container = ttk.Frame(self)
@@ -123,12 +199,13 @@ class SeriousGame(ttk.Window):
         self.menu_frame = MenuFrame(parent=self.container, controller=self)
         self.menu_frame.grid(row=0, column=0, sticky="nsew")
 
-        # Création des autres frames (jeu et quiz)
+        # Mises à jour d'affichage regroupées et appliquées une fois par passage à l'inactivité
+        self.render = RenderScheduler(self)
+        instrument.add_provider("render", self.render.stats)
+
+        # Les autres frames (jeu, quiz, scores) sont créées à leur première utilisation
         self.frames = {}
-        for F in (GameFrame, QuizFrame):
-            frame = F(parent=self.container, controller=self)
-            self.frames[F.__name__] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.current_frame = None
 
         # Affichage de l'en-tête (modification du texte pour ANACOFINANCE)
         self.header_frame = ttk.Frame(self, style="Header.TFrame")
@@ -136,10 +213,15 @@ class SeriousGame(ttk.Window):
         header_label = ttk.Label(self.header_frame, text="ANACOFINANCE - Gestion de Patrimoine", style="Header.TLabel")
         header_label.pack(pady=10)
 
+        # Messages (règles, indices, défaite, corrections, saisie du nom) affichés dans la
+        # fenêtre, sans boucle modale : ils sont mis en file et la suite passe par des rappels
+        self.overlay = Overlay(self)
+
         # Bindings pour le jeu et la touche 'i'
         self.bind("<Left>", self.on_left_arrow)
         self.bind("<Right>", self.on_right_arrow)
         self.bind("<Return>", self.on_enter_key)
+        self.bind("<Escape>", self.on_escape_key)
         self.bind("<i>", self.on_i_key)
 
         # Définir le protocole de fermeture de la fenêtre
@@ -147,194 +229,354 @@ class SeriousGame(ttk.Window):
 
         # Au démarrage, on affiche le menu
         self.show_frame("MenuFrame")
+        self.startup_timings["menu_built"] = self.elapsed_ms()
+        instrument.add_provider("startup_ms", lambda: self.startup_timings)
+        # Mesure de la latence de la boucle d'évènements (uniquement si l'instrumentation est active)
+        instrument.LagProbe(self).start()
+        # Rechargement à chaud du contenu pour les auteurs (--watch)
+        self.watcher = None
+        if hotreload.ENABLED:
+            self.watcher = hotreload.ContentWatcher()
+            self.after(250, self.poll_content)
+        # Exécuté après les redessins en attente, donc après le premier affichage du menu
+        self.after_idle(self.on_first_paint)
+
+    @staticmethod
+    def elapsed_ms():
+        return round((time.perf_counter() - STARTUP_T0) * 1000, 1)
+
+    def on_first_paint(self):
+        self.startup_timings["menu_painted"] = self.elapsed_ms()
+        self.load_deferred_assets()
+        self.startup_timings["assets"] = self.elapsed_ms()
+
+    def load_asset(self, name, size):
+        """Renvoie l'image `name` (relative à assets) à la taille demandée, depuis l'atlas si possible."""
+        if self.atlas is not None and self.atlas.has(name, size):
+            return self.atlas.photo(name, size)
+        return load_image_from_file(os.path.join(self.assets_dir, name), size)
+
+    def load_deferred_assets(self):
+        """Décode les icônes et lance la réserve de portraits (une seule fois)."""
+        if self.assets_loaded:
+            return
+        self.assets_loaded = True
+        if self.logo_app is None:
+            self.logo_app = self.load_asset("logo_app.png", (400, 400))
+            self.menu_frame.logo_label.config(image=self.logo_app)
+        self.logo_photo = self.load_asset("logo.png", (40, 40))
+        self.budget_icon = self.load_asset("budget.png", (30, 30))
+        self.bonheur_icon = self.load_asset("bonheur.png", (30, 30))
+        self.epargne_icon = self.load_asset("epargne.png", (30, 30))
+        if self.atlas is not None and self.atlas.portraits():
+            # Portraits déjà découpés dans l'atlas : ni décodage ni thread
+            self.sprite_pool = AtlasPortraits(self.atlas)
+        else:
+            # Réserve de portraits : indexation unique, décodage en arrière-plan et cache borné
+            from sprites import SpritePool
+            self.sprite_pool = SpritePool(self.character_dir, (150, 150))
+        self.sprite_pool.warm_up()
+        instrument.add_provider("sprite_pool", self.sprite_pool.stats)
+
+    def frame(self, frame_name):
+        """Renvoie la frame demandée, en la construisant à sa première utilisation."""
+        frame = self.frames.get(frame_name)
+        if frame is None:
+            self.load_deferred_assets()
+            classes = {F.__name__: F for F in (GameFrame, QuizFrame, LeaderboardFrame)}
+            frame = classes[frame_name](parent=self.container, controller=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[frame_name] = frame
+        return frame
 
+    @instrument.timed_input("input_left_arrow")
     def on_left_arrow(self, event):
-        game_frame = self.frames.get("GameFrame")
-        if game_frame and game_frame.winfo_ismapped():
+        if self.overlay.active:
+            return
+        if self.current_frame == "GameFrame":
+            game_frame = self.frame("GameFrame")
             if "disabled" not in game_frame.next_button.state():
                 game_frame.next_card()
             elif "disabled" not in game_frame.optionA_button.state():
                 game_frame.choice("A")
 
+    @instrument.timed_input("input_right_arrow")
     def on_right_arrow(self, event):
-        game_frame = self.frames.get("GameFrame")
-        if game_frame and game_frame.winfo_ismapped():
+        if self.overlay.active:
+            return
+        if self.current_frame == "GameFrame":
+            game_frame = self.frame("GameFrame")
             if "disabled" not in game_frame.next_button.state():
                 game_frame.next_card()
             elif "disabled" not in game_frame.optionB_button.state():
                 game_frame.choice("B")
 
+    @instrument.timed_input("input_enter_key")
     def on_enter_key(self, event):
-        if self.frames.get("GameFrame") and self.frames["GameFrame"].winfo_ismapped():
-            if "disabled" not in self.frames["GameFrame"].next_button.state():
-                self.frames["GameFrame"].next_card()
-        elif self.frames.get("QuizFrame") and self.frames["QuizFrame"].winfo_ismapped():
-            self.frames["QuizFrame"].submit_answer()
+        if self.overlay.active:
+            self.overlay.submit()
+        elif self.current_frame == "GameFrame":
+            if "disabled" not in self.frame("GameFrame").next_button.state():
+                self.frame("GameFrame").next_card()
+        elif self.current_frame == "QuizFrame":
+            self.frame("QuizFrame").submit_answer()
+
+    @instrument.timed_input("input_escape_key")
+    def on_escape_key(self, event):
+        if self.overlay.active:
+            self.overlay.cancel()
 
     def on_i_key(self, event):
-        if self.frames.get("GameFrame") and self.frames["GameFrame"].winfo_ismapped():
-            self.frames["GameFrame"].show_indice()
+        if not self.overlay.active and self.current_frame == "GameFrame":
+            self.frame("GameFrame").show_indice()
+
+    def advice(self):
+        """Renvoie le choix conseillé ("A"/"B") pour la carte courante, ou None sans table de politique."""
+        if not self.policy_loaded:
+            self.policy_table = PolicyTable.load(os.path.join(self.assets_dir, "policy.json"), self.cards)
+            self.policy_loaded = True
+        if self.policy_table is None:
+            return None
+        return self.policy_table.advice(self.engine.gauges, self.engine.current_index)
+
+    def poll_content(self):
+        """Met en place les fichiers de contenu rechargés par le ContentWatcher."""
+        for reload in self.watcher.poll():
+            name = os.path.basename(reload.path)
+            if reload.errors:
+                print(f"Erreur lors du rechargement de {name}:\n- " + "\n- ".join(reload.errors))
+                self.overlay.toast(f"{name} invalide, contenu précédent conservé : {reload.errors[0]}", 4000)
+            elif reload.kind == hotreload.KIND_CARDS:
+                self.swap_cards(reload)
+                self.overlay.toast(f"{name} rechargé ({reload.diff.summary()})")
+            else:
+                # Les questions déjà tirées pour un quiz en cours restent valables (anciens paquets)
+                self.quiz_questions = reload.bank
+                self.engine.quiz_questions = reload.bank
+                self.overlay.toast(f"{name} rechargé ({reload.diff.summary()})")
+        self.after(250, self.poll_content)
+
+    def swap_cards(self, reload):
+        """Remplace le paquet de cartes sans interrompre la partie en cours."""
+        current = self.engine.current_card
+        current_key = hotreload.item_key(current) if current is not None else None
+        self.cards = reload.cards
+        self.engine.swap_cards(reload.cards, reload.diff.remap, reload.effects, reload.schedules)
+        # La table de politique sera relue (et vérifiée contre le nouveau paquet) au prochain indice
+        self.policy_table = None
+        self.policy_loaded = False
+        # Le journal contient les anciens indices de cartes : la sauvegarde repart d'un instantané
+        self.session.snapshot(self.engine)
+        game_frame = self.frames.get("GameFrame")
+        if game_frame is None or current is None or "disabled" in game_frame.optionA_button.state():
+            return
+        # Carte affichée, en attente d'un choix : retirée, on en tire une autre ; modifiée, on la réaffiche
+        if self.engine.current_index is None:
+            self.load_next_card()
+        elif current_key in reload.diff.changed:
+            game_frame.set_card(self.engine.current_card)
 
     def show_frame(self, frame_name):
+        self.current_frame = frame_name
         if frame_name == "MenuFrame":
+            self.menu_frame.update_resume_button()
             self.menu_frame.tkraise()
-        elif frame_name in self.frames:
-            self.frames[frame_name].tkraise()
+        else:
+            self.frame(frame_name).tkraise()
 
+    @instrument.timed("update_gauges_display")
     def update_gauges_display(self):
-        self.frames["GameFrame"].update_gauges_label(
-            self.gauges["budget"],
-            self.gauges["bonheur"],
-            self.gauges["epargne"]
+        gauges = self.engine.gauges
+        self.frame("GameFrame").update_gauges_label(
+            gauges["budget"],
+            gauges["bonheur"],
+            gauges["epargne"]
         )
 
+    def new_game(self):
+        self.engine.reset()
+        self.session.start(self.engine)
+        self.recording = GameRecording()
+        self.in_game = True
+        self.telemetry.begin_game()
+        self.load_next_card()
+        self.show_frame("GameFrame")
+
+    def resume_game(self):
+        """Reprend la partie sauvegardée (dernier instantané + fin du journal)."""
+        try:
+            resumed = self.session.load(self.engine)
+        except Exception as e:
+            # Sauvegarde illisible ou faite pour un autre paquet : elle est abandonnée
+            print(f"Erreur lors de la reprise de la partie: {e}")
+            self.overlay.toast("La partie sauvegardée ne peut pas être reprise : nouvelle partie.")
+            self.new_game()
+            return
+        if not resumed:
+            self.overlay.toast("Aucune partie à reprendre.")
+            self.menu_frame.update_resume_button()
+            return
+        self.recording = GameRecording()
+        self.in_game = True
+        self.telemetry.begin_game()
+        gauges = self.engine.gauges
+        if engine.is_lost(gauges["budget"], gauges["bonheur"], gauges["epargne"]):
+            # Fermeture pendant le quiz de seconde chance : on le recommence
+            self.start_quiz()
+        else:
+            if self.engine.awaiting:
+                # Carte tirée avant l'instantané (changement de paquet en cours de tour) : réaffichée
+                self.show_current_card()
+            else:
+                self.load_next_card()
+            self.show_frame("GameFrame")
+
+    @instrument.timed("load_next_card")
     def load_next_card(self):
-        self.checkpoint_state = (self.gauges["budget"], self.gauges["bonheur"], self.gauges["epargne"])
-        self.checkpoint_log_index = len(self.game_log)
-        self.current_card = random.choice(self.cards)
-        self.frames["GameFrame"].set_card(self.current_card)
+        self.engine.draw_card()
+        self.show_current_card()
+
+    def show_current_card(self):
+        self.frame("GameFrame").set_card(self.engine.current_card)
         self.update_gauges_display()
+        self.recording.card_shown()
+        self.telemetry.shown()
 
+    @instrument.timed("apply_choice")
     def apply_choice(self, choice):
         if choice == "A":
-            effects = self.current_card["optionA"]["effects"]
-            explanation = self.current_card["optionA"]["explanation"]
-            choix_text = self.current_card["optionA"]["text"]
+            explanation = self.engine.current_card["optionA"]["explanation"]
         elif choice == "B":
-            effects = self.current_card["optionB"]["effects"]
-            explanation = self.current_card["optionB"]["explanation"]
-            choix_text = self.current_card["optionB"]["text"]
+            explanation = self.engine.current_card["optionB"]["explanation"]
         else:
             return
 
-        self.gauges["budget"] += effects.get("budget", 0)
-        self.gauges["bonheur"] += effects.get("loisirs", 0)
-        if "bonheur" in effects:
-            self.gauges["bonheur"] += effects.get("bonheur", 0)
-        self.gauges["epargne"] += effects.get("epargne", 0)
-
-        self.game_log.append({
-            "situation": self.current_card.get("question", "Question non définie"),
-            "choix": choix_text,
-            "explanation": explanation
-        })
+        self.telemetry.decision(self.engine.current_index, choice)
+        outcome = self.engine.apply_choice(choice)
+        self.session.record_choice(self.engine)
+        self.recording.record(self.engine)
 
         # Affichage de l'explication après le choix
-        self.frames["GameFrame"].show_explanation(explanation)
+        self.frame("GameFrame").show_explanation(explanation)
         self.update_gauges_display()
 
-        if self.gauges["budget"] <= 0 or self.gauges["bonheur"] <= 0 or self.gauges["epargne"] <= 0:
-            if not self.quiz_used:
-                messagebox.showinfo("Défaite",
-                                    "Oh non ! Une de vos jauges est tombée à 0.\nVous avez une chance de reprendre via le quiz.")
-                self.quiz_used = True
-                self.start_quiz()
-            else:
-                score = len(self.game_log)
-                messagebox.showinfo("Défaite",
-                                    "Oh non ! Vous avez déjà utilisé votre chance de quiz.\nFin de la partie.")
-                self.prompt_save_score(score)
-                self.destroy()
+        if outcome == engine.QUIZ:
+            self.overlay.show("Défaite",
+                              "Oh non ! Une de vos jauges est tombée à 0.\nVous avez une chance de reprendre via le quiz.",
+                              on_close=self.start_quiz)
+        elif outcome == engine.GAME_OVER:
+            self.session.discard()
+            self.finish_recording()
+            score = self.engine.score
+            self.overlay.show("Défaite",
+                              "Oh non ! Vous avez déjà utilisé votre chance de quiz.\nFin de la partie.",
+                              on_close=lambda: self.prompt_save_score(score, on_done=self.end_game))
         else:
-            self.frames["GameFrame"].enable_next_button()
+            self.frame("GameFrame").enable_next_button()
 
     def start_quiz(self):
-        total_questions = min(10, len(self.quiz_questions))
-        self.current_quiz_list = random.sample(self.quiz_questions, total_questions)
+        self.current_quiz_list = self.engine.sample_quiz()
+        total_questions = len(self.current_quiz_list)
         self.current_quiz_index = 0
         self.quiz_answers = []
-        self.frames["QuizFrame"].load_question(
+        self.frame("QuizFrame").load_question(
             self.current_quiz_list[self.current_quiz_index],
             self.current_quiz_index + 1, total_questions
         )
         self.show_frame("QuizFrame")
 
     def process_quiz_answer(self, answer):
+        question = self.current_quiz_list[self.current_quiz_index]
+        self.telemetry.quiz_answer(self.current_quiz_index, answer, answer == question["answer"])
         self.quiz_answers.append(answer)
         self.current_quiz_index += 1
         total = len(self.current_quiz_list)
         if self.current_quiz_index < total:
-            self.frames["QuizFrame"].load_question(
+            self.frame("QuizFrame").load_question(
                 self.current_quiz_list[self.current_quiz_index],
                 self.current_quiz_index + 1, total
             )
         else:
-            corrections = ""
-            for i, q in enumerate(self.current_quiz_list):
-                if self.quiz_answers[i] != q["answer"]:
-                    corrections += f"Question {i + 1}: {q.get('question', 'Question non définie')}\n"
-                    corrections += f"Votre réponse: {self.quiz_answers[i]} | Réponse correcte: {q['answer']}\n"
-                    corrections += f"Explication: {q.get('explanation', 'Aucune explication')}\n\n"
+            corrections = questionbank.format_corrections(
+                self.engine.quiz_mistakes(self.current_quiz_list, self.quiz_answers))
             if corrections:
-                messagebox.showinfo("Quiz - Corrections", corrections)
-                messagebox.showinfo("Quiz", "Fin de la partie.")
-                score = len(self.game_log)
-                self.prompt_save_score(score)
-                self.destroy()
+                self.session.discard()
+                self.finish_recording()
+                score = self.engine.score
+                # Les deux messages sont mis en file et affichés l'un après l'autre
+                self.overlay.show("Quiz - Corrections", corrections)
+                self.overlay.show("Quiz", "Fin de la partie.",
+                                  on_close=lambda: self.prompt_save_score(score, on_done=self.end_game))
             else:
-                messagebox.showinfo("Quiz", "Bravo, toutes les réponses sont correctes ! Vous reprenez la partie.")
-                self.gauges["budget"], self.gauges["bonheur"], self.gauges["epargne"] = self.checkpoint_state
-                self.game_log = self.game_log[:self.checkpoint_log_index]
-                self.load_next_card()
-                self.show_frame("GameFrame")
-
-    def prompt_save_score(self, score):
-        if score > 0:
-            name = simpledialog.askstring("Nom", "Entrez votre nom pour enregistrer votre score:")
+                self.engine.rescue()
+                self.session.record_rescue(self.engine)
+                self.recording.record_rescue()
+                self.overlay.show("Quiz", "Bravo, toutes les réponses sont correctes ! Vous reprenez la partie.",
+                                  on_close=self.resume_after_quiz)
+
+    def resume_after_quiz(self):
+        self.load_next_card()
+        self.show_frame("GameFrame")
+
+    def prompt_save_score(self, score, on_done=None):
+        """Demande le nom du joueur (si le score est non nul), puis appelle `on_done()`."""
+        def submit(name):
             if name:
                 self.save_score(score, name)
+            if on_done is not None:
+                on_done()
 
+        if score > 0:
+            self.overlay.ask_string("Nom", "Entrez votre nom pour enregistrer votre score:", submit)
+        else:
+            submit(None)
+
+    def end_game(self):
+        if self.close_on_game_over:
+            self.destroy()
+        else:
+            self.engine.reset()
+            self.show_frame("MenuFrame")
+
+    @instrument.timed("save_score")
     def save_score(self, score, name):
-        score_data = {"name": name, "score": score, "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-        scores_file = os.path.join(self.assets_dir, "scores.json")
-        try:
-            if os.path.exists(scores_file):
-                with open(scores_file, "r", encoding="utf-8") as f:
-                    scores = json.load(f)
-            else:
-                scores = []
-        except Exception as e:
-            print(f"Erreur lors du chargement du fichier de scores: {e}")
-            scores = []
-        scores.append(score_data)
+        if self.score_store is None:
+            return
         try:
-            with open(scores_file, "w", encoding="utf-8") as f:
-                json.dump(scores, f, indent=4)
+            self.score_store.add(name, score, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         except Exception as e:
             print(f"Erreur lors de la sauvegarde du score: {e}")
 
     def show_scores(self):
-        scores_file = os.path.join(self.assets_dir, "scores.json")
-        try:
-            if os.path.exists(scores_file):
-                with open(scores_file, "r", encoding="utf-8") as f:
-                    scores = json.load(f)
-            else:
-                scores = []
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors du chargement des scores: {e}")
-            return
-        if scores:
-            scores_text = "Scores enregistrés :\n"
-            scores = sorted(scores, key=lambda x: x["score"], reverse=True)
-            for s in scores:
-                scores_text += f"{s['date']} - {s['name']} : {s['score']} points\n"
-        else:
-            scores_text = "Aucun score enregistré."
-        messagebox.showinfo("Scores", scores_text)
+        self.frame("LeaderboardFrame").refresh()
+        self.show_frame("LeaderboardFrame")
 
     def return_to_menu(self):
-        score = len(self.game_log)
-        if score > 0:
-            self.prompt_save_score(score)
+        if self.overlay.active:
+            return
+        score = self.engine.score
+        # La sauvegarde est abandonnée tout de suite, le retour au menu se fait après la saisie du nom
+        self.session.discard()
+        self.finish_recording()
+        self.prompt_save_score(score, on_done=self.reset_to_menu)
+
+    def reset_to_menu(self):
         # Réinitialiser l'état pour une nouvelle partie
-        self.quiz_used = False
-        self.game_log = []
-        self.gauges = {"budget": 50, "bonheur": 50, "epargne": 50}
+        self.engine.reset()
         self.show_frame("MenuFrame")
 
+    def finish_recording(self, interrupted=False):
+        self.in_game = False
+        self.telemetry.end_game(self.engine.score, interrupted)
+        self.recordings.submit(self.recording, self.engine, interrupted)
+        self.recording = GameRecording()
+
     def quit_game(self):
-        self.return_to_menu()
+        # La partie en cours reste sauvegardée : elle pourra être reprise depuis le menu.
+        # Les décisions déjà prises sont enregistrées, la suite le sera après la reprise.
+        if self.in_game:
+            self.finish_recording(interrupted=True)
+        self.destroy()
 
 
 class MenuFrame(ttk.Frame):
@@ -342,19 +584,27 @@ class MenuFrame(ttk.Frame):
         super().__init__(parent, style="TFrame")
         self.controller = controller
         # Ajout du logo dans le menu
-        logo_label = ttk.Label(self, image=self.controller.logo_app)
-        logo_label.pack(pady=10)
+        self.logo_label = ttk.Label(self, image=self.controller.logo_app or "")
+        self.logo_label.pack(pady=10)
         title = ttk.Label(self, text="Bienvenue dans ANACOFINANCE", font=("Helvetica", 24, "bold"), style="TLabel")
         title.pack(pady=20)
         play_button = ttk.Button(self, text="Jouer", command=self.start_game, bootstyle="Primary")
         play_button.pack(pady=10, ipadx=10, ipady=5)
+        self.resume_button = ttk.Button(self, text="Reprendre la partie", command=self.controller.resume_game,
+                                        bootstyle="Primary")
+        self.resume_button.pack(pady=10, ipadx=10, ipady=5)
         scores_button = ttk.Button(self, text="Voir les scores", command=self.controller.show_scores,
                                    bootstyle="Primary")
         scores_button.pack(pady=10, ipadx=10, ipady=5)
-        quit_button = ttk.Button(self, text="Quitter", command=self.controller.destroy, bootstyle="Primary")
+        quit_button = ttk.Button(self, text="Quitter", command=self.controller.quit_game, bootstyle="Primary")
         quit_button.pack(pady=10, ipadx=10, ipady=5)
 
+    def update_resume_button(self):
+        self.resume_button.config(state="normal" if self.controller.session.exists() else "disabled")
+
     def start_game(self):
+        if self.controller.overlay.active:
+            return
         rules = (
             "Règles du jeu :\n\n"
             "- Gérez votre patrimoine en équilibrant votre Budget, votre Bonheur et votre Épargne.\n"
@@ -362,9 +612,7 @@ class MenuFrame(ttk.Frame):
             "- Si l'une de vos jauges tombe à 0, vous aurez une chance unique de reprendre via un quiz.\n"
             "- Si vous réussissez le quiz, vous reprenez votre partie depuis l'état précédent.\n"
         )
-        messagebox.showinfo("Règles", rules)
-        self.controller.load_next_card()
-        self.controller.show_frame("GameFrame")
+        self.controller.overlay.show("Règles", rules, on_close=self.controller.new_game)
 
 
 class GameFrame(ttk.Frame):
@@ -375,17 +623,26 @@ class GameFrame(ttk.Frame):
         super().__init__(parent, style="Card.TFrame")
         self.controller = controller
 
+        self.render = controller.render
+
         self.gauges_frame = ttk.Frame(self)
         self.gauges_frame.pack(pady=10)
         self.budget_label = ttk.Label(self.gauges_frame, text="", image=self.controller.budget_icon, compound="left",
                                       style="Question.TLabel")
-        self.budget_label.pack(side="left", padx=10)
+        self.budget_label.grid(row=0, column=0, padx=10)
         self.bonheur_label = ttk.Label(self.gauges_frame, text="", image=self.controller.bonheur_icon, compound="left",
                                        style="Question.TLabel")
-        self.bonheur_label.pack(side="left", padx=10)
+        self.bonheur_label.grid(row=0, column=1, padx=10)
         self.epargne_label = ttk.Label(self.gauges_frame, text="", image=self.controller.epargne_icon, compound="left",
                                        style="Question.TLabel")
-        self.epargne_label.pack(side="left", padx=10)
+        self.epargne_label.grid(row=0, column=2, padx=10)
+        # Barres de jauges animées sous chaque libellé
+        self.budget_bar = GaugeBar(self.gauges_frame, length=180, bootstyle="info")
+        self.budget_bar.grid(row=1, column=0, padx=10, pady=(4, 0))
+        self.bonheur_bar = GaugeBar(self.gauges_frame, length=180, bootstyle="success")
+        self.bonheur_bar.grid(row=1, column=1, padx=10, pady=(4, 0))
+        self.epargne_bar = GaugeBar(self.gauges_frame, length=180, bootstyle="warning")
+        self.epargne_bar.grid(row=1, column=2, padx=10, pady=(4, 0))
 
         # Ajout du label de score
         self.score_label = ttk.Label(self, text="Score: 0", style="TLabel")
@@ -458,31 +715,45 @@ class GameFrame(ttk.Frame):
         self.next_button.pack(pady=10)
 
     def update_gauges_label(self, budget, bonheur, epargne):
-        self.budget_label.config(text=f"Budget: {budget}")
-        self.bonheur_label.config(text=f"Bonheur: {bonheur}")
-        self.epargne_label.config(text=f"Épargne: {epargne}")
+        self.render.set(self.budget_label, text=f"Budget: {budget}")
+        self.render.set(self.bonheur_label, text=f"Bonheur: {bonheur}")
+        self.render.set(self.epargne_label, text=f"Épargne: {epargne}")
+        self.budget_bar.animate_to(budget)
+        self.bonheur_bar.animate_to(bonheur)
+        self.epargne_bar.animate_to(epargne)
         # Mise à jour du score (nombre de cartes vues)
-        score = len(self.controller.game_log)
-        self.score_label.config(text=f"Score: {score}")
+        score = self.controller.engine.score
+        self.render.set(self.score_label, text=f"Score: {score}")
 
+    @instrument.timed("set_card")
     def set_card(self, card):
         self.current_card = card
-        self.question_label.config(text=card.get("question", "Question non définie"))
-        self.explanation_label.config(text="")  # Réinitialisation de l'explication
+        self.render.set(self.question_label, text=card.get("question", "Question non définie"))
+        self.render.set(self.explanation_label, text="")  # Réinitialisation de l'explication
+        # Les états des boutons sont appliqués immédiatement (lus par les raccourcis clavier)
         self.next_button.config(state="disabled")
-        self.optionA_button.config(state="normal", text=f"(←) {card['optionA'].get('text', 'Option A')}")
-        self.optionB_button.config(state="normal", text=f"{card['optionB'].get('text', 'Option B')} (→)")
-        char_image = get_random_character_image(self.controller.character_dir, (150, 150))
+        self.optionA_button.config(state="normal")
+        self.optionB_button.config(state="normal")
+        self.render.set(self.optionA_button, text=f"(←) {card['optionA'].get('text', 'Option A')}")
+        self.render.set(self.optionB_button, text=f"{card['optionB'].get('text', 'Option B')} (→)")
+        char_image = self.controller.sprite_pool.get()
+        # Préchargement du portrait de la carte suivante pendant la lecture de celle-ci
+        self.controller.sprite_pool.prefetch()
         if char_image:
-            self.character_label.config(image=char_image)
+            self.render.set(self.character_label, image=char_image)
             self.character_label.image = char_image
         else:
-            self.character_label.config(text="Personnage", image="")
+            self.render.set(self.character_label, text="Personnage", image="")
 
     def show_indice(self):
         if hasattr(self, "current_card"):
+            self.controller.telemetry.hint(self.controller.engine.current_index)
             indice = self.current_card.get("hint", "Pas d'indice disponible.")
-            messagebox.showinfo("Indice du conseiller", indice)
+            advice = self.controller.advice()
+            if advice:
+                option = self.current_card["option" + advice].get("text", "Option " + advice)
+                indice += f"\n\nLe conseiller recommande : {option}"
+            self.controller.overlay.show("Indice du conseiller", indice)
 
     def show_shortcuts(self):
         shortcuts = (
@@ -490,24 +761,22 @@ class GameFrame(ttk.Frame):
             "- 'i' : Afficher l'indice\n"
             "- Flèche gauche (←) : Sélectionner l'option A ou passer\n"
             "- Flèche droite (→) : Sélectionner l'option B ou passer\n"
-            "- Entrée : Valider la réponse (quiz) ou passer à la question suivante (jeu)\n"
+            "- Entrée : Valider la réponse (quiz) ou passer à la question suivante (jeu), fermer un message\n"
+            "- Échap : Fermer un message sans valider\n"
             "- Flèches haut (↑)/bas (↓) dans le quiz : Naviguer entre les options"
         )
-        messagebox.showinfo("Raccourcis", shortcuts)
+        self.controller.overlay.show("Raccourcis", shortcuts)
 
     def choice(self, option):
+        if self.controller.overlay.active:
+            return
         self.optionA_button.config(state="disabled")
         self.optionB_button.config(state="disabled")
-        # Affichage de l'explication après le choix
-        if option == "A":
-            explanation = self.current_card["optionA"].get("explanation", "")
-        else:
-            explanation = self.current_card["optionB"].get("explanation", "")
-        self.show_explanation(explanation)
+        # L'explication est affichée par le contrôleur une fois le choix appliqué
         self.controller.apply_choice(option)
 
     def show_explanation(self, explanation):
-        self.explanation_label.config(text=explanation)
+        self.render.set(self.explanation_label, text=explanation)
 
     def enable_next_button(self):
         self.next_button.config(state="normal")
@@ -548,13 +817,13 @@ class QuizFrame(ttk.Frame):
                                       style="Quiz.TButton")
         self.quit_button.pack(pady=10)
 
-        self.bind("<Return>", lambda event: self.submit_answer())
         self.bind("<Up>", self.on_up_arrow)
         self.bind("<Down>", self.on_down_arrow)
         self.focus_set()
 
     def load_question(self, question, current_num, total):
         self.focus_set()
+        self.controller.telemetry.shown()
         self.current_question = question
         self.progress_label.config(text=f"Question {current_num}/{total}")
         self.question_label.config(text=question.get("question", "Question non définie"))
@@ -585,13 +854,139 @@ class QuizFrame(ttk.Frame):
         self.var_answer.set(options[new_index])
 
     def submit_answer(self):
+        if self.controller.overlay.active:
+            return
         answer = self.var_answer.get()
         if not answer:
-            messagebox.showwarning("Attention", "Veuillez sélectionner une réponse.")
+            self.controller.overlay.toast("Veuillez sélectionner une réponse.")
             return
         self.controller.process_quiz_answer(answer)
 
 
+class LeaderboardFrame(ttk.Frame):
+    """
+    Tableau des scores virtualisé : le Treeview ne contient que les lignes déjà
+    parcourues, les pages suivantes sont chargées à la demande depuis la base des
+    scores lorsque l'utilisateur approche du bas de la liste.
+    """
+    PAGE_SIZE = 50
+
+    def __init__(self, parent, controller):
+        super().__init__(parent, style="TFrame")
+        self.controller = controller
+        self.last_row = None
+        self.exhausted = False
+        self.page_pending = False
+        self.rank = 0
+
+        title = ttk.Label(self, text="Scores enregistrés", font=("Helvetica", 24, "bold"), style="TLabel")
+        title.pack(pady=20)
+
+        self.filters_frame = ttk.Frame(self)
+        self.filters_frame.pack(pady=5)
+        ttk.Label(self.filters_frame, text="Nom :", style="TLabel").grid(row=0, column=0, padx=5)
+        self.name_var = tk.StringVar()
+        ttk.Entry(self.filters_frame, textvariable=self.name_var, width=15).grid(row=0, column=1, padx=5)
+        ttk.Label(self.filters_frame, text="Du (AAAA-MM-JJ) :", style="TLabel").grid(row=0, column=2, padx=5)
+        self.date_from_var = tk.StringVar()
+        ttk.Entry(self.filters_frame, textvariable=self.date_from_var, width=12).grid(row=0, column=3, padx=5)
+        ttk.Label(self.filters_frame, text="Au :", style="TLabel").grid(row=0, column=4, padx=5)
+        self.date_to_var = tk.StringVar()
+        ttk.Entry(self.filters_frame, textvariable=self.date_to_var, width=12).grid(row=0, column=5, padx=5)
+        ttk.Button(self.filters_frame, text="Filtrer", command=self.refresh,
+                   style="Primary.TButton").grid(row=0, column=6, padx=5)
+
+        self.table_frame = ttk.Frame(self)
+        self.table_frame.pack(pady=10)
+        self.tree = ttk.Treeview(self.table_frame, columns=("rank", "name", "score", "date"),
+                                 show="headings", height=20)
+        for column, text, width in (("rank", "Rang", 60), ("name", "Nom", 250),
+                                    ("score", "Score", 80), ("date", "Date", 200)):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor="center")
+        self.scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.tree.pack(side="left")
+        self.scrollbar.pack(side="left", fill="y")
+
+        self.count_label = ttk.Label(self, text="", style="TLabel")
+        self.count_label.pack(pady=5)
+
+        self.back_button = ttk.Button(self, text="Retour au menu", command=lambda: controller.show_frame("MenuFrame"),
+                                      style="Primary.TButton")
+        self.back_button.pack(pady=10, ipadx=10, ipady=5)
+
+    def filters(self):
+        date_to = self.date_to_var.get().strip()
+        if len(date_to) == 10:
+            date_to += " 23:59:59"
+        return {
+            "name": self.name_var.get().strip() or None,
+            "date_from": self.date_from_var.get().strip() or None,
+            "date_to": date_to or None,
+        }
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        self.last_row = None
+        self.exhausted = False
+        self.rank = 0
+        store = self.controller.score_store
+        if store is None:
+            self.count_label.config(text="Aucun score enregistré.")
+            return
+        try:
+            total = store.count(**self.filters())
+        except Exception as e:
+            self.show_error(e)
+            return
+        self.count_label.config(text=f"{total} score(s)" if total else "Aucun score enregistré.")
+        self.load_page()
+
+    def load_page(self):
+        self.page_pending = False
+        store = self.controller.score_store
+        if self.exhausted or store is None:
+            return
+        try:
+            rows = store.page(self.PAGE_SIZE, after=self.last_row, **self.filters())
+        except Exception as e:
+            # Plus de chargement au défilement tant que la liste n'est pas actualisée
+            self.exhausted = True
+            self.show_error(e)
+            return
+        if len(rows) < self.PAGE_SIZE:
+            self.exhausted = True
+        for row in rows:
+            self.rank += 1
+            _, name, score, date = row
+            self.tree.insert("", "end", values=(self.rank, name, score, date))
+        if rows:
+            self.last_row = rows[-1]
+
+    def show_error(self, error):
+        print(f"Erreur lors du chargement des scores: {error}")
+        self.controller.overlay.show("Erreur", f"Erreur lors du chargement des scores : {error}")
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Chargement de la page suivante quand le bas de la liste devient visible
+        if float(last) > 0.9 and not self.exhausted and not self.page_pending:
+            self.page_pending = True
+            self.after_idle(self.load_page)
+
+
 if __name__ == "__main__":
     app = SeriousGame()
+    if "--startup-benchmark" in sys.argv:
+        # Mesure du temps d'affichage du menu : on quitte juste après le premier affichage
+        app.after_idle(app.after_idle, lambda: (print(json.dumps(app.startup_timings)), app.destroy()))
     app.mainloop()
+    if app.watcher:
+        app.watcher.close()
+    app.session.close()
+    app.recordings.close()
+    app.telemetry.close()
+    if app.sprite_pool:
+        # Statistiques du cache : rapport d'instrumentation (fournisseur "sprite_pool") si --profile
+        app.sprite_pool.close()
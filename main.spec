@@ -1,11 +1,28 @@
 # -*- mode: python ; coding: utf-8 -*-
+import sys
 
+sys.path.insert(0, SPECPATH)
+import atlas
+import lint
+import questionbank
+
+# Étape de construction des images : seul l'atlas (déjà redimensionné) est livré,
+# il doit donc correspondre aux images sources actuelles.
+atlas_index = atlas.load_index()
+if atlas_index is None or atlas.stale_sources(atlas_index):
+    raise SystemExit("assets/atlas.png absent ou périmé : lancer py atlas.py avant PyInstaller")
+
+# Contenu : une carte ou une question invalide bloque la construction (détails : py lint.py)
+for content in ["cards.json"] + questionbank.discover("quiz.json"):
+    content_errors = lint.gate(content)
+    if content_errors:
+        raise SystemExit(f"{content} invalide : {content_errors[0]} (lancer py lint.py)")
 
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets', 'assets')],
+    datas=[('assets/atlas.png', 'assets'), ('assets/atlas.json', 'assets'), ('assets/scores.json', 'assets')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
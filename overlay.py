@@ -0,0 +1,119 @@
+"""
+Messages affichés dans la fenêtre principale, sans boucle modale imbriquée.
+
+Les boîtes `messagebox` / `simpledialog` bloquent les raccourcis clavier et empêchent
+de piloter l'interface par script. L'`Overlay` affiche à la place un panneau au centre
+de la fenêtre ; les messages arrivés pendant qu'un autre est affiché sont mis en file
+et présentés dans l'ordre. La suite du jeu est passée en rappel (`on_close`,
+`on_submit`) au lieu d'attendre le retour d'une fonction bloquante.
+
+Entrée valide le panneau courant, Échap l'annule (la saisie renvoie alors None).
+Les toasts sont de courts messages non bloquants qui disparaissent seuls.
+"""
+from collections import deque
+
+import tkinter as tk
+import ttkbootstrap as ttk
+
+
+class Overlay:
+    def __init__(self, root):
+        self.root = root
+        self.queue = deque()
+        self.current = None
+        self.previous_focus = None
+        self.entry_var = tk.StringVar()
+
+        self.panel = ttk.Frame(root, style="Card.TFrame", padding=20)
+        self.title_label = ttk.Label(self.panel, text="", style="Question.TLabel")
+        self.title_label.pack(pady=(0, 10))
+        self.message_label = ttk.Label(self.panel, text="", wraplength=700, style="TLabel", justify="left")
+        self.message_label.pack(pady=5)
+        self.entry = ttk.Entry(self.panel, textvariable=self.entry_var, width=30)
+        self.button = ttk.Button(self.panel, text="OK (Entrée)", command=self.submit, style="Primary.TButton")
+        self.button.pack(pady=(10, 0))
+
+        self.toast_label = ttk.Label(root, text="", style="Header.TLabel", padding=10)
+        self.toast_job = None
+
+    @property
+    def active(self):
+        return self.current is not None
+
+    def show(self, title, message, on_close=None):
+        """Affiche un message ; `on_close()` est appelé à sa fermeture."""
+        self._enqueue({"title": title, "message": message, "callback": on_close, "prompt": False})
+
+    def ask_string(self, title, prompt, on_submit):
+        """Demande une saisie ; `on_submit(texte)` reçoit None si l'utilisateur annule."""
+        self._enqueue({"title": title, "message": prompt, "callback": on_submit, "prompt": True})
+
+    def _enqueue(self, item):
+        self.queue.append(item)
+        if self.current is None:
+            self.previous_focus = self.root.focus_get()
+            self._next()
+
+    def _next(self):
+        if not self.queue:
+            self.current = None
+            self.panel.place_forget()
+            return
+        self.current = item = self.queue.popleft()
+        self.title_label.config(text=item["title"])
+        self.message_label.config(text=item["message"])
+        if item["prompt"]:
+            self.entry_var.set("")
+            self.entry.pack(pady=5, before=self.button)
+            self.entry.focus_set()
+        else:
+            self.entry.pack_forget()
+            self.panel.focus_set()
+        self.panel.place(relx=0.5, rely=0.5, anchor="center")
+        self.panel.lift()
+
+    def submit(self):
+        self._close(cancelled=False)
+
+    def cancel(self):
+        self._close(cancelled=True)
+
+    def _close(self, cancelled):
+        item = self.current
+        if item is None:
+            return
+        self.current = None
+        self.panel.place_forget()
+        if not self.queue:
+            self._restore_focus()
+        callback = item["callback"]
+        if callback is not None:
+            if item["prompt"]:
+                callback(None if cancelled else self.entry_var.get().strip() or None)
+            else:
+                callback()
+        # Le rappel a pu ajouter des messages ou détruire la fenêtre
+        try:
+            if self.current is None:
+                self._next()
+        except tk.TclError:
+            pass
+
+    def _restore_focus(self):
+        widget, self.previous_focus = self.previous_focus, None
+        try:
+            (widget or self.root).focus_set()
+        except tk.TclError:
+            pass
+
+    def toast(self, message, duration_ms=2000):
+        self.toast_label.config(text=message)
+        self.toast_label.place(relx=0.5, rely=0.95, anchor="s")
+        self.toast_label.lift()
+        if self.toast_job is not None:
+            self.root.after_cancel(self.toast_job)
+        self.toast_job = self.root.after(duration_ms, self._hide_toast)
+
+    def _hide_toast(self):
+        self.toast_job = None
+        self.toast_label.place_forget()
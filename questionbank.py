@@ -0,0 +1,187 @@
+"""
+Banque de questions du quiz de seconde chance.
+
+Les fichiers de questions (quiz.json et les fichiers .json / .jsonl du dossier banks/)
+sont compilés par deckpack et projetés en mémoire : les textes ne sont décodés que pour
+les questions tirées, la mémoire ne grandit pas avec la taille de la banque. Au
+chargement, seules les colonnes thème et difficulté sont lues pour construire l'index
+(tableaux d'identifiants de 4 octets par question).
+
+Le tirage de k questions se fait en O(k) avec un mélange de Fisher-Yates paresseux
+propre à chaque joueur (QuizHistory) : une question n'est pas reproposée avant que
+toutes celles du même filtre aient été vues.
+
+Format d'une question : {"question", "options": {"A".."D"}, "answer", "explanation",
+"topic" (facultatif), "difficulty" (entier, facultatif)}.
+"""
+import bisect
+import os
+from array import array
+from collections.abc import Sequence
+
+import deckpack
+
+
+BANK_DIR = "banks"
+BANK_EXTENSIONS = (".json", ".jsonl")
+
+
+def discover(main="quiz.json", directory=BANK_DIR):
+    """Renvoie `main` suivi des fichiers de questions du dossier `directory` (s'il existe)."""
+    paths = [main] if main else []
+    try:
+        paths.extend(os.path.join(directory, f) for f in sorted(os.listdir(directory))
+                     if f.endswith(BANK_EXTENSIONS))
+    except OSError:
+        pass
+    return paths
+
+
+class SparseShuffle:
+    """
+    Permutation aléatoire de range(n) tirée au fur et à mesure : seules les positions
+    déplacées sont mémorisées (dictionnaire), chaque tirage coûte O(1). Une fois les n
+    éléments tirés, un nouveau cycle commence : chaque valeur est tirée exactement une
+    fois par cycle.
+    """
+    __slots__ = ("n", "cursor", "swaps")
+
+    def __init__(self, n):
+        self.n = n
+        self.cursor = 0
+        self.swaps = {}
+
+    def take(self, k, rng):
+        k = min(k, self.n)
+        taken = []
+        previous = ()  # valeurs de ce lot tirées avant un changement de cycle
+        while len(taken) < k:
+            if self.cursor >= self.n:
+                self.cursor = 0
+                self.swaps.clear()
+                previous = set(taken)
+            i = self.cursor
+            j = rng.randrange(i, self.n)
+            value = self.swaps.get(j, j)
+            # Une valeur déjà dans ce lot reste dans la partie non tirée du nouveau cycle : on
+            # en tire une autre (il en reste toujours une, puisque k <= n)
+            while value in previous:
+                j = rng.randrange(i, self.n)
+                value = self.swaps.get(j, j)
+            current = self.swaps.pop(i, i)
+            if j != i:
+                self.swaps[j] = current
+            self.cursor += 1
+            taken.append(value)
+        return taken
+
+
+class QuizHistory:
+    """Questions déjà vues par un joueur, par filtre (thème, difficulté)."""
+
+    def __init__(self):
+        self.shuffles = {}
+
+    def take(self, key, n, k, rng):
+        shuffle = self.shuffles.get(key)
+        if shuffle is None or shuffle.n != n:
+            shuffle = self.shuffles[key] = SparseShuffle(n)
+        return shuffle.take(k, rng)
+
+
+class QuestionBank(Sequence):
+    """Questions de plusieurs fichiers compilés, vues comme une seule séquence indexée."""
+
+    def __init__(self, decks):
+        self.decks = [deck for deck in decks if len(deck)]
+        self.starts = []
+        total = 0
+        for deck in self.decks:
+            self.starts.append(total)
+            total += len(deck)
+        self.count = total
+        self.pools = {}
+        self._build_index()
+
+    @classmethod
+    def load(cls, paths):
+        return cls([deckpack.load_quiz(path) for path in paths])
+
+    def _build_index(self):
+        """Un tableau d'identifiants par couple (thème, difficulté) présent dans la banque."""
+        buckets = {}
+        for deck, start in zip(self.decks, self.starts):
+            topics = {}
+            records = deck.buffer[deck.records_offset:deck.records_offset + len(deck) * deck.RECORD.size]
+            for i, record in enumerate(deck.RECORD.iter_unpack(records)):
+                topic_index, difficulty = record[8], record[9]
+                topic = topics.get(topic_index)
+                if topic is None and topic_index != deckpack.ABSENT:
+                    topic = topics[topic_index] = deck.string(topic_index)
+                key = (topic, None if difficulty == deckpack.ABSENT else difficulty)
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = array("I")
+                bucket.append(start + i)
+        self.buckets = buckets
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        d = bisect.bisect_right(self.starts, i) - 1
+        return self.decks[d][i - self.starts[d]]
+
+    def topics(self):
+        return sorted({topic for topic, _ in self.buckets if topic is not None})
+
+    def difficulties(self):
+        return sorted({difficulty for _, difficulty in self.buckets if difficulty is not None})
+
+    def pool(self, topic=None, difficulty=None):
+        """
+        Identifiants correspondant au filtre (None = tout), ou None pour la banque entière.
+        Les combinaisons sont assemblées à la première demande puis conservées.
+        """
+        if topic is None and difficulty is None:
+            return None
+        key = (topic, difficulty)
+        pool = self.pools.get(key)
+        if pool is None:
+            exact = self.buckets.get(key) if topic is not None and difficulty is not None else None
+            if exact is not None:
+                pool = exact
+            else:
+                parts = [ids for (t, d), ids in self.buckets.items()
+                         if (topic is None or t == topic) and (difficulty is None or d == difficulty)]
+                pool = array("I", sorted(i for ids in parts for i in ids)) if len(parts) != 1 else parts[0]
+            self.pools[key] = pool
+        return pool
+
+    def sample(self, k, rng, history=None, topic=None, difficulty=None):
+        """
+        Tire k questions distinctes en O(k). Avec `history`, les questions déjà vues par le
+        joueur ne reviennent qu'après épuisement du filtre.
+        """
+        pool = self.pool(topic, difficulty)
+        n = self.count if pool is None else len(pool)
+        if history is None:
+            history = QuizHistory()
+        positions = history.take((topic, difficulty), n, k, rng)
+        if pool is None:
+            return [self[i] for i in positions]
+        return [self[pool[i]] for i in positions]
+
+
+def format_corrections(mistakes):
+    """Texte des corrections pour les (numéro, question, réponse donnée) de GameEngine.quiz_mistakes."""
+    parts = []
+    for i, q, answer in mistakes:
+        parts.append(f"Question {i + 1}: {q.get('question', 'Question non définie')}\n"
+                     f"Votre réponse: {answer} | Réponse correcte: {q['answer']}\n"
+                     f"Explication: {q.get('explanation', 'Aucune explication')}\n\n")
+    return "".join(parts)
@@ -0,0 +1,127 @@
+"""
+Enregistrement des parties jouées, pour les statistiques des enseignants (analytics.py).
+
+Chaque partie terminée est ajoutée en fin de fichier (un fichier par jour) sous forme
+d'un bloc en colonnes : en-tête fixe puis, pour ses n décisions, les colonnes
+cartes (uint64, voir card_id), choix (uint8, 0 = A), drapeaux (uint8), variations des
+trois jauges (int32 x 3) et temps de décision en ms (uint32). Les blocs ne sont jamais
+réécrits : l'analyse peut reprendre un fichier là où elle s'était arrêtée.
+
+Une carte est identifiée par une empreinte de sa clé stable (lint.item_key : "id" ou
+texte de la question) et non par son indice : les statistiques restent justes quand le
+paquet est réordonné, modifié au cours de l'année, rechargé à chaud en pleine partie ou
+quand le serveur utilise un autre paquet dans le même dossier.
+
+Contrairement au GameLog du moteur, les décisions annulées par la seconde chance du
+quiz sont conservées : la carte fatale est marquée par les bits des jauges tombées à 0.
+"""
+import hashlib
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime
+
+from engine import GAUGES
+from lint import item_key
+
+
+BLOCK = struct.Struct("<4sHHIqI")  # magie, version, drapeaux, décisions, début (s), score
+MAGIC = b"ANAR"
+VERSION = 1
+ROW_SIZE = 8 + 1 + 1 + 12 + 4
+# Drapeaux du bloc
+GAME_QUIZ_USED = 1
+GAME_RESCUED = 2
+GAME_INTERRUPTED = 4  # fenêtre fermée en cours de partie (la suite sera un autre bloc)
+# Drapeaux d'une décision : jauges tombées à 0
+FATAL_BITS = (1, 2, 4)
+
+
+def day_file(directory, when=None):
+    return os.path.join(directory, f"sessions-{(when or datetime.now()).strftime('%Y-%m-%d')}.rec")
+
+
+def card_id(card):
+    """Identifiant stable d'une carte sur 64 bits (empreinte de lint.item_key)."""
+    digest = hashlib.blake2b(str(item_key(card)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class GameRecording:
+    """Décisions d'une partie en cours, avec le temps passé sur chaque carte."""
+
+    def __init__(self):
+        self.started = int(time.time())
+        self.cards = array("Q")
+        self.choices = array("B")
+        self.flags = array("B")
+        self.deltas = array("i")
+        self.decision_ms = array("I")
+        self.rescued = False
+        self.shown_at = None
+
+    def __len__(self):
+        return len(self.cards)
+
+    def card_shown(self):
+        self.shown_at = time.perf_counter()
+
+    def record(self, game):
+        """À appeler après GameEngine.apply_choice."""
+        card, choice, delta = game.game_log[-1]
+        gauges = game.gauges
+        elapsed = 0 if self.shown_at is None else time.perf_counter() - self.shown_at
+        self.cards.append(card_id(game.cards[card]))
+        self.choices.append(0 if choice == "A" else 1)
+        self.flags.append(sum(bit for bit, gauge in zip(FATAL_BITS, GAUGES) if gauges[gauge] <= 0))
+        self.deltas.extend(delta)
+        self.decision_ms.append(min(int(elapsed * 1000), 0xFFFFFFFF))
+        self.shown_at = None
+
+    def record_rescue(self):
+        self.rescued = True
+
+    def to_bytes(self, game, interrupted=False):
+        flags = ((GAME_QUIZ_USED if game.quiz_used else 0) | (GAME_RESCUED if self.rescued else 0)
+                 | (GAME_INTERRUPTED if interrupted else 0))
+        columns = [self.cards, self.choices, self.flags, self.deltas, self.decision_ms]
+        if sys.byteorder == "big":
+            columns = [array(column.typecode, column) for column in columns]
+            for column in columns:
+                column.byteswap()
+        header = BLOCK.pack(MAGIC, VERSION, flags, len(self.cards), self.started, game.score)
+        return header + b"".join(column.tobytes() for column in columns)
+
+
+class RecordingWriter:
+    """Écrit les parties terminées dans un thread de fond (un seul write par bloc)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="recording-writer", daemon=True)
+        self._writer.start()
+
+    def submit(self, recording, game, interrupted=False):
+        if recording is not None and len(recording):
+            self._queue.put(recording.to_bytes(game, interrupted))
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+
+    def _run(self):
+        while True:
+            block = self._queue.get()
+            if block is None:
+                return
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(day_file(self.directory), "ab") as f:
+                    f.write(block)
+            except OSError as e:
+                print(f"Erreur lors de l'enregistrement de la partie: {e}")
@@ -0,0 +1,83 @@
+"""
+Ordonnanceur de rendu : regroupe les mises à jour de widgets et les applique en une
+seule passe, au prochain moment d'inactivité de Tk.
+
+`set(widget, text=...)` ne touche pas le widget immédiatement : les options demandées
+sont fusionnées (la dernière valeur l'emporte) et seules celles qui diffèrent de la
+valeur déjà affichée sont appliquées lors du `flush`. Plusieurs mises à jour dans le
+même évènement clavier ne provoquent donc qu'une reconfiguration par widget.
+
+Les états des boutons (normal / disabled) restent appliqués immédiatement par les
+frames : les gestionnaires de touches les lisent pour décider de l'action suivante.
+"""
+import tkinter as tk
+import ttkbootstrap as ttk
+
+import instrument
+
+
+_MISSING = object()
+
+
+class RenderScheduler:
+    def __init__(self, root):
+        self.root = root
+        self.pending = {}
+        self.applied = {}
+        self.scheduled = False
+        self.flushes = 0
+        self.configures = 0
+
+    def set(self, widget, **options):
+        self.pending.setdefault(widget, {}).update(options)
+        if not self.scheduled:
+            self.scheduled = True
+            self.root.after_idle(self.flush)
+
+    @instrument.timed("render_flush")
+    def flush(self):
+        self.scheduled = False
+        pending, self.pending = self.pending, {}
+        self.flushes += 1
+        for widget, options in pending.items():
+            applied = self.applied.setdefault(widget, {})
+            changed = {key: value for key, value in options.items() if applied.get(key, _MISSING) != value}
+            if changed:
+                widget.configure(**changed)
+                applied.update(changed)
+                self.configures += 1
+
+    def stats(self):
+        return {"flushes": self.flushes, "configures": self.configures}
+
+
+class GaugeBar(ttk.Progressbar):
+    """
+    Barre de jauge animée : `animate_to(valeur)` fait glisser la barre vers la cible par
+    petites étapes programmées avec `after()`, sans jamais bloquer la boucle Tk. Une
+    nouvelle cible pendant l'animation la réoriente simplement.
+    """
+    FRAME_MS = 16
+    EASING = 0.35
+
+    def __init__(self, parent, maximum=100, **kwargs):
+        self.variable = tk.DoubleVar(value=0)
+        super().__init__(parent, maximum=maximum, variable=self.variable, **kwargs)
+        self.maximum = maximum
+        self.target = 0
+        self.job = None
+
+    def animate_to(self, value):
+        self.target = max(0, min(value, self.maximum))
+        if self.job is None:
+            self.job = self.after(self.FRAME_MS, self._step)
+
+    def _step(self):
+        current = self.variable.get()
+        remaining = self.target - current
+        if abs(remaining) < 0.5:
+            self.variable.set(self.target)
+            self.job = None
+            return
+        self.variable.set(current + remaining * self.EASING)
+        self.job = self.after(self.FRAME_MS, self._step)
@@ -0,0 +1,202 @@
+"""
+Ordonnanceurs de tirage des cartes.
+
+Tous exposent `draw(gauges)` qui renvoie l'indice de la prochaine carte en O(1), sans
+parcours du paquet, et tirent leur hasard d'un `random.Random` fourni : une même graine
+donne la même suite de cartes. `get_state` / `set_state` permettent de sauvegarder
+puis rejouer exactement une partie.
+
+- "uniform" : tirage uniforme avec remise (comportement historique) ;
+- "shuffle" : sac mélangé, aucune carte ne revient avant `window` autres tirages ;
+- "weighted" : tirage pondéré par la clé facultative "weight" des cartes (table d'alias) ;
+- "balanced" : comme "shuffle", mais quand une jauge est basse, tire de préférence une
+  carte dont une option permet de la remonter (parmi celles hors de la fenêtre du sac).
+"""
+import random
+from collections import deque
+
+from effects import GAUGES, compile_effects
+
+
+HELPER_ATTEMPTS = 8  # tirages au hasard parmi les cartes utiles avant de filtrer la liste
+
+
+def rng_state(state):
+    """Accepte un état de `random.Random` relu depuis du JSON (listes au lieu de tuples)."""
+    version, internal, gauss = state
+    return version, tuple(internal), gauss
+
+
+class UniformScheduler:
+    def __init__(self, cards, rng=None):
+        self.size = len(cards)
+        self.rng = rng or random.Random()
+
+    def draw(self, gauges=None):
+        return self.rng.randrange(self.size)
+
+    def get_state(self):
+        return {"rng": self.rng.getstate()}
+
+    def set_state(self, state):
+        self.rng.setstate(rng_state(state["rng"]))
+
+
+class ShuffleBagScheduler:
+    """
+    Sac de cartes disponibles + file des cartes récemment tirées. Une carte tirée quitte
+    le sac (échange avec le dernier élément) et n'y revient qu'après `window` tirages.
+    `position` donne la place de chaque carte dans le sac (-1 si elle est dans la file),
+    pour retirer une carte précise en O(1) (`take`).
+    """
+
+    def __init__(self, cards, rng=None, window=None):
+        self.size = len(cards)
+        self.rng = rng or random.Random()
+        if window is None:
+            window = self.size // 2
+        self.window = max(0, min(window, self.size - 1))
+        self.available = list(range(self.size))
+        self.position = list(range(self.size))
+        self.recent = deque()
+
+    def draw(self, gauges=None):
+        return self.take(self.available[self.rng.randrange(len(self.available))])
+
+    def is_available(self, card):
+        return self.position[card] >= 0
+
+    def take(self, card):
+        """Retire `card` du sac (elle doit y être) et la place dans la file des cartes récentes."""
+        available, position = self.available, self.position
+        last = available.pop()
+        if last != card:
+            available[position[card]] = last
+            position[last] = position[card]
+        position[card] = -1
+        self.recent.append(card)
+        if len(self.recent) > self.window:
+            back = self.recent.popleft()
+            position[back] = len(available)
+            available.append(back)
+        return card
+
+    def get_state(self):
+        return {"rng": self.rng.getstate(), "available": list(self.available), "recent": list(self.recent)}
+
+    def set_state(self, state):
+        available, recent = list(state["available"]), list(state["recent"])
+        # Le sac et la file doivent contenir exactement les cartes du paquet
+        if sorted(available + recent) != list(range(self.size)):
+            raise ValueError("État du sac incompatible avec le paquet de cartes")
+        self.rng.setstate(rng_state(state["rng"]))
+        self.available = available
+        self.recent = deque(recent)
+        self.position = [-1] * self.size
+        for i, card in enumerate(available):
+            self.position[card] = i
+
+
+class AliasTable:
+    """Méthode d'alias de Vose : construction en O(n), tirage pondéré en O(1)."""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("Les poids doivent être positifs")
+        scaled = [w * n / total for w in weights]
+        self.probability = [0.0] * n
+        self.alias = [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.probability[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            self.probability[i] = 1.0
+
+    def sample(self, rng):
+        i = rng.randrange(len(self.probability))
+        return i if rng.random() < self.probability[i] else self.alias[i]
+
+
+class WeightedScheduler:
+    def __init__(self, cards, rng=None):
+        self.rng = rng or random.Random()
+        self.table = AliasTable([card.get("weight", 1) for card in cards])
+
+    def draw(self, gauges=None):
+        return self.table.sample(self.rng)
+
+    def get_state(self):
+        return {"rng": self.rng.getstate()}
+
+    def set_state(self, state):
+        self.rng.setstate(rng_state(state["rng"]))
+
+
+class BalancedScheduler:
+    """
+    Sac mélangé complété d'un index par jauge : pour chaque jauge, la liste des cartes
+    dont au moins une option l'augmente. Si la jauge la plus basse passe sous
+    `threshold`, une carte de son index est tirée avec la probabilité `bias`, parmi
+    celles encore dans le sac : elle en est retirée comme par un tirage normal, la
+    fenêtre sans répétition est donc respectée.
+    """
+
+    def __init__(self, cards, rng=None, window=None, threshold=25, bias=0.5):
+        self.rng = rng or random.Random()
+        self.bag = ShuffleBagScheduler(cards, self.rng, window)
+        self.threshold = threshold
+        self.bias = bias
+        self.helpers = {gauge: [] for gauge in GAUGES}
+        for index, options in enumerate(compile_effects(cards)):
+            for g, gauge in enumerate(GAUGES):
+                if any(effects[g] > 0 for effects in options):
+                    self.helpers[gauge].append(index)
+
+    def draw(self, gauges=None):
+        if gauges:
+            gauge = min(GAUGES, key=gauges.__getitem__)
+            helpers = self.helpers[gauge]
+            if gauges[gauge] < self.threshold and helpers and self.rng.random() < self.bias:
+                card = self._pick_helper(helpers)
+                if card is not None:
+                    return self.bag.take(card)
+        return self.bag.draw(gauges)
+
+    def _pick_helper(self, helpers):
+        """Carte tirée uniformément parmi `helpers` encore dans le sac, ou None s'il n'y en a aucune."""
+        bag = self.bag
+        for _ in range(HELPER_ATTEMPTS):
+            card = helpers[self.rng.randrange(len(helpers))]
+            if bag.is_available(card):
+                return card
+        candidates = [card for card in helpers if bag.is_available(card)]
+        return candidates[self.rng.randrange(len(candidates))] if candidates else None
+
+    def get_state(self):
+        return self.bag.get_state()
+
+    def set_state(self, state):
+        self.bag.set_state(state)
+
+
+SCHEDULERS = {
+    "uniform": UniformScheduler,
+    "shuffle": ShuffleBagScheduler,
+    "weighted": WeightedScheduler,
+    "balanced": BalancedScheduler,
+}
+
+
+def make_scheduler(name, cards, rng=None, **options):
+    try:
+        cls = SCHEDULERS[name]
+    except KeyError:
+        raise ValueError(f"Ordonnanceur inconnu : {name!r}") from None
+    return cls(cards, rng, **options)
@@ -0,0 +1,147 @@
+"""
+Stockage des scores dans une base SQLite locale.
+
+Chaque score est une insertion (pas de réécriture du fichier entier), faite dans une
+transaction atomique protégée par le verrou de fichier de SQLite : deux instances du jeu
+sur le même lecteur partagé ne s'écrasent plus, et un arrêt brutal ne corrompt pas la
+base. Des index sur le score et la date servent les requêtes de classement (top-K).
+L'ancien fichier scores.json est importé automatiquement à la première ouverture.
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+
+SCHEMA_VERSION = 1
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ScoreStore:
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        # Mode de journal par défaut (rollback) : contrairement au WAL, il fonctionne sur
+        # un lecteur réseau partagé. Le délai d'attente couvre les écritures concurrentes.
+        self.conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self._create_schema()
+        if legacy_json:
+            self._migrate(legacy_json)
+
+    def _create_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS scores (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                date TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, date DESC);
+            CREATE INDEX IF NOT EXISTS scores_by_date ON scores (date);
+            CREATE INDEX IF NOT EXISTS scores_by_name ON scores (name, score DESC);
+        """)
+
+    def _migrate(self, legacy_json):
+        """Importe scores.json une seule fois (PRAGMA user_version marque la migration)."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        entries = []
+        if os.path.exists(legacy_json):
+            try:
+                with open(legacy_json, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except Exception as e:
+                print(f"Erreur lors du chargement du fichier de scores: {e}")
+                return
+        with self._transaction():
+            # Relecture sous verrou : une autre instance a pu migrer entre-temps
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                return
+            self.conn.executemany(
+                "INSERT INTO scores (name, score, date) VALUES (?, ?, ?)",
+                [(s.get("name", ""), int(s.get("score", 0)), s.get("date", "")) for s in entries]
+            )
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+    def add(self, name, score, date=None):
+        self.add_many([(name, score, date)])
+
+    def add_many(self, rows):
+        """Enregistre plusieurs scores (nom, score, date ou None) dans une seule transaction."""
+        now = datetime.now().strftime(DATE_FORMAT)
+        with self._transaction():
+            self.conn.executemany(
+                "INSERT INTO scores (name, score, date) VALUES (?, ?, ?)",
+                [(name, score, date or now) for name, score, date in rows]
+            )
+
+    @staticmethod
+    def _filters(name, date_from, date_to):
+        clauses, params = [], []
+        if name:
+            clauses.append("name LIKE ?")
+            params.append(f"%{name}%")
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("date <= ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def top(self, limit=10, offset=0, name=None, date_from=None, date_to=None):
+        """
+        Renvoie les meilleurs scores (dictionnaires name/score/date), du plus haut au plus bas.
+        `limit=None` renvoie tous les scores.
+        """
+        where, params = self._filters(name, date_from, date_to)
+        rows = self.conn.execute(
+            f"SELECT name, score, date FROM scores {where} "
+            f"ORDER BY score DESC, date DESC LIMIT ? OFFSET ?",
+            params + [-1 if limit is None else limit, offset]
+        )
+        return [{"name": n, "score": s, "date": d} for n, s, d in rows]
+
+    def page(self, limit=50, after=None, name=None, date_from=None, date_to=None):
+        """
+        Pagination par clé pour le tableau des scores : renvoie jusqu'à `limit` tuples
+        (id, name, score, date) classés après la ligne `after` (dernière ligne de la page
+        précédente). La requête parcourt l'index sur le score sans tri complet ni OFFSET.
+        """
+        where, params = self._filters(name, date_from, date_to)
+        if after is not None:
+            last_id, _, last_score, last_date = after
+            where += " AND " if where else "WHERE "
+            where += "(score < ? OR (score = ? AND (date < ? OR (date = ? AND id > ?))))"
+            params += [last_score, last_score, last_date, last_date, last_id]
+        return self.conn.execute(
+            f"SELECT id, name, score, date FROM scores {where} ORDER BY score DESC, date DESC, id LIMIT ?",
+            params + [limit]
+        ).fetchall()
+
+    def count(self, name=None, date_from=None, date_to=None):
+        where, params = self._filters(name, date_from, date_to)
+        return self.conn.execute(f"SELECT COUNT(*) FROM scores {where}", params).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE prend le verrou d'écriture dès le début ; COMMIT ou ROLLBACK en sortie."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,323 @@
+"""
+Serveur de classe ANACOFINANCE : fait jouer des centaines d'élèves en même temps,
+sans interface Tk, avec les mêmes règles que le jeu (engine.GameEngine).
+
+Protocole en lignes : chaque message est un objet JSON sur une ligne, dans les deux sens.
+Le serveur envoie {"type": "hello"} à la connexion, puis répond à chaque commande :
+
+    {"cmd": "new"}                     -> {"type": "card", "card": {...}, "gauges": {...}, "score": 0}
+    {"cmd": "choose", "choice": "A"}   -> {"type": "result", "outcome": ..., "explanation": ...,
+                                           "gauges": {...}, "score": n, puis selon le résultat
+                                           "card" (carte suivante), "quiz" (questions de la
+                                           seconde chance) ou "final_score" (fin de partie)}
+    {"cmd": "quiz", "answers": [...]}  -> {"type": "quiz_result", "passed": bool, "corrections": [...],
+                                           puis "card" (reprise) ou "final_score"}
+    {"cmd": "hint"}                    -> {"type": "hint", "hint": ..., "advice": "A" / "B" / null}
+    {"cmd": "save", "name": "..."}     -> {"type": "saved"} (après la fin de partie)
+    {"cmd": "quit"}                    -> fermeture de la connexion
+
+Le paquet de cartes, ses effets et la banque de questions (format compilé de deckpack)
+sont chargés une seule fois et partagés, en lecture seule, par toutes les connexions ;
+chaque connexion n'a que son propre moteur de partie (et son historique de questions).
+Les scores passent par un unique écrivain qui les regroupe en une transaction SQLite
+(ScoreStore.add_many) dans un thread dédié. Les parties sont enregistrées comme dans le
+jeu (recording.py) pour analytics.py.
+
+Exemple : py server.py --port 8765 (ou --unix /tmp/anacofinance.sock)
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import deckpack
+import effects
+import engine
+import questionbank
+from recording import GameRecording, RecordingWriter
+from scores import ScoreStore, DATE_FORMAT
+from solver import PolicyTable
+
+
+MAX_LINE = 64 * 1024
+
+
+class ScoreWriter:
+    """
+    Écrivain unique des scores. Les demandes sont mises en file ; après une courte attente
+    (`delay`), toutes celles arrivées entre-temps sont écrites dans la même transaction.
+    La connexion SQLite est créée et utilisée uniquement dans le thread de l'écrivain.
+    """
+
+    def __init__(self, path, batch_size=256, delay=0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.delay = delay
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="score-writer")
+        self.store = None
+        self.task = None
+        self.written = 0
+        self.batches = 0
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.store = await loop.run_in_executor(self.executor, ScoreStore, self.path)
+        self.task = asyncio.create_task(self._run())
+
+    def submit(self, name, score):
+        self.queue.put_nowait((name, score, datetime.now().strftime(DATE_FORMAT)))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            batch = []
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+                await asyncio.sleep(self.delay)
+            while len(batch) < self.batch_size and not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if not batch:
+                continue
+            try:
+                await loop.run_in_executor(self.executor, self.store.add_many, batch)
+                self.written += len(batch)
+                self.batches += 1
+            except Exception as e:
+                print(f"Erreur lors de la sauvegarde des scores: {e}")
+
+    async def close(self):
+        """Écrit les scores en attente puis ferme la base."""
+        if self.task is not None:
+            self.queue.put_nowait(None)
+            await self.task
+        if self.store is not None:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self.store.close)
+        self.executor.shutdown()
+
+
+def card_message(card, index):
+    return {
+        "index": index,
+        "question": card.get("question", "Question non définie"),
+        "A": card["optionA"].get("text", "Option A"),
+        "B": card["optionB"].get("text", "Option B"),
+    }
+
+
+def question_message(question):
+    return {"question": question.get("question", "Question non définie"), "options": question.get("options", {})}
+
+
+class ClientSession:
+    """État d'une connexion : une partie en cours et l'étape attendue (carte, quiz, fin)."""
+
+    def __init__(self, server):
+        self.server = server
+        self.engine = engine.GameEngine(server.cards, server.quiz_questions, scheduler="shuffle",
+                                        effects=server.effects, schedules=server.schedules)
+        self.state = "idle"
+        self.quiz = []
+        self.final_score = None
+        self.recording = GameRecording()
+
+    def _gauges(self):
+        return {"gauges": dict(self.engine.gauges), "score": self.engine.score}
+
+    def _next_card(self, reply):
+        index = self.engine.draw_card()
+        self.state = "card"
+        reply["card"] = card_message(self.engine.current_card, index)
+        self.recording.card_shown()
+        return reply
+
+    def _game_over(self, reply):
+        self.state = "over"
+        self.final_score = self.engine.score
+        self._finish_recording()
+        reply["final_score"] = self.final_score
+        return reply
+
+    def _finish_recording(self, interrupted=False):
+        self.server.recordings.submit(self.recording, self.engine, interrupted)
+        self.recording = GameRecording()
+
+    def close(self):
+        """Connexion fermée : une partie en cours est enregistrée comme interrompue."""
+        if self.state in ("card", "quiz"):
+            self._finish_recording(interrupted=True)
+
+    def handle(self, message):
+        cmd = message.get("cmd")
+        handler = getattr(self, f"cmd_{cmd}", None) if isinstance(cmd, str) else None
+        if handler is None:
+            return {"type": "error", "message": f"Commande inconnue : {cmd!r}"}
+        return handler(message)
+
+    def cmd_new(self, message):
+        if self.state in ("card", "quiz"):
+            # Partie abandonnée, comme un retour au menu dans le jeu
+            self._finish_recording()
+        self.engine.reset()
+        self.final_score = None
+        return self._next_card({"type": "card", **self._gauges()})
+
+    def cmd_choose(self, message):
+        choice = message.get("choice")
+        if self.state != "card" or choice not in ("A", "B"):
+            return {"type": "error", "message": "Aucune carte en attente de choix A ou B."}
+        explanation = self.engine.current_card["option" + choice].get("explanation", "")
+        outcome = self.engine.apply_choice(choice)
+        self.recording.record(self.engine)
+        reply = {"type": "result", "outcome": outcome, "explanation": explanation, **self._gauges()}
+        if outcome == engine.CONTINUE:
+            return self._next_card(reply)
+        if outcome == engine.QUIZ:
+            self.state = "quiz"
+            self.quiz = self.engine.sample_quiz()
+            reply["quiz"] = [question_message(q) for q in self.quiz]
+            return reply
+        return self._game_over(reply)
+
+    def cmd_quiz(self, message):
+        answers = message.get("answers")
+        if self.state != "quiz" or not isinstance(answers, list) or len(answers) != len(self.quiz):
+            return {"type": "error", "message": f"{len(self.quiz)} réponses attendues."}
+        mistakes = self.engine.quiz_mistakes(self.quiz, answers)
+        reply = {
+            "type": "quiz_result",
+            "passed": not mistakes,
+            "corrections": [{"number": i + 1, "question": q.get("question", "Question non définie"),
+                             "answer": given, "correct": q["answer"],
+                             "explanation": q.get("explanation", "Aucune explication")}
+                            for i, q, given in mistakes],
+        }
+        self.quiz = []
+        if mistakes:
+            return self._game_over(reply)
+        self.engine.rescue()
+        self.recording.record_rescue()
+        reply.update(self._gauges())
+        return self._next_card(reply)
+
+    def cmd_hint(self, message):
+        if self.state != "card":
+            return {"type": "error", "message": "Aucune carte en cours."}
+        advice = None
+        if self.server.policy_table is not None:
+            advice = self.server.policy_table.advice(self.engine.gauges, self.engine.current_index)
+        return {"type": "hint", "hint": self.engine.current_card.get("hint", "Pas d'indice disponible."),
+                "advice": advice}
+
+    def cmd_save(self, message):
+        name = message.get("name")
+        if not isinstance(name, str) or not name.strip():
+            return {"type": "error", "message": "Nom du joueur attendu (texte non vide)."}
+        name = name.strip()
+        if self.state != "over" or not self.final_score:
+            return {"type": "error", "message": "Aucun score à enregistrer."}
+        self.server.scores.submit(name[:50], self.final_score)
+        # Un seul enregistrement par partie
+        self.final_score = None
+        return {"type": "saved"}
+
+
+class GameServer:
+    def __init__(self, cards, quiz_questions, scores, recordings, policy_table=None):
+        self.cards = cards
+        self.quiz_questions = quiz_questions
+        self.effects = engine.compile_effects(cards)
+        self.schedules = effects.compile_schedules(cards)
+        self.scores = scores
+        self.recordings = recordings
+        self.policy_table = policy_table
+        self.connections = 0
+
+    async def handle_connection(self, reader, writer):
+        session = ClientSession(self)
+        self.connections += 1
+        try:
+            writer.write(b'{"type": "hello"}\n')
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    reply = {"type": "error", "message": "JSON invalide."}
+                else:
+                    if not isinstance(message, dict):
+                        reply = {"type": "error", "message": "Objet JSON attendu."}
+                    elif message.get("cmd") == "quit":
+                        break
+                    else:
+                        reply = session.handle(message)
+                writer.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            print(f"Connexion interrompue : {e}")
+        finally:
+            session.close()
+            self.connections -= 1
+            writer.close()
+
+
+async def serve(args):
+    cards = deckpack.load_cards(args.cards)
+    quiz_questions = questionbank.QuestionBank.load(questionbank.discover(args.quiz, args.banks))
+    policy_table = PolicyTable.load(args.policy, cards) if args.policy else None
+    scores = ScoreWriter(args.scores)
+    await scores.start()
+    recordings = RecordingWriter(args.recordings)
+    game_server = GameServer(cards, quiz_questions, scores, recordings, policy_table)
+
+    if args.unix:
+        server = await asyncio.start_unix_server(game_server.handle_connection, path=args.unix, limit=MAX_LINE)
+        address = args.unix
+    else:
+        server = await asyncio.start_server(game_server.handle_connection, args.host, args.port, limit=MAX_LINE)
+        address = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+    print(f"Serveur ANACOFINANCE à l'écoute sur {address} ({len(cards)} cartes, {len(quiz_questions)} questions)",
+          flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await scores.close()
+        recordings.close()
+        print(f"Scores enregistrés : {scores.written} en {scores.batches} transaction(s)", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de classe ANACOFINANCE (protocole JSON en lignes)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="chemin d'une socket Unix (remplace --host/--port)")
+    parser.add_argument("--cards", default="cards.json")
+    parser.add_argument("--quiz", default="quiz.json")
+    parser.add_argument("--banks", default=questionbank.BANK_DIR, help="dossier des banques de questions")
+    parser.add_argument("--scores", default=os.path.join("assets", "scores.db"))
+    parser.add_argument("--recordings", default=os.path.join("assets", "recordings"),
+                        help="dossier des parties enregistrées")
+    parser.add_argument("--policy", default=os.path.join("assets", "policy.json"),
+                        help="table de politique pour les conseils (facultative)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
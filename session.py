@@ -0,0 +1,196 @@
+"""
+Sauvegarde continue de la partie en cours, pour reprendre après une fermeture ou un crash.
+
+Chaque décision ajoute un enregistrement binaire de taille fixe au journal ; toutes les
+`snapshot_every` décisions, l'état complet du moteur est écrit de façon atomique dans un
+instantané et le journal est vidé. Les écritures sont faites par un thread de fond pour
+ne jamais bloquer l'interface. La reprise charge le dernier instantané puis rejoue au
+plus `snapshot_every` enregistrements : sa durée ne dépend pas de la longueur de la partie.
+
+Les décisions sont rejouées en tirant à nouveau chaque carte avec l'ordonnanceur de
+l'instantané, dont l'état (générateur compris) avance donc comme dans la partie
+d'origine : après la reprise, les cartes suivantes sont celles qui auraient été tirées
+sans interruption. Le tirage du quiz de seconde chance utilise le même générateur ; une
+seconde chance réussie déclenche donc un instantané plutôt qu'un enregistrement.
+"""
+import json
+import os
+import queue
+import struct
+import threading
+
+import instrument
+
+
+RECORD = struct.Struct("<IBBxxIiii")  # numéro, type, drapeaux, carte, variations des 3 jauges
+OP_CHOICE = 1
+FLAG_CHOICE_B = 1
+FLAG_QUIZ_USED = 2
+JOURNAL_FILE = "journal.bin"
+SNAPSHOT_FILE = "snapshot.json"
+
+
+class SessionJournal:
+    def __init__(self, directory, snapshot_every=20):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.seq = 0
+        self.since_snapshot = 0
+        # Sauvegarde présente une fois les écritures en attente faites, connue sans attendre le thread
+        self.saved = os.path.exists(self.snapshot_path)
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._writer.start()
+
+    # --- Thread principal ---------------------------------------------------------
+
+    def exists(self):
+        """Une partie peut-elle être reprise ? Ne bloque pas sur le thread d'écriture."""
+        return self.saved
+
+    def start(self, game):
+        """Nouvelle partie : instantané initial, le journal précédent est abandonné."""
+        self.seq = 0
+        self._snapshot(game)
+
+    def record_choice(self, game):
+        """À appeler après GameEngine.apply_choice."""
+        card, choice, delta = game.game_log[-1]
+        flags = (FLAG_CHOICE_B if choice == "B" else 0) | (FLAG_QUIZ_USED if game.quiz_used else 0)
+        self._append(game, RECORD.pack(self._next_seq(), OP_CHOICE, flags, card, *delta))
+
+    def record_rescue(self, game):
+        """
+        À appeler après GameEngine.rescue. Le quiz a consommé des tirages du générateur partagé
+        avec l'ordonnanceur : un instantané les prend en compte, le journal ne le pourrait pas.
+        """
+        self._next_seq()
+        self._snapshot(game)
+
+    def snapshot(self, game):
+        """Instantané immédiat, par exemple après un changement de paquet : le journal ne peut plus être rejoué."""
+        self._snapshot(game)
+
+    def discard(self):
+        """Partie terminée : la sauvegarde est supprimée."""
+        self.saved = False
+        self._queue.put(("discard", None))
+
+    def flush(self):
+        """Attend que toutes les écritures en attente soient faites."""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+
+    def _next_seq(self):
+        self.seq += 1
+        return self.seq
+
+    def _append(self, game, record):
+        self._queue.put(("append", record))
+        self.since_snapshot += 1
+        if self.since_snapshot >= self.snapshot_every:
+            self._snapshot(game)
+
+    def _snapshot(self, game):
+        self.since_snapshot = 0
+        self.saved = True
+        self._queue.put(("snapshot", {"seq": self.seq, "engine": game.snapshot()}))
+
+    def load(self, game):
+        """
+        Restaure la partie sauvegardée dans `game`. Renvoie False s'il n'y a rien à
+        reprendre. Une sauvegarde illisible ou faite pour un autre paquet de cartes est
+        supprimée et signalée par ValueError ; `game` est alors remis à zéro.
+        """
+        self.flush()
+        if not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            self._restore(game)
+        except Exception as e:
+            game.reset()
+            self.seq = 0
+            self.discard()
+            raise ValueError(f"Sauvegarde de partie inutilisable : {e}") from e
+        # Nouvel instantané compact pour repartir d'un journal vide
+        self._snapshot(game)
+        return True
+
+    def _restore(self, game):
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        game.restore(snapshot["engine"])
+        self.seq = snapshot["seq"]
+        for seq, op, flags, value, a, b, c in self._read_journal():
+            if seq <= self.seq:
+                continue
+            if op != OP_CHOICE:
+                raise ValueError(f"Enregistrement inconnu : {op}")
+            # Rejoué par le moteur : carte tirée à nouveau, effets programmés reconstruits
+            game.replay_choice(value, "B" if flags & FLAG_CHOICE_B else "A")
+            game.quiz_used = bool(flags & FLAG_QUIZ_USED)
+            self.seq = seq
+
+    def _read_journal(self):
+        try:
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return []
+        # Un enregistrement incomplet en fin de fichier (crash pendant l'écriture) est ignoré
+        usable = len(data) - len(data) % RECORD.size
+        return list(RECORD.iter_unpack(data[:usable]))
+
+    # --- Thread d'écriture ----------------------------------------------------------
+
+    def _run(self):
+        journal = None
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                op, payload = item
+                if op == "append":
+                    if journal is None:
+                        os.makedirs(self.directory, exist_ok=True)
+                        journal = open(self.journal_path, "ab")
+                    journal.write(payload)
+                    if self._queue.empty():
+                        journal.flush()
+                        os.fsync(journal.fileno())
+                elif op == "snapshot":
+                    if journal is not None:
+                        journal.close()
+                        journal = None
+                    self._write_snapshot(payload)
+                    # L'instantané couvre tout le journal : celui-ci peut être vidé
+                    open(self.journal_path, "wb").close()
+                elif op == "discard":
+                    if journal is not None:
+                        journal.close()
+                        journal = None
+                    for path in (self.snapshot_path, self.journal_path):
+                        if os.path.exists(path):
+                            os.remove(path)
+            except OSError as e:
+                print(f"Erreur lors de la sauvegarde de la partie: {e}")
+            finally:
+                if item is None and journal is not None:
+                    journal.close()
+                self._queue.task_done()
+
+    @instrument.timed("session_snapshot")
+    def _write_snapshot(self, snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
@@ -0,0 +1,160 @@
+"""
+Simulateur Monte Carlo : joue un grand nombre de parties avec des politiques de choix
+automatiques et rapporte la distribution des durées de survie (score) par politique.
+
+Exemple : py simulate.py --games 1000000 --policies random greedy always_a
+"""
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+from scheduler import SCHEDULERS
+
+
+def policy_random(gauges, effects_a, effects_b, rng):
+    return "A" if rng.random() < 0.5 else "B"
+
+
+def policy_always_a(gauges, effects_a, effects_b, rng):
+    return "A"
+
+
+def policy_greedy(gauges, effects_a, effects_b, rng):
+    """Choisit l'option qui maximise la jauge la plus basse après le choix."""
+    budget, bonheur, epargne = gauges["budget"], gauges["bonheur"], gauges["epargne"]
+    worst_a = min(budget + effects_a[0], bonheur + effects_a[1], epargne + effects_a[2])
+    worst_b = min(budget + effects_b[0], bonheur + effects_b[1], epargne + effects_b[2])
+    return "A" if worst_a >= worst_b else "B"
+
+
+POLICIES = {
+    "random": policy_random,
+    "greedy": policy_greedy,
+    "always_a": policy_always_a,
+}
+
+
+def play_game(game, policy, quiz_success, max_turns):
+    """Joue une partie complète et renvoie le score final."""
+    game.reset()
+    rng = game.rng
+    while True:
+        index = game.draw_card()
+        effects_a, effects_b = game.effects[index]
+        outcome = game.apply_choice(policy(game.gauges, effects_a, effects_b, rng))
+        if outcome == engine.QUIZ:
+            if rng.random() >= quiz_success:
+                return game.score
+            game.rescue()
+        elif outcome == engine.GAME_OVER or game.score >= max_turns:
+            return game.score
+
+
+_worker_cards = None
+
+
+def _init_worker(cards_path):
+    global _worker_cards
+    _worker_cards = engine.load_json(cards_path)
+
+
+def _run_batch(policy_name, seed, games, quiz_success, max_turns, scheduler):
+    game = engine.GameEngine(_worker_cards, rng=random.Random(seed), scheduler=scheduler)
+    policy = POLICIES[policy_name]
+    lengths = Counter()
+    for _ in range(games):
+        lengths[play_game(game, policy, quiz_success, max_turns)] += 1
+    return policy_name, lengths
+
+
+def simulate(cards_path, policies, games, seed=0, quiz_success=0.5, max_turns=1000,
+             workers=None, batch_size=20000, scheduler="uniform"):
+    """
+    Répartit les parties sur un pool de processus. Chaque lot reçoit sa propre graine
+    dérivée de `seed`, les résultats sont donc reproductibles quel que soit le nombre
+    de processus. Renvoie {politique: Counter(score -> nombre de parties)}.
+    """
+    results = {name: Counter() for name in policies}
+    jobs = []
+    for name in policies:
+        remaining, batch = games, 0
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            jobs.append((name, f"{seed}:{name}:{batch}", size))
+            remaining -= size
+            batch += 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cards_path,)) as pool:
+        futures = [pool.submit(_run_batch, name, batch_seed, size, quiz_success, max_turns, scheduler)
+                   for name, batch_seed, size in jobs]
+        for future in futures:
+            name, lengths = future.result()
+            results[name].update(lengths)
+    return results
+
+
+def percentile(lengths, fraction):
+    total = sum(lengths.values())
+    threshold = fraction * total
+    seen = 0
+    for length in sorted(lengths):
+        seen += lengths[length]
+        if seen >= threshold:
+            return length
+    return 0
+
+
+def summarize(lengths):
+    total = sum(lengths.values())
+    mean = sum(length * count for length, count in lengths.items()) / total if total else 0.0
+    return {
+        "games": total,
+        "mean": mean,
+        "p10": percentile(lengths, 0.10),
+        "p50": percentile(lengths, 0.50),
+        "p90": percentile(lengths, 0.90),
+        "max": max(lengths) if lengths else 0,
+    }
+
+
+def survival_curve(lengths, points=(5, 10, 20, 50, 100)):
+    """Proportion des parties ayant atteint au moins chaque score de `points`."""
+    total = sum(lengths.values())
+    return {p: sum(c for length, c in lengths.items() if length >= p) / total for p in points}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation Monte Carlo des parties ANACOFINANCE")
+    parser.add_argument("--cards", default="cards.json")
+    parser.add_argument("--games", type=int, default=100000, help="parties par politique")
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quiz-success", type=float, default=0.5,
+                        help="probabilité de réussir le quiz de seconde chance")
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--scheduler", default="uniform", choices=list(SCHEDULERS),
+                        help="ordonnanceur de tirage des cartes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = simulate(args.cards, args.policies, args.games, args.seed, args.quiz_success,
+                       args.max_turns, args.workers, scheduler=args.scheduler)
+    elapsed = time.perf_counter() - start
+
+    total_games = args.games * len(args.policies)
+    print(f"{total_games} parties en {elapsed:.1f} s ({total_games / elapsed * 60:,.0f} parties/min)")
+    for name in args.policies:
+        stats = summarize(results[name])
+        curve = survival_curve(results[name])
+        print(f"\n[{name}] moyenne {stats['mean']:.2f} | p10 {stats['p10']} | p50 {stats['p50']} "
+              f"| p90 {stats['p90']} | max {stats['max']}")
+        print("  survie : " + " | ".join(f">={p}: {share:.1%}" for p, share in curve.items()))
+
+
+if __name__ == "__main__":
+    main()
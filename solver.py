@@ -0,0 +1,197 @@
+"""
+Solveur exact de probabilité de survie par programmation dynamique.
+
+Les jauges partent de 50 et les effets de cards.json sont de petits entiers multiples
+d'un même pas : l'espace des états (budget, bonheur, epargne) atteignables est donc fini
+une fois les jauges plafonnées à `cap`. Pour chaque état, le solveur calcule le score
+restant espéré sur `horizon` tours sous un tirage uniforme des cartes, ainsi que le
+choix A/B optimal pour chaque carte. La table de politique exportée alimente
+l'« Indice du conseiller » du jeu (recherche en O(1)).
+
+Le modèle ne connaît que les effets immédiats : les effets programmés (effects.py :
+remboursements, revenus différés) feraient entrer les évènements en attente dans
+l'état et rendraient l'espace des états intraitable. La table est donc une
+approximation pour les cartes qui en déclarent ; son empreinte de paquet les inclut
+toutefois, pour qu'une table calculée avant un changement de ces effets soit rejetée.
+
+Exemple : py solver.py --cap 150 --horizon 60 --output assets/policy.json
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+from effects import compile_schedules
+
+
+def clamp(value, cap):
+    return value if value < cap else cap
+
+
+def reachable_states(effects, cap):
+    """Parcours en largeur des états vivants atteignables depuis l'état initial."""
+    start = (engine.START_VALUE,) * 3
+    seen = {start}
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for b, h, e in frontier:
+            for card in effects:
+                for db, dh, de in card:
+                    state = (clamp(b + db, cap), clamp(h + dh, cap), clamp(e + de, cap))
+                    if state not in seen and not engine.is_lost(*state):
+                        seen.add(state)
+                        next_frontier.append(state)
+        frontier = next_frontier
+    return sorted(seen)
+
+
+def build_transitions(states, effects, cap):
+    """Pour chaque état et chaque carte : (indice successeur A, indice successeur B), -1 si défaite."""
+    index = {state: i for i, state in enumerate(states)}
+    transitions = []
+    for b, h, e in states:
+        row = []
+        for card in effects:
+            pair = []
+            for db, dh, de in card:
+                pair.append(index.get((clamp(b + db, cap), clamp(h + dh, cap), clamp(e + de, cap)), -1))
+            row.append(tuple(pair))
+        transitions.append(row)
+    return transitions
+
+
+_transitions = None
+
+
+def _init_worker(transitions):
+    global _transitions
+    _transitions = transitions
+
+
+def _sweep(start, stop, values, n_cards):
+    """Met à jour les valeurs d'une tranche d'états à partir des valeurs de l'horizon précédent."""
+    result = []
+    for row in _transitions[start:stop]:
+        total = 0.0
+        for ia, ib in row:
+            va = 1.0 + values[ia] if ia >= 0 else 1.0
+            vb = 1.0 + values[ib] if ib >= 0 else 1.0
+            total += va if va >= vb else vb
+        result.append(total / n_cards)
+    return result
+
+
+def _policy(start, stop, values):
+    policy = []
+    for row in _transitions[start:stop]:
+        choices = []
+        for ia, ib in row:
+            va = values[ia] if ia >= 0 else -1.0
+            vb = values[ib] if ib >= 0 else -1.0
+            choices.append("A" if va >= vb else "B")
+        policy.append("".join(choices))
+    return policy
+
+
+def solve(cards, cap=150, horizon=60, workers=None, tolerance=1e-9):
+    """
+    Renvoie (états, valeurs, politique). La valeur d'un état est le score restant espéré
+    (nombre de décisions) en jouant de façon optimale, limité à `horizon` tours et sans
+    quiz de seconde chance. Les tranches d'états sont réparties sur un pool de processus.
+    """
+    effects = engine.compile_effects(cards)
+    states = reachable_states(effects, cap)
+    transitions = build_transitions(states, effects, cap)
+    n_cards = len(effects)
+    workers = workers or os.cpu_count() or 1
+    chunk = -(-len(states) // workers)
+    slices = [(i, min(i + chunk, len(states))) for i in range(0, len(states), chunk)]
+
+    values = [0.0] * len(states)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(transitions,)) as pool:
+        for _ in range(horizon):
+            parts = pool.map(_sweep, *zip(*[(start, stop, values, n_cards) for start, stop in slices]))
+            new_values = [v for part in parts for v in part]
+            delta = max(abs(a - b) for a, b in zip(new_values, values))
+            values = new_values
+            if delta < tolerance:
+                break
+        parts = pool.map(_policy, *zip(*[(start, stop, values) for start, stop in slices]))
+        policy = [p for part in parts for p in part]
+    return states, values, policy
+
+
+def export_policy(path, cards, cap, horizon, states, policy):
+    effects = engine.compile_effects(cards)
+    table = {
+        "deck": engine.deck_signature(effects, compile_schedules(cards)),
+        "cap": cap,
+        "horizon": horizon,
+        "policy": {f"{b},{h},{e}": choices for (b, h, e), choices in zip(states, policy)},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table, f, separators=(",", ":"))
+
+
+class PolicyTable:
+    """Table de politique optimale chargée en mémoire, pour une recherche en O(1)."""
+
+    def __init__(self, cap, policy):
+        self.cap = cap
+        self.policy = policy
+
+    @classmethod
+    def load(cls, path, cards):
+        """Renvoie la table, ou None si le fichier est absent ou calculé pour un autre paquet."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                table = json.load(f)
+        except (OSError, ValueError):
+            return None
+        signature = engine.deck_signature(engine.compile_effects(cards), compile_schedules(cards))
+        if table.get("deck") != signature:
+            return None
+        policy = {tuple(int(v) for v in key.split(",")): choices
+                  for key, choices in table["policy"].items()}
+        return cls(table["cap"], policy)
+
+    def advice(self, gauges, card_index):
+        """Renvoie "A", "B" ou None si l'état n'est pas dans la table."""
+        cap = self.cap
+        key = (clamp(gauges["budget"], cap), clamp(gauges["bonheur"], cap), clamp(gauges["epargne"], cap))
+        choices = self.policy.get(key)
+        if choices is None or card_index is None or card_index >= len(choices):
+            return None
+        return choices[card_index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solveur exact de survie pour cards.json")
+    parser.add_argument("--cards", default="cards.json")
+    parser.add_argument("--cap", type=int, default=150, help="plafond des jauges")
+    parser.add_argument("--horizon", type=int, default=60, help="nombre de tours pris en compte")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default=os.path.join("assets", "policy.json"))
+    args = parser.parse_args()
+
+    cards = engine.load_json(args.cards)
+    scheduled = sum(1 for options in compile_schedules(cards) for schedule in options if schedule)
+    if scheduled:
+        print(f"Attention : {scheduled} option(s) avec des effets programmés, ignorés par le solveur "
+              f"(simulate.py les prend en compte)")
+    start = time.perf_counter()
+    states, values, policy = solve(cards, args.cap, args.horizon, args.workers)
+    elapsed = time.perf_counter() - start
+    start_state = states.index((engine.START_VALUE,) * 3)
+    print(f"{len(states)} états atteignables résolus en {elapsed:.1f} s")
+    print(f"Score espéré depuis le départ (jeu optimal, {args.horizon} tours max) : {values[start_state]:.2f}")
+    export_policy(args.output, cards, args.cap, args.horizon, states, policy)
+    print(f"Table de politique exportée vers {args.output}")
+
+
+if __name__ == "__main__":
+    main()
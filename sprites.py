@@ -0,0 +1,137 @@
+import os
+import queue
+import random
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+import instrument
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+
+@instrument.timed("sprite_decode")
+def decode_image(path, size):
+    """
+    Décode et redimensionne une image avec PIL. Ne crée aucun objet Tk : peut donc
+    être appelée depuis un thread secondaire.
+    """
+    image = Image.open(path)
+    image.load()
+    return image.resize(size, resample=Image.LANCZOS)
+
+
+class SpritePool:
+    """
+    Réserve de portraits de personnages.
+
+    Le dossier est indexé une seule fois, le décodage et le redimensionnement se font
+    dans un thread de fond, et les PhotoImage prêts sont servis depuis un cache borné
+    (éviction LRU). Les PhotoImage sont toujours créés sur le thread principal,
+    Tk n'étant pas thread-safe.
+    """
+
+    def __init__(self, directory, size, capacity=16, rng=None):
+        self.directory = directory
+        self.size = size
+        self.capacity = max(1, capacity)
+        self.rng = rng or random.Random()
+        try:
+            self.files = sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                                if f.lower().endswith(IMAGE_EXTENSIONS))
+        except OSError as e:
+            print(f"Erreur lors de l'indexation du dossier {directory}: {e}")
+            self.files = []
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._cache = OrderedDict()  # chemin -> PhotoImage (thread principal uniquement)
+        self._decoded = {}  # chemin -> image PIL décodée par le thread de fond
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._next = None
+        self._worker = threading.Thread(target=self._run, name="sprite-pool", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        while True:
+            path = self._requests.get()
+            if path is None:
+                return
+            try:
+                image = decode_image(path, self.size)
+            except Exception as e:
+                print(f"Erreur lors du chargement de l'image depuis {path}: {e}")
+                image = None
+            with self._lock:
+                self._pending.discard(path)
+                if image is not None:
+                    self._decoded[path] = image
+
+    def _request(self, path):
+        if path in self._cache:
+            return
+        with self._lock:
+            if path in self._pending or path in self._decoded:
+                return
+            self._pending.add(path)
+        self._requests.put(path)
+
+    def warm_up(self):
+        """Demande le décodage de tous les portraits (dans la limite du cache)."""
+        for path in self.files[:self.capacity]:
+            self._request(path)
+
+    def prefetch(self):
+        """Choisit dès maintenant le portrait de la prochaine carte et lance son décodage."""
+        if not self.files:
+            return
+        self._next = self.rng.choice(self.files)
+        self._request(self._next)
+
+    def get(self):
+        """
+        Renvoie un PhotoImage de portrait choisi aléatoirement (celui préchargé s'il existe),
+        ou None si aucun portrait n'est disponible.
+        """
+        if not self.files:
+            return None
+        path = self._next or self.rng.choice(self.files)
+        self._next = None
+        return self._photo(path)
+
+    @instrument.timed("sprite_photo")
+    def _photo(self, path):
+        photo = self._cache.get(path)
+        if photo is not None:
+            self._cache.move_to_end(path)
+            self.hits += 1
+            return photo
+        self.misses += 1
+        with self._lock:
+            image = self._decoded.pop(path, None)
+        if image is None:
+            # Le thread de fond n'a pas encore fini : décodage synchrone de secours
+            try:
+                image = decode_image(path, self.size)
+            except Exception as e:
+                print(f"Erreur lors du chargement de l'image depuis {path}: {e}")
+                return None
+        photo = ImageTk.PhotoImage(image)
+        self._cache[path] = photo
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return photo
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "cached": len(self._cache), "files": len(self.files)}
+
+    def close(self):
+        self._requests.put(None)
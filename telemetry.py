@@ -0,0 +1,252 @@
+"""
+Télémétrie des joueurs pour la recherche pédagogique : temps de réaction de chaque
+décision, utilisation de l'indice et temps de réponse au quiz.
+
+Chaque évènement est un enregistrement binaire de taille fixe (RECORD) écrit avec
+`pack_into` dans un tampon circulaire alloué une fois pour toutes : côté interface, un
+évènement ne coûte qu'une écriture dans ce tampon (quelques microsecondes, aucun objet
+conservé). Un thread de fond vide le tampon par lots dans un fichier par jour. Si le
+tampon est plein (disque bloqué), les nouveaux évènements sont comptés dans `dropped`
+plutôt que de ralentir le jeu.
+
+Export : py telemetry.py --csv telemetry.csv (ou --npy telemetry.npy ; NumPy nécessaire)
+"""
+import argparse
+import csv
+import os
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+
+
+# Horodatage (ms depuis 1970), partie (début en s), carte ou question, durée (ms), type, valeur
+RECORD = struct.Struct("<qIIIBBxx")
+FILE_HEADER = struct.Struct("<4sHH")  # magie, version, taille d'un enregistrement
+MAGIC = b"ANAT"
+VERSION = 1
+
+EVENT_GAME_START = 1
+EVENT_DECISION = 2  # carte, durée depuis l'affichage, valeur 0 = A / 1 = B
+EVENT_HINT = 3  # carte, durée depuis l'affichage
+EVENT_QUIZ_ANSWER = 4  # numéro de question, durée, valeur = réponse (1 à 4) + 16 si correcte
+EVENT_GAME_END = 5  # score, durée de la partie, valeur 1 si interrompue
+EVENT_NAMES = {EVENT_GAME_START: "game_start", EVENT_DECISION: "decision", EVENT_HINT: "hint",
+               EVENT_QUIZ_ANSWER: "quiz_answer", EVENT_GAME_END: "game_end"}
+ANSWERS = "ABCD"
+NO_ITEM = 0xFFFFFFFF  # aucune carte courante
+QUIZ_CORRECT = 16
+FIELDS = ("time_ms", "game", "item", "duration_ms", "event", "value")
+
+
+def day_file(directory, when=None):
+    return os.path.join(directory, f"telemetry-{(when or datetime.now()).strftime('%Y-%m-%d')}.bin")
+
+
+class TelemetryRecorder:
+    """
+    Tampon circulaire à un seul producteur (le thread de l'interface) et un seul
+    consommateur (le thread d'écriture). `head` n'est avancé que par le producteur,
+    `tail` que par le consommateur : aucun verrou n'est pris sur le chemin d'un évènement.
+    """
+
+    def __init__(self, directory, capacity=4096, flush_interval=1.0):
+        self.directory = directory
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.head = 0  # évènements écrits dans le tampon
+        self.tail = 0  # évènements écrits sur disque
+        self.dropped = 0
+        self.game = 0
+        self.game_started = time.perf_counter()
+        self.shown_at = self.game_started
+        self._wake = threading.Event()
+        self._stopping = False
+        self._writer = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._writer.start()
+
+    # --- Thread principal ---------------------------------------------------------
+
+    def _emit(self, event, item, duration_ms, value):
+        head = self.head
+        if head - self.tail >= self.capacity:
+            self.dropped += 1
+            return
+        RECORD.pack_into(self.buffer, (head % self.capacity) * RECORD.size,
+                         time.time_ns() // 1000000, self.game, item, duration_ms, event, value)
+        self.head = head + 1
+        # Réveil anticipé du thread d'écriture quand le tampon est à moitié plein
+        if head + 1 - self.tail >= self.capacity // 2:
+            self._wake.set()
+
+    def _since(self, start):
+        return int((time.perf_counter() - start) * 1000)
+
+    def begin_game(self):
+        self.game = int(time.time())
+        self.game_started = time.perf_counter()
+        self._emit(EVENT_GAME_START, 0, 0, 0)
+
+    def end_game(self, score, interrupted=False):
+        self._emit(EVENT_GAME_END, score, self._since(self.game_started), 1 if interrupted else 0)
+
+    def shown(self):
+        """Une carte ou une question vient d'être affichée : début du temps de réaction."""
+        self.shown_at = time.perf_counter()
+
+    def decision(self, card, choice):
+        self._emit(EVENT_DECISION, NO_ITEM if card is None else card, self._since(self.shown_at),
+                   1 if choice == "B" else 0)
+
+    def hint(self, card):
+        self._emit(EVENT_HINT, NO_ITEM if card is None else card, self._since(self.shown_at), 0)
+
+    def quiz_answer(self, number, answer, correct):
+        value = ANSWERS.find(answer) + 1 if answer else 0
+        self._emit(EVENT_QUIZ_ANSWER, number, self._since(self.shown_at), value + (QUIZ_CORRECT if correct else 0))
+
+    def flush(self):
+        """Attend que tous les évènements du tampon soient écrits sur disque."""
+        while self.tail < self.head and self._writer.is_alive():
+            self._wake.set()
+            time.sleep(0.001)
+
+    def close(self):
+        self._stopping = True
+        self._wake.set()
+        self._writer.join()
+
+    # --- Thread d'écriture ----------------------------------------------------------
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stopping
+            try:
+                self._write()
+            except OSError as e:
+                print(f"Erreur lors de l'écriture de la télémétrie: {e}")
+            if stopping:
+                return
+
+    def _write(self):
+        head, tail = self.head, self.tail
+        if head == tail:
+            return
+        size = RECORD.size
+        start = (tail % self.capacity) * size
+        end = (head % self.capacity) * size
+        view = memoryview(self.buffer)
+        # Le lot peut faire le tour du tampon : deux morceaux
+        chunks = [view[start:end]] if start < end else [view[start:], view[:end]]
+        os.makedirs(self.directory, exist_ok=True)
+        path = day_file(self.directory)
+        with open(path, "ab") as f:
+            if f.tell() == 0:
+                f.write(FILE_HEADER.pack(MAGIC, VERSION, RECORD.size))
+            for chunk in chunks:
+                f.write(chunk)
+        self.tail = head
+
+
+# --- Export ---------------------------------------------------------------------
+
+def read_file(path):
+    """Renvoie les enregistrements complets d'un fichier, en octets (en-tête vérifié)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, record_size = FILE_HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"Fichier de télémétrie invalide : {path}")
+    body = data[FILE_HEADER.size:]
+    return body[:len(body) - len(body) % RECORD.size]
+
+
+def list_files(directory):
+    try:
+        return sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                      if f.startswith("telemetry-") and f.endswith(".bin"))
+    except OSError:
+        return []
+
+
+def iter_records(paths):
+    """Parcourt les évènements (tuples dans l'ordre de FIELDS) de plusieurs fichiers."""
+    for path in paths:
+        yield from RECORD.iter_unpack(read_file(path))
+
+
+def to_numpy(paths):
+    """Tableau structuré NumPy (une ligne par évènement, colonnes FIELDS), sans copie par évènement."""
+    import numpy as np
+    dtype = np.dtype({"names": list(FIELDS), "formats": ["<i8", "<u4", "<u4", "<u4", "u1", "u1"],
+                      "offsets": [0, 8, 12, 16, 20, 21], "itemsize": RECORD.size})
+    parts = [np.frombuffer(read_file(path), dtype=dtype) for path in paths]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+
+def export_csv(paths, output):
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS + ("event_name",))
+        count = 0
+        for record in iter_records(paths):
+            writer.writerow(record + (EVENT_NAMES.get(record[4], "?"),))
+            count += 1
+    return count
+
+
+def summary(paths):
+    """Comptes par type d'évènement, temps de décision médian et part des cartes où l'indice a été ouvert."""
+    counts = {name: 0 for name in EVENT_NAMES.values()}
+    decision_ms = []
+    quiz_correct = 0
+    for _, _, _, duration_ms, event, value in iter_records(paths):
+        name = EVENT_NAMES.get(event, "?")
+        counts[name] = counts.get(name, 0) + 1
+        if event == EVENT_DECISION:
+            decision_ms.append(duration_ms)
+        elif event == EVENT_QUIZ_ANSWER and value & QUIZ_CORRECT:
+            quiz_correct += 1
+    decision_ms.sort()
+    return {
+        "events": counts,
+        "median_decision_ms": decision_ms[len(decision_ms) // 2] if decision_ms else None,
+        "hints_per_decision": counts["hint"] / counts["decision"] if counts["decision"] else None,
+        "quiz_correct_rate": quiz_correct / counts["quiz_answer"] if counts["quiz_answer"] else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export de la télémétrie des joueurs")
+    parser.add_argument("--dir", default=os.path.join("assets", "telemetry"))
+    parser.add_argument("--csv", help="fichier CSV à écrire")
+    parser.add_argument("--npy", help="fichier NumPy (.npy, tableau structuré) à écrire")
+    args = parser.parse_args()
+
+    paths = list_files(args.dir)
+    if not paths:
+        print(f"Aucune télémétrie dans {args.dir}")
+        sys.exit(1)
+    if args.csv:
+        print(f"{export_csv(paths, args.csv)} évènements écrits dans {args.csv}")
+    if args.npy:
+        import numpy as np
+        records = to_numpy(paths)
+        np.save(args.npy, records)
+        print(f"{len(records)} évènements écrits dans {args.npy}")
+    if not args.csv and not args.npy:
+        stats = summary(paths)
+        print(f"{len(paths)} fichier(s) : " + ", ".join(f"{name} {n}" for name, n in stats["events"].items()))
+        if stats["median_decision_ms"] is not None:
+            print(f"Temps de décision médian : {stats['median_decision_ms']} ms, "
+                  f"indices ouverts : {stats['hints_per_decision']:.1%} des décisions")
+        if stats["quiz_correct_rate"] is not None:
+            print(f"Réponses correctes au quiz : {stats['quiz_correct_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Reprise de session : la suite de la partie ne dépend pas de l'interruption."""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+import scheduler
+from session import SessionJournal
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARDS = engine.load_json(os.path.join(ROOT, "cards.json"))
+QUIZ = engine.load_json(os.path.join(ROOT, "quiz.json"))
+
+
+def new_game(scheduler, seed):
+    return engine.GameEngine(CARDS, quiz_questions=QUIZ, rng=random.Random(seed), scheduler=scheduler)
+
+
+def choose(game, journal, choices):
+    """Joue la carte tirée ; seconde chance accordée à chaque défaite."""
+    result = game.apply_choice(choices.choice("AB"))
+    if journal:
+        journal.record_choice(game)
+    if result != engine.CONTINUE:
+        game.sample_quiz()
+        game.rescue()
+        if journal:
+            journal.record_rescue(game)
+
+
+def play(game, journal, turns, choices):
+    """Joue `turns` tours ; renvoie les cartes tirées."""
+    drawn = []
+    for _ in range(turns):
+        drawn.append(game.draw_card())
+        choose(game, journal, choices)
+    return drawn
+
+
+@pytest.mark.parametrize("name", sorted(scheduler.SCHEDULERS))
+def test_resume_continues_the_same_draws(tmp_path, name):
+    reference = new_game(name, 7)
+    expected = play(reference, None, 60, random.Random(3))
+
+    game = new_game(name, 7)
+    journal = SessionJournal(str(tmp_path), snapshot_every=7)
+    journal.start(game)
+    choices = random.Random(3)
+    # Interruption entre deux instantanés : le journal doit être rejoué
+    before = play(game, journal, 25, choices)
+    journal.close()
+
+    resumed = new_game(name, 99)
+    journal = SessionJournal(str(tmp_path), snapshot_every=7)
+    assert journal.load(resumed)
+    after = play(resumed, journal, 35, choices)
+    journal.close()
+
+    assert before + after == expected
+    assert resumed.gauges == reference.gauges
+    assert resumed.game_log.to_bytes() == reference.game_log.to_bytes()
+
+
+def test_resume_after_mid_turn_snapshot(tmp_path):
+    reference = new_game("shuffle", 11)
+    expected = play(reference, None, 12, random.Random(5))
+
+    game = new_game("shuffle", 11)
+    journal = SessionJournal(str(tmp_path), snapshot_every=50)
+    journal.start(game)
+    choices = random.Random(5)
+    before = play(game, journal, 5, choices)
+    # Instantané pris après le tirage, avant le choix (changement de paquet en cours de tour)
+    card = game.draw_card()
+    journal.snapshot(game)
+    journal.close()
+
+    resumed = new_game("shuffle", 0)
+    journal = SessionJournal(str(tmp_path))
+    assert journal.load(resumed)
+    assert resumed.awaiting and resumed.current_index == card
+    choose(resumed, journal, choices)
+    after = play(resumed, journal, 6, choices)
+    journal.close()
+
+    assert before + [card] + after == expected
+
+
+def test_exists_without_waiting_for_the_writer(tmp_path):
+    journal = SessionJournal(str(tmp_path))
+    assert not journal.exists()
+    journal.start(new_game("uniform", 1))
+    assert journal.exists()
+    journal.discard()
+    assert not journal.exists()
+    journal.start(new_game("uniform", 1))
+    journal.close()
+    assert SessionJournal(str(tmp_path)).exists()